@@ -1 +1,11 @@
-from .periodic_table import PeriodicTable
+from .catalog import get_fractions
+
+
+def __getattr__(name):
+    # The table needs matplotlib and betterplotlib, which are slow to import. We only
+    # import them once the table is used, so that the data can be used without them.
+    if name == "PeriodicTable":
+        from .periodic_table import PeriodicTable
+
+        return PeriodicTable
+    raise AttributeError("module {} has no attribute {}".format(__name__, name))
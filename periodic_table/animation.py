@@ -0,0 +1,369 @@
+"""
+Render animations of the periodic table from a list of states.
+
+Each frame of the animation is described by a state, in the format used by
+`PeriodicTable.set_state`. The frames are split across a pool of processes, each of
+which builds one table when it starts and then renders its share of the frames.
+
+Long animations can instead be drawn by a single table and written one frame at a
+time (see `write_animation`), so that memory use stays flat however many frames
+there are. Animations of the fractions changing over time (see `save_evolution`)
+are drawn the same way, with the table's fills moved in place for each frame.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import io
+import os
+
+import numpy as np
+
+from . import catalog
+from . import state as table_state
+from . import writers
+
+# The table used by each worker process. See `_init_worker`.
+_worker_table = None
+
+
+def _init_worker(table_kwargs, dpi):
+    """
+    Build the table used by a worker process.
+
+    :param table_kwargs: Keyword arguments passed to PeriodicTable.
+    :param dpi: Resolution of the frames.
+    :return: None
+    """
+    global _worker_table
+    from .periodic_table import PeriodicTable
+
+    _worker_table = PeriodicTable(**table_kwargs)
+    _worker_table.get_figure().set_dpi(dpi)
+
+
+def _render_frame(state):
+    """
+    Render one frame in a worker process.
+
+    :param state: State of the table in this frame.
+    :return: The frame encoded as PNG, which is much smaller to send back to the
+             main process than the raw pixels.
+    :rtype: bytes
+    """
+    from PIL import Image
+
+    return _encode_png(_draw_state(_worker_table, state), Image)
+
+
+def _draw_state(table, state):
+    """
+    Draw a table in a given state.
+
+    :param table: PeriodicTable to draw.
+    :param state: State to draw the table in.
+    :return: RGB array of the frame, composited onto a white background.
+    :rtype: np.ndarray
+    """
+    table.set_state(state)
+    return _draw(table)
+
+
+def _draw(table):
+    """
+    Draw a table as it currently is.
+
+    :param table: PeriodicTable to draw.
+    :return: RGB array of the frame, composited onto a white background.
+    :rtype: np.ndarray
+    """
+    # The table has a transparent background, which GIFs and videos can't handle
+    return writers.on_white(table.to_array(table.get_figure().get_dpi()))
+
+
+def _encode_png(frame, Image):
+    """
+    Encode a frame as a PNG. Fast compression is used, since this is only temporary.
+
+    :param frame: RGB array of the frame.
+    :param Image: The PIL Image module.
+    :return: PNG data
+    :rtype: bytes
+    """
+    output = io.BytesIO()
+    Image.fromarray(frame).save(output, format="png", compress_level=1)
+    return output.getvalue()
+
+
+def _state_key(state, fractions=None):
+    """
+    Get a key that is identical for states that look the same, so they can be
+    deduplicated.
+
+    The key is made from what is visible on the table, like `cache.state_hash`, so
+    states that isolate elements with a `query.Selection` or an array work too.
+
+    :param state: State of the table.
+    :param fractions: Fractions of the elements on the table, which decide what is
+                      highlighted. Defaults to `catalog.fractions`.
+    :return: Key of this state
+    :rtype: tuple
+    """
+    bits = table_state.TableState.encode(state, fractions)
+    return (
+        bits.elements.tobytes(),
+        bits.labels.tobytes(),
+        bool(bits.connectors_faded),
+    )
+
+
+def render_frames(states, dpi=100, processes=None, **table_kwargs):
+    """
+    Render the frames of an animation in parallel.
+
+    Frames with identical states are only rendered once.
+
+    :param states: List of states of the table, one for each frame. See
+                   `PeriodicTable.set_state` for the format.
+    :param dpi: Resolution of the frames. The table is 20 by 12 inches.
+    :param processes: Number of processes to use. Defaults to the number of CPUs.
+    :param table_kwargs: Keyword arguments passed to PeriodicTable, to set the labels
+                         and colors.
+    :return: List of the frames as PNG data, in the same order as `states`.
+    :rtype: list
+    """
+    dataset = table_kwargs.get("dataset", None)
+    fractions = None if dataset is None else dataset.fractions
+    keys = [_state_key(state, fractions) for state in states]
+    unique = dict()
+    for key, state in zip(keys, states):
+        unique.setdefault(key, state)
+
+    if processes is None:
+        processes = os.cpu_count()
+    processes = max(1, min(processes, len(unique)))
+    # Sending neighboring frames to the same worker means fewer parts of the table
+    # change between the frames that each worker renders.
+    chunksize = max(1, len(unique) // processes)
+
+    with ProcessPoolExecutor(
+        processes, initializer=_init_worker, initargs=(table_kwargs, dpi)
+    ) as pool:
+        rendered = pool.map(_render_frame, unique.values(), chunksize=chunksize)
+        rendered = dict(zip(unique.keys(), rendered))
+
+    return [rendered[key] for key in keys]
+
+
+def save_animation(states, savename, fps=2, dpi=100, processes=None, **table_kwargs):
+    """
+    Render an animation in parallel and save it.
+
+    All the frames are held in memory (as PNGs) before they are written. For long
+    animations, `write_animation` draws and writes them one at a time instead.
+
+    :param states: List of states of the table, one for each frame. See
+                   `PeriodicTable.set_state` for the format.
+    :param savename: Path to save the animation to. The extension determines the
+                     format. See `writers.open_writer`.
+    :param fps: Frames per second.
+    :param dpi: Resolution of the frames. The table is 20 by 12 inches.
+    :param processes: Number of processes to use. Defaults to the number of CPUs.
+    :param table_kwargs: Keyword arguments passed to PeriodicTable, to set the labels
+                         and colors.
+    :return: None
+    """
+    from PIL import Image
+
+    with writers.open_writer(savename, fps) as writer:
+        for frame in render_frames(states, dpi, processes, **table_kwargs):
+            writer.write(np.asarray(Image.open(io.BytesIO(frame))))
+
+
+def stream_frames(states, dpi=100, table=None, **table_kwargs):
+    """
+    Draw the frames of an animation one at a time, as they are needed.
+
+    A single table is drawn for every frame, on a canvas that is reused, so the
+    memory used doesn't depend on the number of frames. Frames whose state is the
+    same as the frame before aren't drawn again.
+
+    :param states: Iterable of the states of the table, one for each frame. See
+                   `PeriodicTable.set_state` for the format. This can be a
+                   generator, so the states don't need to be held in memory either.
+    :param dpi: Resolution of the frames. The table is 20 by 12 inches.
+    :param table: PeriodicTable to draw. Defaults to a new table, made with
+                  `table_kwargs`.
+    :param table_kwargs: Keyword arguments passed to PeriodicTable, to set the labels
+                         and colors.
+    :return: Generator of the RGBA arrays of each frame. Each is a view of the
+             table's canvas (see `PeriodicTable.to_array`), which is drawn over for
+             the next frame, so copy it to keep it.
+    """
+    if table is None:
+        from .periodic_table import PeriodicTable
+
+        table = PeriodicTable(**table_kwargs)
+    last_key = frame = None
+    for state in states:
+        key = _state_key(state, table._fractions)
+        if key != last_key:
+            table.set_state(state)
+            frame = table.to_array(dpi)
+            last_key = key
+        yield frame
+
+
+def write_animation(states, savename, fps=2, dpi=100, **table_kwargs):
+    """
+    Draw an animation and save it, writing each frame as soon as it's drawn.
+
+    Unlike `save_animation`, only one frame is held in memory at a time, so this
+    can make animations of any length.
+
+    :param states: Iterable of the states of the table, one for each frame. See
+                   `stream_frames`.
+    :param savename: Path to save the animation to. The extension determines the
+                     format. See `writers.open_writer`.
+    :param fps: Frames per second.
+    :param dpi: Resolution of the frames. The table is 20 by 12 inches.
+    :param table_kwargs: Keyword arguments passed to PeriodicTable, to set the labels
+                         and colors.
+    :return: Number of frames written.
+    :rtype: int
+    """
+    with writers.open_writer(savename, fps) as writer:
+        for frame in stream_frames(states, dpi, **table_kwargs):
+            writer.write(frame)
+    return writer.frames
+
+
+def fraction_series(keyframes, n_frames=None, key_times=None):
+    """
+    Get the fractions of every element in each frame of an animation, by
+    interpolating between keyframes.
+
+    The frames are made one at a time as they are needed, so long animations don't
+    hold all of them in memory.
+
+    :param keyframes: Array of shape (n_keyframes, n_elements, n_sources) holding the
+                      fractions at each keyframe, in the layout of
+                      `catalog.fractions`. Each keyframe is checked, and so are the
+                      frames between each pair of keyframes, which have the sources
+                      of both. So an element can't change from two sources to a
+                      different one without passing through a keyframe in between,
+                      except He and Li, which can have more than two.
+    :param n_frames: Number of frames, spread evenly in time from the first keyframe
+                     to the last. Defaults to one frame per keyframe, so a series
+                     that already has every frame can be given as the keyframes.
+    :param key_times: Time of each keyframe, in increasing order. Defaults to evenly
+                      spaced keyframes.
+    :return: Generator of the fractions of each frame.
+    """
+    keyframes = np.asarray(keyframes, dtype=float)
+    if keyframes.ndim != 3 or keyframes.shape[1:] != catalog.fractions.shape:
+        raise ValueError(
+            "Keyframes must have shape (n_keyframes, {}, {}).".format(
+                *catalog.fractions.shape
+            )
+        )
+    for idx, keyframe in enumerate(keyframes):
+        try:
+            catalog.check_fractions(keyframe, catalog.symbols)
+        except ValueError as error:
+            raise ValueError("Keyframe {}: {}".format(idx, error))
+    for idx in range(len(keyframes) - 1):
+        # every frame strictly between two keyframes has the same sources, so one
+        # of them checks them all
+        try:
+            catalog.check_fractions(
+                keyframes[idx : idx + 2].mean(axis=0), catalog.symbols
+            )
+        except ValueError as error:
+            raise ValueError(
+                "Frames between keyframes {} and {}: {}".format(idx, idx + 1, error)
+            )
+    if key_times is None:
+        key_times = np.arange(len(keyframes))
+    key_times = np.asarray(key_times, dtype=float)
+    if key_times.shape != (len(keyframes),) or np.any(np.diff(key_times) <= 0):
+        raise ValueError("There must be one increasing time for each keyframe.")
+    if n_frames is None:
+        n_frames = len(keyframes)
+    return _interpolate(keyframes, key_times, n_frames)
+
+
+def _interpolate(keyframes, key_times, n_frames):
+    """
+    Interpolate between keyframes. See `fraction_series`.
+
+    :return: Generator of the fractions of each frame.
+    """
+    if len(keyframes) == 1:
+        for _ in range(n_frames):
+            yield keyframes[0]
+        return
+    for time in np.linspace(key_times[0], key_times[-1], n_frames):
+        idx = np.clip(np.searchsorted(key_times, time, side="right") - 1, 0, None)
+        idx = min(idx, len(keyframes) - 2)
+        weight = (time - key_times[idx]) / (key_times[idx + 1] - key_times[idx])
+        frame = (1 - weight) * keyframes[idx] + weight * keyframes[idx + 1]
+        # rounding can put fractions just outside of 0 to 1
+        yield np.clip(frame, 0, 1)
+
+
+def evolution_frames(table, series):
+    """
+    Draw a table with changing fractions, one frame at a time.
+
+    The table is changed in place with `PeriodicTable.set_fractions`, which checks
+    the fractions of each frame, and only moves the fills of elements whose
+    fractions changed, so nothing is built again between frames.
+
+    :param table: PeriodicTable to draw. It is left with the last fractions.
+    :param series: Iterable of the fractions of each frame, like the result of
+                   `fraction_series`.
+    :return: Generator of the RGB arrays of each frame.
+    """
+    for fractions in series:
+        table.set_fractions(fractions)
+        yield _draw(table)
+
+
+def save_evolution(
+    keyframes,
+    savename,
+    n_frames=None,
+    key_times=None,
+    state=None,
+    fps=24,
+    dpi=100,
+    **table_kwargs
+):
+    """
+    Save an animation of the fractions changing over time.
+
+    One table is built, and the frames are written as they are drawn.
+
+    :param keyframes: Fractions at each keyframe. See `fraction_series`.
+    :param savename: Path to save the animation to. The extension determines the
+                     format. See `writers.open_writer`.
+    :param n_frames: Number of frames. See `fraction_series`.
+    :param key_times: Time of each keyframe. See `fraction_series`.
+    :param state: State of the table, in the format used by
+                  `PeriodicTable.set_state`. Defaults to showing all sources.
+    :param fps: Frames per second.
+    :param dpi: Resolution of the frames. The table is 20 by 12 inches.
+    :param table_kwargs: Keyword arguments passed to PeriodicTable, to set the labels
+                         and colors.
+    :return: None
+    """
+    from .periodic_table import PeriodicTable
+
+    series = fraction_series(keyframes, n_frames, key_times)
+    with writers.open_writer(savename, fps) as writer:
+        table = PeriodicTable(**table_kwargs)
+        table.get_figure().set_dpi(dpi)
+        if state is None:
+            state = {"sources": catalog.sources}
+        table.set_state(state)
+        for frame in evolution_frames(table, series):
+            writer.write(frame)
@@ -0,0 +1,325 @@
+import numpy as np
+from matplotlib import colors as mpl_colors
+
+
+class BatchedCollection(object):
+    """
+    Matplotlib collection whose members can each have their color faded, or be
+    totally hidden from view.
+
+    This does the same job as `ColorChange`, but for many items drawn by a single
+    artist. The state of each member is held in arrays, and the colors of the whole
+    collection are updated at once whenever a member changes.
+    """
+
+    def __init__(self, collection, colors, color_attr="facecolor"):
+        """
+        Initialize the object
+
+        :param collection: Matplotlib collection that will be modified. It should
+                           already be added to an axis.
+        :param colors: List of colors, one for each member of the collection.
+        :param color_attr: Which color of the collection to modify. Can be
+                           "facecolor" or "edgecolor".
+        """
+        self.collection = collection
+        self._set_color_base = getattr(collection, "set_" + color_attr)
+
+        self.original_colors = mpl_colors.to_rgba_array(colors)
+        self.faded_colors = self.original_colors.copy()
+        self.faded_colors[:, :3] = mpl_colors.to_rgba_array(
+            [_fade_color(tuple(c)) for c in self.original_colors[:, :3]]
+        )[:, :3]
+
+        self.faded = np.zeros(len(self), dtype=bool)
+        self.hidden = np.zeros(len(self), dtype=bool)
+        # The current color of each member. Only the rows of members that change are
+        # rewritten, see `_refresh`
+        self._rgba = self.original_colors.copy()
+        self._update()
+
+    def __len__(self):
+        return len(self.original_colors)
+
+    def item(self, idx):
+        """
+        Get an object representing a single member of this collection.
+
+        :param idx: Index of the member in the collection.
+        :return: Object with the same interface as `ColorChange`
+        :rtype: BatchedItem
+        """
+        return BatchedItem(self, idx)
+
+    def add(self, color):
+        """
+        Add a new member to the end of this collection.
+
+        The caller is responsible for adding whatever is drawn for this member to the
+        matplotlib collection itself.
+
+        :param color: color of the new member
+        :return: Object representing the new member.
+        :rtype: BatchedItem
+        """
+        rgba = mpl_colors.to_rgba(color)
+        faded = mpl_colors.to_rgba(_fade_color(rgba[:3]), rgba[3])
+        self.original_colors = np.concatenate([self.original_colors, [rgba]])
+        self.faded_colors = np.concatenate([self.faded_colors, [faded]])
+        self.faded = np.append(self.faded, False)
+        self.hidden = np.append(self.hidden, False)
+        self._rgba = np.concatenate([self._rgba, [rgba]])
+        self._update()
+        return self.item(len(self) - 1)
+
+    def _colors(self):
+        """
+        Get the current colors of all members.
+
+        :return: Array of RGBA colors, with the alpha of hidden members set to zero.
+        :rtype: np.ndarray
+        """
+        return self._rgba
+
+    def _refresh(self, idx):
+        """
+        Recalculate the current colors of some members after they change.
+
+        :param idx: Index or array of indices of the members that changed.
+        :return: None
+        """
+        idx = np.arange(len(self))[idx]
+        faded = self.faded[idx, np.newaxis]
+        rgba = np.where(faded, self.faded_colors[idx], self.original_colors[idx])
+        rgba[..., 3] = np.where(self.hidden[idx], 0, rgba[..., 3])
+        self._rgba[idx] = rgba
+
+    def _update(self):
+        """
+        Push the current colors of all members to the collection.
+
+        :return: None
+        """
+        # matplotlib may keep the array it is given, so it gets its own copy
+        self._set_color_base(self._colors().copy())
+
+    def fade(self, idx):
+        """
+        Turn the given members to their faded color.
+
+        :param idx: Index or array of indices of the members to modify.
+        :return: None, but the colors are modified
+        """
+        self.faded[idx] = True
+        self._refresh(idx)
+        self._update()
+
+    def unfade(self, idx):
+        """
+        Return the given members to their original color.
+
+        :param idx: Index or array of indices of the members to modify.
+        :return: None, but the colors are modified
+        """
+        self.faded[idx] = False
+        self._refresh(idx)
+        self._update()
+
+    def hide(self, idx):
+        """
+        Hide the given members by setting their alpha to zero.
+
+        :param idx: Index or array of indices of the members to modify.
+        :return: None
+        """
+        self.hidden[idx] = True
+        self._refresh(idx)
+        self._update()
+
+    def unhide(self, idx):
+        """
+        Unhide the given members by reverting their alpha back to the original.
+
+        :param idx: Index or array of indices of the members to modify.
+        :return: None
+        """
+        self.hidden[idx] = False
+        self._refresh(idx)
+        self._update()
+
+    def set_color(self, idx, color):
+        """
+        Set the original color of the given members.
+
+        As with `ColorChange.set_color`, members that are currently faded will show
+        the faded version of this color.
+
+        :param idx: Index or array of indices of the members to modify.
+        :param color: color to be used as the original color
+        :return: None
+        """
+        rgba = mpl_colors.to_rgba(color)
+        self.original_colors[idx] = rgba
+        self.faded_colors[idx] = mpl_colors.to_rgba(_fade_color(rgba[:3]), rgba[3])
+        self._refresh(idx)
+        self._update()
+
+
+class BatchedItem(object):
+    """
+    A single member of a `BatchedCollection`.
+
+    This has the same interface as `ColorChange`, so it can be used interchangeably.
+    """
+
+    __slots__ = ("batch", "idx")
+
+    def __init__(self, batch, idx):
+        """
+        Initialize the object
+
+        :param batch: BatchedCollection this item is a member of.
+        :param idx: Index of this item in the collection.
+        """
+        self.batch = batch
+        self.idx = idx
+
+    @property
+    def faded(self):
+        return bool(self.batch.faded[self.idx])
+
+    @property
+    def hidden(self):
+        return bool(self.batch.hidden[self.idx])
+
+    def fade(self):
+        """
+        Turn this item to it's faded color.
+
+        :return: None, but the color is modified
+        """
+        if not self.faded:  # don't do anything if already faded
+            self.batch.fade(self.idx)
+
+    def unfade(self):
+        """
+        Returns the item to its original color.
+
+        :return: None, but the color is modified.
+        """
+        if self.faded:  # if not currently faded, this does nothing
+            self.batch.unfade(self.idx)
+
+    def hide(self):
+        """
+        Hide this item by setting its alpha to zero.
+
+        :return: None
+        """
+        if not self.hidden:  # don't do anything if already hidden
+            self.batch.hide(self.idx)
+
+    def unhide(self):
+        """
+        Unhide this item by reverting its alpha value back to the original.
+
+        :return: None
+        """
+        if self.hidden:  # if not currently hidden, this does nothing
+            self.batch.unhide(self.idx)
+
+    def set_color(self, color):
+        """
+        Set the color of this item. See `BatchedCollection.set_color`.
+
+        :param color: color to be used as the original color
+        :return: None
+        """
+        self.batch.set_color(self.idx, color)
+
+
+def fade_all(items, faded):
+    """
+    Fade or unfade many items at once.
+
+    Items that are members of the same `BatchedCollection` are changed together, so
+    each collection is only updated once rather than once per item.
+
+    :param items: List of `BatchedItem` or `ColorChange` objects.
+    :param faded: Whether to fade the items, rather than unfade them.
+    :return: None
+    """
+    batches, singles = _group(items)
+    for item in singles:
+        if faded:
+            item.fade()
+        else:
+            item.unfade()
+    for batch, idx in batches.items():
+        if faded:
+            batch.fade(idx)
+        else:
+            batch.unfade(idx)
+
+
+def hide_all(items, hidden):
+    """
+    Hide or unhide many items at once. See `fade_all`.
+
+    :param items: List of `BatchedItem` or `ColorChange` objects.
+    :param hidden: Whether to hide the items, rather than unhide them.
+    :return: None
+    """
+    batches, singles = _group(items)
+    for item in singles:
+        if hidden:
+            item.hide()
+        else:
+            item.unhide()
+    for batch, idx in batches.items():
+        if hidden:
+            batch.hide(idx)
+        else:
+            batch.unhide(idx)
+
+
+def _group(items):
+    """
+    Group batched items by the collection they are members of.
+
+    :param items: List of `BatchedItem` or `ColorChange` objects.
+    :return: Dictionary with the collections as keys, holding arrays of the indices
+             of their members, and the list of the items that aren't batched.
+    :rtype: tuple
+    """
+    batches = dict()
+    singles = []
+    for item in items:
+        if isinstance(item, BatchedItem):
+            batches.setdefault(item.batch, []).append(item.idx)
+        else:
+            singles.append(item)
+    return {batch: np.array(idx) for batch, idx in batches.items()}, singles
+
+
+# The faded version of each color is shared by everything on every table, since only
+# a handful of distinct colors are used.
+_faded_colors = dict()
+
+
+def _fade_color(color):
+    """
+    Get the faded version of a color, using a table of previously faded colors.
+
+    :param color: Color to fade, in any format matplotlib understands.
+    :return: Faded color.
+    """
+    # arrays and lists can't be looked up, so they're converted to tuples
+    key = color if isinstance(color, str) else tuple(np.ravel(color).tolist())
+    try:
+        return _faded_colors[key]
+    except KeyError:
+        from .style import fade_color
+
+        _faded_colors[key] = fade_color(color)
+        return _faded_colors[key]
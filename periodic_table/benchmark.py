@@ -0,0 +1,476 @@
+"""
+Measure how long the main operations on the table take, and how much memory they
+use, so that changes can be compared against earlier results.
+
+Run it with `python -m periodic_table.benchmark`. Results are appended to a JSON
+file (see `--results`) along with the commit they were measured at, and each run is
+compared against an earlier one. The run fails if anything got slower or uses more
+memory by more than the allowed fraction, so it can be used as a check before
+trusting an optimization.
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from . import catalog
+from . import geometry
+
+# Resolutions the table is saved at
+save_dpis = [50, 100, 300]
+save_formats = ["png", "pdf", "svg"]
+
+
+def readme_states():
+    """
+    Get the states of a walk through the table like the one in the README: sources
+    added one at a time, each source highlighted in turn, some elements isolated,
+    and finally a source removed.
+
+    :return: List of states, in the format used by `PeriodicTable.set_state`.
+    :rtype: list
+    """
+    order = ["bb", "cr", "low mass", "snii", "snia", "r", "unstable"]
+    states = [{"sources": []}]
+    for idx in range(len(order)):
+        states.append({"sources": order[: idx + 1]})
+    for source in order:
+        states.append({"sources": order, "highlight": source})
+    states.append({"sources": order, "isolate": ["Au", "Ag", "Pt"]})
+    states.append(
+        {"sources": order, "isolate": ["Au", "Ag", "Pt"], "isolate_label": True}
+    )
+    states.append({"sources": order, "highlight": "r", "isolate": ["Eu"]})
+    states.append({"sources": order})
+    states.append({"sources": order[:-1]})
+    return states
+
+
+def _measure(function, setup, repeat):
+    """
+    Time a function and measure the peak memory it allocates.
+
+    :param function: Function to measure. It's called with the result of `setup`.
+    :param setup: Function called before each call of `function`, which isn't
+                  included in the measurements.
+    :param repeat: How many times to call the function. The memory is only measured
+                   on an extra call, since tracing allocations slows things down.
+    :return: Dictionary with the median and minimum time in seconds ("median_s"
+             and "min_s"), the peak memory in bytes ("peak_bytes"), and the memory
+             still used by what the function returned ("retained_bytes").
+    :rtype: dict
+    """
+    times = []
+    for _ in range(repeat):
+        arg = setup()
+        start = time.perf_counter()
+        function(arg)
+        times.append(time.perf_counter() - start)
+
+    arg = setup()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = function(arg)
+        # what the result holds on to, like the memory of a newly built table
+        gc.collect()
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return {
+        "median_s": float(np.median(times)),
+        "min_s": float(np.min(times)),
+        "peak_bytes": int(peak),
+        "retained_bytes": int(retained),
+    }
+
+
+def _mouse(interactive, name, symbol, button=1):
+    """
+    Send a mouse event to an interactive table, like the user moving or clicking.
+
+    :param interactive: InteractiveTable to send the event to.
+    :param name: Name of the matplotlib event.
+    :param symbol: Symbol of the element the event is on, or None for outside the
+                   elements.
+    :param button: Mouse button pressed, for clicks.
+    :return: None
+    """
+    from matplotlib.backend_bases import MouseEvent
+
+    if symbol is None:
+        x, y = 10.5, 10.5
+    else:
+        elt = interactive.table.elts[catalog.index(symbol)]
+        x, y = elt.column + 0.5, elt.row + 0.5
+    ax = interactive.table._ax
+    x_px, y_px = ax.transData.transform((x, y))
+    canvas = interactive.canvas
+    canvas.callbacks.process(name, MouseEvent(name, canvas, x_px, y_px, button=button))
+
+
+def benchmarks():
+    """
+    Get all the benchmarks.
+
+    :return: Dictionary with the name of each benchmark as keys, holding pairs of
+             the function to measure and a setup function whose result is passed
+             to it.
+    :rtype: dict
+    """
+    from .periodic_table import PeriodicTable
+
+    table = PeriodicTable()
+
+    def nothing():
+        return None
+
+    def empty_table():
+        table.set_state({})
+        return table
+
+    def full_table():
+        table.set_state({"sources": ["bb", "cr", "low mass", "snii", "snia", "r"]})
+        return table
+
+    def highlighted_table():
+        state = full_table().get_state()
+        table.set_state(dict(state, highlight="r", isolate=["Au", "Pt"]))
+        return table
+
+    def fill_each_element(_):
+        # The fills were once calculated one element at a time, so this shows the
+        # overhead of doing that rather than all elements at once.
+        for idx in range(len(catalog.elements)):
+            geometry.fill_vertices(
+                catalog.fractions[idx : idx + 1],
+                catalog.columns[idx : idx + 1],
+                catalog.rows[idx : idx + 1],
+            )
+
+    def readme_frames(t):
+        canvas = t.get_figure().canvas
+        for state in readme_states():
+            t.set_state(state)
+            canvas.draw()
+
+    # fractions with a few elements changed, like one frame of an animation of the
+    # fractions over time. They get the fractions of elements from the other end of
+    # the catalog.
+    changed_fractions = np.array(catalog.fractions)
+    for symbol in ["Eu", "Fe", "O"]:
+        changed_fractions[catalog.index(symbol)] = changed_fractions[::-1][
+            catalog.index(symbol)
+        ]
+
+    def default_fractions():
+        table._change_fractions(catalog.fractions)
+        return full_table()
+
+    def frames_setup():
+        empty_table().get_figure().set_dpi(50)
+        return table
+
+    # The interactive table has its own table, since it changes how the artists are
+    # drawn. It's slow to start, so it's only made when it's needed.
+    live = None
+
+    def live_table():
+        nonlocal live
+        if live is None:
+            from .interactive import InteractiveTable
+
+            other = PeriodicTable()
+            other.get_figure().set_dpi(100)
+            other.show_all_sources()
+            live = InteractiveTable(other)
+        return live
+
+    def hovered(symbol):
+        # the cursor on an element, or off the table
+        def setup():
+            interactive = live_table()
+            _mouse(interactive, "motion_notify_event", symbol)
+            return interactive
+
+        return setup
+
+    def clicked(symbol):
+        def setup():
+            interactive = hovered(None)()
+            _mouse(interactive, "button_press_event", symbol)
+            return interactive
+
+        return setup
+
+    def showing(sources):
+        def setup():
+            interactive = clicked(None)()
+            interactive.table.set_state({"sources": sources})
+            interactive.update()
+            return interactive
+
+        return setup
+
+    def show_all(interactive):
+        interactive.table.show_all_sources()
+        interactive.update()
+
+    def unshow_all(interactive):
+        interactive.table.unshow_all_sources()
+        interactive.update()
+
+    cases = {
+        "construct": (lambda _: PeriodicTable(), nothing),
+        "fill_all_elements": (
+            lambda _: geometry.fill_vertices(
+                catalog.fractions, catalog.columns, 11 - catalog.rows
+            ),
+            nothing,
+        ),
+        "fill_each_element": (fill_each_element, nothing),
+        "show_all_sources": (lambda t: t.show_all_sources(), empty_table),
+        "unshow_all_sources": (lambda t: t.unshow_all_sources(), full_table),
+        "highlight_source": (lambda t: t.highlight_source("snii"), full_table),
+        "isolate_elt_label": (
+            lambda t: t.isolate_elt_label("Au", "Pt"),
+            highlighted_table,
+        ),
+        "to_svg": (lambda t: t.to_svg(), highlighted_table),
+        "to_array_100": (lambda t: t.to_array(100), highlighted_table),
+        "readme_frames": (readme_frames, frames_setup),
+        "change_fractions": (
+            lambda t: t._change_fractions(changed_fractions),
+            default_fractions,
+        ),
+        "set_fractions": (
+            lambda t: t.set_fractions("Eu", s=0.9, r=0.1),
+            default_fractions,
+        ),
+        # moving from one element to another only changes those two
+        "interactive_hover": (
+            lambda i: _mouse(i, "motion_notify_event", "Au"),
+            hovered("Fe"),
+        ),
+        # moving onto the table fades every other element
+        "interactive_enter": (
+            lambda i: _mouse(i, "motion_notify_event", "Au"),
+            hovered(None),
+        ),
+        "interactive_click": (
+            lambda i: _mouse(i, "button_press_event", "Eu"),
+            clicked(None),
+        ),
+        "interactive_show": (show_all, showing([])),
+        "interactive_unshow": (unshow_all, showing(catalog.sources)),
+    }
+    for format in save_formats:
+        # the dpi doesn't change SVGs and PDFs much, so they're only saved once
+        dpis = save_dpis if format == "png" else save_dpis[:1]
+        for dpi in dpis:
+            cases["save_{}_{}".format(format, dpi)] = (
+                lambda t, format=format, dpi=dpi: t.to_bytes(format, dpi),
+                highlighted_table,
+            )
+    return cases
+
+
+def run(names=None, repeat=5):
+    """
+    Run the benchmarks.
+
+    :param names: List of the names of the benchmarks to run. Defaults to all of
+                  them. See `benchmarks`.
+    :param repeat: How many times to time each benchmark.
+    :return: Dictionary with the name of each benchmark as keys, holding its
+             measurements. See `_measure`.
+    :rtype: dict
+    """
+    cases = benchmarks()
+    if names is None:
+        names = list(cases)
+    for name in names:
+        if name not in cases:
+            raise ValueError("Benchmark {} not found.".format(name))
+    return {name: _measure(*cases[name], repeat=repeat) for name in names}
+
+
+def compare(results, baseline, tolerance=0.25, memory_tolerance=None):
+    """
+    Find the benchmarks that got worse compared to earlier results.
+
+    Times are compared with the medians. Benchmarks that are only in one of the
+    results are left out.
+
+    :param results: Results of `run`.
+    :param baseline: Earlier results of `run` to compare against.
+    :param tolerance: Fraction that a benchmark can get slower by before it counts
+                      as a regression.
+    :param memory_tolerance: Fraction that the peak memory can grow by before it
+                             counts as a regression. Defaults to `tolerance`.
+    :return: List of descriptions of each regression. This is empty if nothing
+             got worse.
+    :rtype: list
+    """
+    if memory_tolerance is None:
+        memory_tolerance = tolerance
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        old = baseline[name]
+        checks = [
+            ("time", "median_s", tolerance, "{:.4g} s"),
+            ("memory", "peak_bytes", memory_tolerance, "{:.0f} bytes"),
+            ("retained memory", "retained_bytes", memory_tolerance, "{:.0f} bytes"),
+        ]
+        for kind, key, allowed, unit in checks:
+            # results stored before a measurement was added can't be compared
+            if key not in old or key not in result:
+                continue
+            if result[key] > old[key] * (1 + allowed):
+                regressions.append(
+                    "{}: {} went from {} to {} ({:+.0%})".format(
+                        name,
+                        kind,
+                        unit.format(old[key]),
+                        unit.format(result[key]),
+                        result[key] / old[key] - 1,
+                    )
+                )
+    return regressions
+
+
+def _commit():
+    """
+    Get the commit the code is at, if this is a git checkout.
+
+    :return: The commit hash, or None.
+    """
+    try:
+        output = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.stdout.strip()
+
+
+def load_runs(path):
+    """
+    Load the stored results of earlier runs.
+
+    :param path: Path of the results file.
+    :return: List of runs, oldest first. Each is a dictionary with the commit
+             ("commit"), the time it was run ("time"), the machine it was run on
+             ("machine"), and the results ("results").
+    :rtype: list
+    """
+    if not os.path.isfile(path):
+        return []
+    with open(path) as in_file:
+        return json.load(in_file)["runs"]
+
+
+def save_run(path, results):
+    """
+    Add the results of a run to the results file.
+
+    :param path: Path of the results file. It's created if it doesn't exist.
+    :param results: Results of `run`.
+    :return: The stored run. See `load_runs`.
+    :rtype: dict
+    """
+    runs = load_runs(path)
+    entry = {
+        "commit": _commit(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": platform.node(),
+        "results": results,
+    }
+    runs.append(entry)
+    with open(path, "w") as out_file:
+        json.dump({"runs": runs}, out_file, indent=1)
+    return entry
+
+
+def find_baseline(runs, commit=None):
+    """
+    Find the run to compare against.
+
+    :param runs: Stored runs. See `load_runs`.
+    :param commit: Commit (or the start of it) whose results to use. Defaults to
+                   the most recent run.
+    :return: The results of the run, or None if there isn't one.
+    :rtype: dict
+    """
+    for entry in reversed(runs):
+        if commit is None or (entry["commit"] or "").startswith(commit):
+            return entry["results"]
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m periodic_table.benchmark",
+        description="Time the main operations on the table, and check for "
+        "regressions against earlier runs.",
+    )
+    parser.add_argument("names", nargs="*", help="Benchmarks to run. Default all.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--results", default="benchmark_results.json")
+    parser.add_argument(
+        "--baseline", default=None, help="Commit to compare against. Default latest."
+    )
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--memory-tolerance", type=float, default=None)
+    parser.add_argument(
+        "--no-save", action="store_true", help="Don't store the results of this run."
+    )
+    parser.add_argument("--list", action="store_true", help="List the benchmarks.")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print("\n".join(benchmarks()))
+        return 0
+
+    baseline = find_baseline(load_runs(args.results), args.baseline)
+    results = run(args.names or None, args.repeat)
+    for name, result in results.items():
+        print(
+            "{:<22} median {:>9.2f} ms  min {:>9.2f} ms  peak {:>7.2f} MB  "
+            "retained {:>7.2f} MB".format(
+                name,
+                result["median_s"] * 1000,
+                result["min_s"] * 1000,
+                result["peak_bytes"] / 1024**2,
+                result["retained_bytes"] / 1024**2,
+            )
+        )
+    if not args.no_save:
+        save_run(args.results, results)
+
+    if baseline is None:
+        print("No earlier results to compare against.")
+        return 0
+    regressions = compare(results, baseline, args.tolerance, args.memory_tolerance)
+    for regression in regressions:
+        print("REGRESSION " + regression)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,261 @@
+"""
+Cache of rendered tables, so that tables that look the same are only rendered once.
+
+Renders are stored under the hash of everything that determines what the output
+looks like (see `PeriodicTable.state_hash`), so a cached render can be reused by
+any table in the same state, including tables in other processes if the cache is
+kept on disk.
+"""
+
+from collections import OrderedDict
+import hashlib
+import json
+import os
+import re
+import threading
+
+import numpy as np
+
+from . import state as table_state
+
+
+def state_hash(state, config, format, dpi):
+    """
+    Get a hash identifying what a table looks like when saved.
+
+    This doesn't need the table itself, so it can be used by processes that don't
+    have one. See `PeriodicTable.state_hash`.
+
+    :param state: Dictionary describing the table, in the format used by
+                  `PeriodicTable.set_state`.
+    :param config: Dictionary of the labels and colors the table was created with,
+                   using the names of the keyword arguments of `PeriodicTable`, and
+                   its "fractions" if they aren't the catalog's.
+    :param format: File format the table will be saved as.
+    :param dpi: Resolution the table will be saved at.
+    :return: Hex digest of the hash.
+    :rtype: str
+    """
+    # The state is hashed as what is visible on the table, so that states that look
+    # the same are equal however they were given, like with sources in a different
+    # order or case, "low mass" rather than "s" and "agb", or elements isolated by
+    # number.
+    fractions = config.get("fractions", None)
+    if fractions is not None:
+        fractions = np.array(fractions)
+    bits = table_state.TableState.encode(state, fractions)
+    key = {
+        "config": config,
+        "elements": bits.elements.tolist(),
+        "labels": bits.labels.tolist(),
+        "connectors_faded": bool(bits.connectors_faded),
+        "format": format.lower(),
+        "dpi": dpi,
+    }
+    # colors can be given as tuples or lists, which are the same in JSON
+    key = json.dumps(key, sort_keys=True, default=str)
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+# Renders are stored on disk under their key, which is a SHA-256 hex digest. Only
+# files named like this are counted or removed, so the cache can share a directory
+# with other files.
+_key_pattern = re.compile("[0-9a-f]{64}")
+
+
+def _is_render(entry):
+    """
+    Whether an entry of the cache's directory is a render.
+
+    :param entry: Entry from `os.scandir`.
+    :return: True if the entry is a file named like a key.
+    :rtype: bool
+    """
+    return entry.is_file() and _key_pattern.fullmatch(entry.name) is not None
+
+
+class RenderCache(object):
+    """
+    Size limited cache of rendered tables.
+
+    Renders are always kept in memory, and are optionally also written to a
+    directory. When the total size of the renders goes over the limit, the ones that
+    were used least recently are removed. The memory and disk caches each have their
+    own limit. Only renders are counted and removed on disk, so other files in the
+    directory are left alone.
+    """
+
+    def __init__(self, max_bytes=100 * 1024**2, directory=None, max_disk_bytes=None):
+        """
+        Initialize the cache. It will start empty, other than any renders already
+        in `directory`.
+
+        :param max_bytes: Maximum total size of the renders held in memory.
+        :param directory: Directory to also store renders in. If None, renders are
+                          only held in memory.
+        :param max_disk_bytes: Maximum total size of the renders in `directory`.
+                               Defaults to `max_bytes`.
+        """
+        if max_bytes < 0:
+            raise ValueError("max_bytes must be non-negative.")
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.max_disk_bytes = max_bytes if max_disk_bytes is None else max_disk_bytes
+
+        # the order of this dictionary tracks which items were used most recently.
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        # the cache may be shared by threads serving requests
+        self._lock = threading.RLock()
+
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def __len__(self):
+        return len(self._memory)
+
+    def __contains__(self, key):
+        return key in self._memory or (
+            self.directory is not None and os.path.isfile(self._path(key))
+        )
+
+    @property
+    def nbytes(self):
+        """
+        Total size of the renders held in memory.
+        """
+        return self._memory_bytes
+
+    def _path(self, key):
+        return os.path.join(self.directory, key)
+
+    def get(self, key):
+        """
+        Get a render from the cache.
+
+        This does not count as a hit or miss. See `render`.
+
+        :param key: Hash of the table state.
+        :return: The rendered bytes, or None if they aren't in the cache.
+        """
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+            if self.directory is None:
+                return None
+            try:
+                with open(self._path(key), "rb") as in_file:
+                    data = in_file.read()
+            except FileNotFoundError:
+                return None
+            # mark it as recently used on disk, then bring it into memory
+            os.utime(self._path(key))
+            self._put_memory(key, data)
+            return data
+
+    def put(self, key, data):
+        """
+        Add a render to the cache.
+
+        :param key: Hash of the table state.
+        :param data: The rendered bytes.
+        :return: None
+        """
+        with self._lock:
+            self._put_memory(key, data)
+            if self.directory is not None:
+                # write to a temporary file first, so other processes never read a
+                # partially written render
+                temp_path = self._path(key) + ".{}.tmp".format(os.getpid())
+                with open(temp_path, "wb") as out_file:
+                    out_file.write(data)
+                os.replace(temp_path, self._path(key))
+                self._evict_disk(keep=key)
+
+    def _put_memory(self, key, data):
+        """
+        Add a render to the memory cache, then remove old ones if it's too big.
+
+        :param key: Hash of the table state.
+        :param data: The rendered bytes.
+        :return: None
+        """
+        if key in self._memory:
+            self._memory_bytes -= len(self._memory.pop(key))
+        # renders bigger than the whole cache are not kept in memory
+        if len(data) > self.max_bytes:
+            return
+        self._memory[key] = data
+        self._memory_bytes += len(data)
+        while self._memory_bytes > self.max_bytes:
+            _, old = self._memory.popitem(last=False)
+            self._memory_bytes -= len(old)
+
+    def _evict_disk(self, keep):
+        """
+        Remove the least recently used renders from the directory until it is under
+        the size limit.
+
+        :param keep: Key of a render to never remove, since it was just added. File
+                     times can be coarse, so it may look as old as the others.
+        :return: None
+        """
+        entries = []
+        for entry in os.scandir(self.directory):
+            if _is_render(entry) and entry.name != keep:
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        total += os.path.getsize(self._path(keep))
+        for _, size, path in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:  # another process got to it first
+                pass
+            total -= size
+
+    def render(self, table, format="png", dpi=None):
+        """
+        Render a table, using the cached render if the table has been rendered in
+        this state before.
+
+        :param table: PeriodicTable to render.
+        :param format: File format to render.
+        :param dpi: Resolution to render at. Defaults to the dpi used by
+                    `PeriodicTable.save`.
+        :return: The contents of the file.
+        :rtype: bytes
+        """
+        key = table.state_hash(format, dpi)
+        data = self.get(key)
+        with self._lock:
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if data is None:
+            data = table.to_bytes(format, dpi)
+            self.put(key, data)
+        return data
+
+    def clear(self):
+        """
+        Remove all renders from the cache, including any on disk. Other files in the
+        directory are left alone. This also resets the hit and miss counters.
+
+        :return: None
+        """
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            self.hits = 0
+            self.misses = 0
+            if self.directory is not None:
+                for entry in os.scandir(self.directory):
+                    if _is_render(entry):
+                        os.remove(entry.path)
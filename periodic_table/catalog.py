@@ -0,0 +1,326 @@
+"""
+The elements and the fraction of each element's abundance that comes from each source.
+
+This module only holds data, so it can be used without importing any of the plotting
+libraries.
+
+The catalog is also held as aligned arrays (`numbers`, `symbols`, `rows`, `columns`,
+`periods`, and the `fractions` matrix), so questions about all the elements can be
+answered with single NumPy operations.
+"""
+
+from types import MappingProxyType
+
+import numpy as np
+
+# The sources that can contribute to each element's abundance.
+sources = ["bb", "cr", "snii", "snia", "agb", "s", "r", "unstable"]
+
+# Element fractions come from Jennifer Johnson
+# https://science.sciencemag.org/content/363/6426/474
+# specifically table S1
+# https://science.sciencemag.org/content/sci/suppl/2019/01/30/363.6426.474.DC1/aau9540-Johnson-SM.pdf
+
+# Each entry is (number, symbol, row, column, fractions), where the row and column
+# are the location of the element on the table. Sources that don't contribute to an
+# element are left out of its fractions.
+elements = (
+    (1, "H", 1, 1, {"bb": 1.00}),
+    (2, "He", 1, 18, {"bb": 0.90, "snii": 0.05, "agb": 0.05}),
+    (3, "Li", 2, 1, {"bb": 0.25, "agb": 0.6, "cr": 0.15}),
+    (4, "Be", 2, 2, {"cr": 1.00}),
+    (5, "B", 2, 13, {"cr": 1.00}),
+    (6, "C", 2, 14, {"agb": 0.75, "snii": 0.25}),
+    (7, "N", 2, 15, {"agb": 0.75, "snii": 0.25}),
+    (8, "O", 2, 16, {"snii": 1.0}),
+    (9, "F", 2, 17, {"snii": 1.0}),
+    (10, "Ne", 2, 18, {"snii": 1.0}),
+    (11, "Na", 3, 1, {"snii": 1.0}),
+    (12, "Mg", 3, 2, {"snii": 0.99, "snia": 0.01}),
+    (13, "Al", 3, 13, {"snii": 1.0}),
+    (14, "Si", 3, 14, {"snii": 0.70, "snia": 0.30}),
+    (15, "P", 3, 15, {"snii": 0.97, "snia": 0.03}),
+    (16, "S", 3, 16, {"snii": 0.57, "snia": 0.43}),
+    (17, "Cl", 3, 17, {"snii": 0.83, "snia": 0.17}),
+    (18, "Ar", 3, 18, {"snii": 0.56, "snia": 0.44}),
+    (19, "K", 4, 1, {"snii": 0.81, "snia": 0.19}),
+    (20, "Ca", 4, 2, {"snii": 0.50, "snia": 0.50}),
+    (21, "Sc", 4, 3, {"snii": 0.81, "snia": 0.19}),
+    (22, "Ti", 4, 4, {"snii": 0.34, "snia": 0.66}),
+    (23, "V", 4, 5, {"snii": 0.26, "snia": 0.74}),
+    (24, "Cr", 4, 6, {"snii": 0.24, "snia": 0.76}),
+    (25, "Mn", 4, 7, {"snii": 0.18, "snia": 0.82}),
+    (26, "Fe", 4, 8, {"snii": 0.32, "snia": 0.68}),
+    (27, "Co", 4, 9, {"snii": 0.32, "snia": 0.68}),
+    (28, "Ni", 4, 10, {"snii": 0.29, "snia": 0.71}),
+    (29, "Cu", 4, 11, {"snii": 0.42, "snia": 0.58}),
+    (30, "Zn", 4, 12, {"snii": 0.44, "snia": 0.56}),
+    (31, "Ga", 4, 13, {"snii": 1.0}),
+    (32, "Ge", 4, 14, {"snii": 1.0}),
+    (33, "As", 4, 15, {"snii": 1.0}),
+    (34, "Se", 4, 16, {"snii": 1.0}),
+    (35, "Br", 4, 17, {"snii": 1.0}),
+    (36, "Kr", 4, 18, {"snii": 1.0}),
+    (37, "Rb", 5, 1, {"snii": 1.0}),
+    (38, "Sr", 5, 2, {"s": 0.87, "snii": 0.13}),
+    (39, "Y", 5, 3, {"s": 0.92, "snii": 0.08}),
+    (40, "Zr", 5, 4, {"s": 0.84, "snii": 0.16}),
+    (41, "Nb", 5, 5, {"s": 0.85, "r": 0.15}),
+    (42, "Mo", 5, 6, {"s": 0.62, "r": 0.38}),
+    (43, "Tc", 5, 7, {"unstable": 1.0}),
+    (44, "Ru", 5, 8, {"s": 0.33, "r": 0.67}),
+    (45, "Rh", 5, 9, {"s": 0.14, "r": 0.86}),
+    (46, "Pd", 5, 10, {"s": 0.46, "r": 0.54}),
+    (47, "Ag", 5, 11, {"s": 0.20, "r": 0.80}),
+    (48, "Cd", 5, 12, {"s": 0.53, "r": 0.47}),
+    (49, "In", 5, 13, {"s": 0.36, "r": 0.64}),
+    (50, "Sn", 5, 14, {"s": 0.70, "r": 0.30}),
+    (51, "Sb", 5, 15, {"s": 0.25, "r": 0.75}),
+    (52, "Te", 5, 16, {"s": 0.58, "r": 0.42}),
+    (53, "I", 5, 17, {"s": 0.05, "r": 0.95}),
+    (54, "Xe", 5, 18, {"s": 0.17, "r": 0.83}),
+    (55, "Cs", 6, 1, {"s": 0.15, "r": 0.85}),
+    (56, "Ba", 6, 2, {"s": 0.81, "r": 0.19}),
+    (57, "La", 9, 4, {"s": 0.62, "r": 0.38}),
+    (58, "Ce", 9, 5, {"s": 0.76, "r": 0.24}),
+    (59, "Pr", 9, 6, {"s": 0.49, "r": 0.51}),
+    (60, "Nd", 9, 7, {"s": 0.60, "r": 0.40}),
+    (61, "Pm", 9, 8, {"unstable": 1.0}),
+    (62, "Sm", 9, 9, {"s": 0.30, "r": 0.70}),
+    (63, "Eu", 9, 10, {"s": 0.06, "r": 0.94}),
+    (64, "Gd", 9, 11, {"s": 0.15, "r": 0.85}),
+    (65, "Tb", 9, 12, {"s": 0.07, "r": 0.93}),
+    (66, "Dy", 9, 13, {"s": 0.15, "r": 0.85}),
+    (67, "Ho", 9, 14, {"s": 0.08, "r": 0.92}),
+    (68, "Er", 9, 15, {"s": 0.17, "r": 0.83}),
+    (69, "Tm", 9, 16, {"s": 0.13, "r": 0.87}),
+    (70, "Yb", 9, 17, {"s": 0.33, "r": 0.67}),
+    (71, "Lu", 9, 18, {"s": 0.20, "r": 0.80}),
+    (72, "Hf", 6, 4, {"s": 0.56, "r": 0.44}),
+    (73, "Ta", 6, 5, {"s": 0.41, "r": 0.59}),
+    (74, "W", 6, 6, {"s": 0.56, "r": 0.44}),
+    (75, "Re", 6, 7, {"s": 0.09, "r": 0.91}),
+    (76, "Os", 6, 8, {"s": 0.09, "r": 0.91}),
+    (77, "Ir", 6, 9, {"s": 0.01, "r": 0.99}),
+    (78, "Pt", 6, 10, {"s": 0.05, "r": 0.95}),
+    (79, "Au", 6, 11, {"s": 0.06, "r": 0.94}),
+    (80, "Hg", 6, 12, {"s": 0.61, "r": 0.39}),
+    (81, "Tl", 6, 13, {"s": 0.76, "r": 0.24}),
+    (82, "Pb", 6, 14, {"s": 0.87, "r": 0.13}),
+    (83, "Bi", 6, 15, {"s": 0.26, "r": 0.74}),
+    (84, "Po", 6, 16, {"unstable": 1.0}),
+    (85, "At", 6, 17, {"unstable": 1.0}),
+    (86, "Rn", 6, 18, {"unstable": 1.0}),
+    (87, "Fr", 7, 1, {"unstable": 1.0}),
+    (88, "Ra", 7, 2, {"unstable": 1.0}),
+    (89, "Ac", 10, 4, {"unstable": 1.0}),
+    (90, "Th", 10, 5, {"r": 1.0}),
+    (91, "Pa", 10, 6, {"unstable": 1.0}),
+    (92, "U", 10, 7, {"r": 1.0}),
+    (93, "Np", 10, 8, {"unstable": 1.0}),
+    (94, "Pu", 10, 9, {"r": 1.0}),
+    (95, "Am", 10, 10, {"unstable": 1.0}),
+    (96, "Cm", 10, 11, {"unstable": 1.0}),
+    (97, "Bk", 10, 12, {"unstable": 1.0}),
+    (98, "Cf", 10, 13, {"unstable": 1.0}),
+    (99, "Es", 10, 14, {"unstable": 1.0}),
+    (100, "Fm", 10, 15, {"unstable": 1.0}),
+    (101, "Md", 10, 16, {"unstable": 1.0}),
+    (102, "No", 10, 17, {"unstable": 1.0}),
+    (103, "Lr", 10, 18, {"unstable": 1.0}),
+    (104, "Rf", 7, 4, {"unstable": 1.0}),
+    (105, "Db", 7, 5, {"unstable": 1.0}),
+    (106, "Sg", 7, 6, {"unstable": 1.0}),
+    (107, "Bh", 7, 7, {"unstable": 1.0}),
+    (108, "Hs", 7, 8, {"unstable": 1.0}),
+    (109, "Mt", 7, 9, {"unstable": 1.0}),
+    (110, "Ds", 7, 10, {"unstable": 1.0}),
+    (111, "Rg", 7, 11, {"unstable": 1.0}),
+    (112, "Cn", 7, 12, {"unstable": 1.0}),
+    (113, "Nh", 7, 13, {"unstable": 1.0}),
+    (114, "Fl", 7, 14, {"unstable": 1.0}),
+    (115, "Mc", 7, 15, {"unstable": 1.0}),
+    (116, "Lv", 7, 16, {"unstable": 1.0}),
+    (117, "Ts", 7, 17, {"unstable": 1.0}),
+    (118, "Og", 7, 18, {"unstable": 1.0}),
+)
+
+# The catalog is shared by all tables, so the fractions are made read only.
+elements = tuple(
+    (number, symbol, row, column, MappingProxyType(fracs))
+    for number, symbol, row, column, fracs in elements
+)
+
+# indices to look up elements by symbol and by number
+_symbol_idx = {element[1]: idx for idx, element in enumerate(elements)}
+_number_idx = {element[0]: idx for idx, element in enumerate(elements)}
+# index to look up sources in the columns of `fractions`
+source_idx = {source: idx for idx, source in enumerate(sources)}
+
+# The same catalog as arrays, with one entry for each element in the order of
+# `elements`. The rows and columns are the location of each element on the table.
+numbers = np.array([number for number, _, _, _, _ in elements])
+symbols = np.array([symbol for _, symbol, _, _, _ in elements])
+rows = np.array([row for _, _, row, _, _ in elements])
+columns = np.array([column for _, _, _, column, _ in elements])
+# The Lanthanides and Actinides are shown in rows 9 and 10, below the rest of the
+# table, but they are part of periods 6 and 7.
+periods = np.select([rows == 9, rows == 10], [6, 7], rows)
+# Fraction of each element's abundance from each source, with one row per element and
+# the columns in the order of `sources`.
+fractions = np.array([[fracs.get(s, 0.0) for s in sources] for *_, fracs in elements])
+for _array in [numbers, symbols, rows, columns, periods, fractions]:
+    _array.setflags(write=False)
+
+# Elements are highlighted for a source when more than this fraction of their
+# abundance comes from that source.
+highlight_threshold = 0.5
+
+
+def fraction_errors(fracs, element_symbols):
+    """
+    Find everything wrong with the fractions of some elements.
+
+    All the elements are checked at once, so this is fast even for large tables.
+
+    :param fracs: Array of shape (n_elements, n_sources), with the columns in the
+                  order of `sources`.
+    :param element_symbols: Symbols of the elements.
+    :return: List of pairs of the index of an element with a problem and a
+             description of the problem, in the order of the elements.
+    :rtype: list
+    """
+    fracs = np.asarray(fracs, dtype=float)
+    errors = []
+    rows, cols = np.nonzero((fracs < 0) | (fracs > 1))
+    for idx, s_idx in zip(rows, cols):
+        errors.append(
+            (
+                int(idx),
+                "fraction from {} is {:g}, which is not between 0 and 1".format(
+                    sources[s_idx], fracs[idx, s_idx]
+                ),
+            )
+        )
+    totals = fracs.sum(axis=1)
+    for idx in np.flatnonzero(~np.isclose(totals, 1)):
+        errors.append((int(idx), "fractions sum to {:g}, not 1".format(totals[idx])))
+    # only Li and He have more then 2 sources
+    n_sources = np.count_nonzero(fracs > 0, axis=1)
+    allowed = np.isin(element_symbols, ["He", "Li"])
+    for idx in np.flatnonzero((n_sources > 2) & ~allowed):
+        errors.append(
+            (
+                int(idx),
+                "has {} sources, but more than 2 is not yet implemented".format(
+                    n_sources[idx]
+                ),
+            )
+        )
+    # stable, so each element's problems stay in the order they were found
+    return sorted(errors, key=lambda error: error[0])
+
+
+def check_fractions(fracs, element_symbols):
+    """
+    Check that the fractions of some elements are valid.
+
+    :param fracs: Array of shape (n_elements, n_sources), with the columns in the
+                  order of `sources`.
+    :param element_symbols: Symbols of the elements.
+    :return: None, but raises a ValueError describing every problem if any
+             fractions are invalid.
+    """
+    errors = fraction_errors(fracs, element_symbols)
+    if len(errors) > 0:
+        raise ValueError(
+            "Invalid fractions:\n"
+            + "\n".join(
+                "  {}: {}".format(element_symbols[idx], message)
+                for idx, message in errors
+            )
+        )
+
+
+check_fractions(fractions, symbols)
+
+
+def source_columns(source):
+    """
+    Get the columns of `fractions` that make up a source.
+
+    :param source: Name of the source. "low mass" is both the AGB and S sources.
+    :return: List of the indices of the columns.
+    :rtype: list
+    """
+    if source == "low mass":
+        return [source_idx["agb"], source_idx["s"]]
+    try:
+        return [source_idx[source]]
+    except KeyError:
+        raise ValueError("Source {} not correct.".format(source))
+
+
+def index(element):
+    """
+    Find where an element is in the catalog.
+
+    :param element: Symbol (like "Au") or number (like 79) of the element.
+    :return: Index of the element in `elements` and the catalog arrays.
+    :rtype: int
+    """
+    lookup = _symbol_idx if isinstance(element, str) else _number_idx
+    try:
+        return lookup[element]
+    except (KeyError, TypeError):
+        raise ValueError("Element {} not found.".format(element))
+
+
+def primary(source, threshold=None, fracs=None):
+    """
+    Find which elements get most of their abundance from a source. These are the
+    elements that are highlighted when the source is highlighted.
+
+    :param source: Name of the source. "low mass" is both the AGB and S sources,
+                   and elements primarily from either are included.
+    :param threshold: Elements are included when more than this fraction of their
+                      abundance comes from the source. Defaults to
+                      `highlight_threshold`.
+    :param fracs: Fractions of each element to use, in the layout of
+                  `fractions`. Defaults to the catalog's own. See `datasets`.
+    :return: Array of whether each element gets most of its abundance from the
+             source.
+    :rtype: np.ndarray
+    """
+    if threshold is None:
+        threshold = highlight_threshold
+    if fracs is None:
+        fracs = fractions
+    cols = source_columns(source)
+    return np.any(fracs[:, cols] > threshold, axis=1)
+
+
+def period_totals():
+    """
+    Add up the fractions from each source of all the elements in each period.
+
+    :return: Array of shape (7, n_sources), where row i holds the total of the
+             fractions from each source over the elements in period i + 1.
+    :rtype: np.ndarray
+    """
+    totals = np.zeros((7, len(sources)))
+    np.add.at(totals, periods - 1, fractions)
+    return totals
+
+
+def get_fractions(symbol):
+    """
+    Get the fraction of an element's abundance that comes from each source.
+
+    :param symbol: Symbol of the element, like "Au".
+    :return: Dictionary with the fraction from each source, including those that
+             don't contribute to this element.
+    :rtype: dict
+    """
+    fracs = elements[index(symbol)][4]
+    return {source: fracs.get(source, 0.0) for source in sources}
@@ -0,0 +1,450 @@
+"""
+Datasets of the fraction of each element's abundance that comes from each source.
+
+The table uses the fractions from Johnson (2019) by default (see `catalog`), but
+other nucleosynthesis tables can be loaded from CSV or JSON files and given to the
+table instead:
+
+    from periodic_table import PeriodicTable, datasets
+
+    table = PeriodicTable(dataset=datasets.load("other_table.csv"))
+
+CSV files have a header row naming the columns: "symbol" (or "number", or both)
+and any of the sources in `catalog.sources`. Sources left out, or empty cells, are
+taken to be zero:
+
+    symbol,bb,cr,snii,snia,agb,s,r,unstable
+    H,1.0,,,,,,,
+    He,0.9,,0.05,,0.05,,,
+
+JSON files hold either a list of objects with the same keys as the CSV columns, or
+an object with element symbols as keys and objects of the fractions as values:
+
+    {"H": {"bb": 1.0}, "He": {"bb": 0.9, "snii": 0.05, "agb": 0.05}, ...}
+
+Every element in the catalog must be in the file exactly once. All the rows are
+checked at once, and every problem found is reported with the line (or entry) it is
+on, so a whole file can be fixed in one go.
+
+Parsed datasets are cached in a directory under the hash of the file's contents, so
+loading the same file again, such as in each worker process of an animation, only
+has to read one small binary file. This only needs the catalog, so it can be used
+without the plotting libraries.
+"""
+
+import csv
+import hashlib
+import io
+import json
+import os
+
+import numpy as np
+
+from . import catalog
+
+# Bump this if the layout of the cached files changes, so old ones aren't used.
+_cache_version = 1
+
+
+def default_cache_dir():
+    """
+    Get the directory parsed datasets are cached in when none is given.
+
+    :return: The "periodic_table/datasets" directory in the user's cache
+             directory, which is `$XDG_CACHE_HOME` or "~/.cache".
+    :rtype: str
+    """
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(base, "periodic_table", "datasets")
+
+
+class Dataset(object):
+    """
+    The fraction from each source of every element in the catalog.
+    """
+
+    def __init__(self, fractions, name=None):
+        """
+        :param fractions: Array of shape (n_elements, n_sources), with the rows in
+                          the order of the catalog and the columns in the order of
+                          `catalog.sources`. It is checked here.
+        :param name: Name of the dataset, like the file it came from.
+        """
+        fractions = np.array(fractions, dtype=float)
+        if fractions.shape != catalog.fractions.shape:
+            raise ValueError(
+                "Dataset must have shape {}, not {}.".format(
+                    catalog.fractions.shape, fractions.shape
+                )
+            )
+        catalog.check_fractions(fractions, catalog.symbols)
+        fractions.setflags(write=False)
+        self.fractions = fractions
+        self.name = name
+        self._key = None
+
+    @property
+    def key(self):
+        """
+        Hash of the fractions, which is the same for datasets with the same data.
+        """
+        if self._key is None:
+            self._key = hashlib.sha256(self.fractions.tobytes()).hexdigest()
+        return self._key
+
+    def get_fractions(self, symbol):
+        """
+        Get the fraction of an element's abundance that comes from each source.
+
+        :param symbol: Symbol of the element, like "Au".
+        :return: Dictionary with the fraction from each source.
+        :rtype: dict
+        """
+        fracs = self.fractions[catalog.index(symbol)]
+        return {source: float(frac) for source, frac in zip(catalog.sources, fracs)}
+
+    def primary(self, source, threshold=None):
+        """
+        Find which elements get most of their abundance from a source. See
+        `catalog.primary`.
+
+        :param source: Name of the source.
+        :param threshold: Fraction of the abundance above which elements are
+                          included. Defaults to `catalog.highlight_threshold`.
+        :return: Array of whether each element gets most of its abundance from the
+                 source.
+        :rtype: np.ndarray
+        """
+        return catalog.primary(source, threshold, self.fractions)
+
+    def __eq__(self, other):
+        return isinstance(other, Dataset) and self.key == other.key
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __repr__(self):
+        return "Dataset({!r})".format(self.name)
+
+    def to_csv(self, path):
+        """
+        Write the dataset as a CSV file that `load` can read.
+
+        :param path: Path of the file to write.
+        :return: None
+        """
+        with open(path, "w", newline="") as out_file:
+            writer = csv.writer(out_file)
+            writer.writerow(["number", "symbol"] + catalog.sources)
+            for number, symbol, fracs in zip(
+                catalog.numbers, catalog.symbols, self.fractions
+            ):
+                writer.writerow(
+                    [number, symbol] + ["{:g}".format(f) if f else "" for f in fracs]
+                )
+
+
+# The dataset the catalog holds, used when a table isn't given one.
+johnson2019 = Dataset(catalog.fractions, "johnson2019")
+
+
+def _column_values(cells, name, errors):
+    """
+    Convert a column of text cells to numbers, noting the cells that aren't.
+
+    :param cells: List of the text of each cell.
+    :param name: Name of the column, for error messages.
+    :param errors: List to add a pair of the row index and a description of each
+                   bad cell to.
+    :return: Array of the values, with empty cells as 0 and bad cells as NaN.
+    :rtype: np.ndarray
+    """
+    cells = np.array([cell.strip() for cell in cells], dtype=object)
+    cells[cells == ""] = "0"
+    try:
+        # converting the whole column at once is the common case
+        return cells.astype(float)
+    except ValueError:
+        pass
+    values = np.full(len(cells), np.nan)
+    for idx, cell in enumerate(cells):
+        try:
+            values[idx] = float(cell)
+        except ValueError:
+            errors.append((idx, "{} is {!r}, which is not a number".format(name, cell)))
+    return values
+
+
+def _from_table(columns, where):
+    """
+    Build the fractions of every element from the columns of a table, checking
+    everything about it.
+
+    :param columns: Dictionary of the text of each column of the table, with the
+                    lowercase column names as keys.
+    :param where: Description of each row of the table, like "line 3", for error
+                  messages.
+    :return: Array of the fractions, in the layout of `catalog.fractions`.
+    :rtype: np.ndarray
+    """
+    errors = []
+    for name in columns:
+        if name not in catalog.sources + ["symbol", "number"]:
+            errors.append((None, "unknown column {!r}".format(name)))
+    if "symbol" not in columns and "number" not in columns:
+        errors.append((None, 'there must be a "symbol" or "number" column'))
+    if len(errors) > 0:
+        _raise(errors, where)
+
+    n_rows = len(where)
+    # Find which element each row is, from the symbol, the number, or both
+    idxs = np.full(n_rows, -1)
+    if "number" in columns:
+        numbers = _column_values(columns["number"], "number", errors)
+        for row, number in enumerate(numbers):
+            if np.isnan(number):
+                continue
+            try:
+                idxs[row] = catalog.index(int(number) if number % 1 == 0 else number)
+            except ValueError:
+                errors.append((row, "there is no element {:g}".format(number)))
+    if "symbol" in columns:
+        for row, symbol in enumerate(columns["symbol"]):
+            symbol = symbol.strip()
+            try:
+                idx = catalog.index(symbol)
+            except ValueError:
+                errors.append((row, "there is no element {!r}".format(symbol)))
+                continue
+            if idxs[row] >= 0 and idxs[row] != idx:
+                errors.append(
+                    (
+                        row,
+                        "element {} is {}, not {}".format(
+                            catalog.numbers[idxs[row]],
+                            catalog.symbols[idxs[row]],
+                            symbol,
+                        ),
+                    )
+                )
+            else:
+                idxs[row] = idx
+
+    values = np.zeros((n_rows, len(catalog.sources)))
+    for s_idx, source in enumerate(catalog.sources):
+        if source in columns:
+            values[:, s_idx] = _column_values(columns[source], source, errors)
+
+    # Each element must be in the table once
+    found = idxs >= 0
+    counts = np.bincount(idxs[found], minlength=len(catalog.symbols))
+    for row in np.flatnonzero(found):
+        if counts[idxs[row]] > 1 and row != np.flatnonzero(idxs == idxs[row])[0]:
+            errors.append((row, "{} is repeated".format(catalog.symbols[idxs[row]])))
+    missing = catalog.symbols[counts == 0]
+    if len(missing) > 0:
+        errors.append((None, "missing elements {}".format(", ".join(missing))))
+
+    # Then the fractions themselves, which are only checked once they could all be
+    # read, so that bad cells aren't reported twice.
+    readable = found & ~np.any(np.isnan(values), axis=1)
+    rows = np.flatnonzero(readable)
+    for idx, message in catalog.fraction_errors(
+        values[rows], catalog.symbols[idxs[rows]]
+    ):
+        errors.append((rows[idx], message))
+    if len(errors) > 0:
+        _raise(
+            errors, where, [catalog.symbols[idx] if idx >= 0 else None for idx in idxs]
+        )
+
+    fractions = np.zeros(catalog.fractions.shape)
+    fractions[idxs] = values
+    return fractions
+
+
+def _raise(errors, where, symbols=None):
+    """
+    Raise an error describing every problem with a table.
+
+    :param errors: List of pairs of the row index (or None for problems with the
+                   whole table) and the description of each problem.
+    :param where: Description of each row of the table.
+    :param symbols: Symbol of the element on each row, or None where it's unknown.
+    :return: None, since this always raises a ValueError.
+    """
+    lines = []
+    # problems with the whole table first, then by row
+    for row, message in sorted(
+        errors, key=lambda error: -1 if error[0] is None else error[0]
+    ):
+        if row is None:
+            lines.append("  " + message)
+        elif symbols is not None and symbols[row] is not None:
+            lines.append("  {} ({}): {}".format(where[row], symbols[row], message))
+        else:
+            lines.append("  {}: {}".format(where[row], message))
+    raise ValueError("Invalid dataset:\n" + "\n".join(lines))
+
+
+def parse_csv(text):
+    """
+    Read the fractions from the text of a CSV file. See the top of this module for
+    the format.
+
+    :param text: Contents of the file.
+    :return: Array of the fractions, in the layout of `catalog.fractions`.
+    :rtype: np.ndarray
+    """
+    reader = csv.reader(io.StringIO(text))
+    rows, where = [], []
+    for row in reader:
+        if any(cell.strip() for cell in row):
+            rows.append(row)
+            where.append("line {}".format(reader.line_num))
+    if len(rows) == 0:
+        raise ValueError("Invalid dataset:\n  the file is empty")
+    header = [name.strip().lower() for name in rows[0]]
+    where = where[1:]
+    errors = []
+    for row_idx, row in enumerate(rows[1:]):
+        if len(row) != len(header):
+            errors.append(
+                (
+                    row_idx,
+                    "has {} cells, but there are {} columns".format(
+                        len(row), len(header)
+                    ),
+                )
+            )
+    if len(errors) > 0:
+        _raise(errors, where)
+    cells = list(zip(*rows[1:])) if len(rows) > 1 else [[] for _ in header]
+    return _from_table(dict(zip(header, cells)), where)
+
+
+def parse_json(text):
+    """
+    Read the fractions from the text of a JSON file. See the top of this module for
+    the format.
+
+    :param text: Contents of the file.
+    :return: Array of the fractions, in the layout of `catalog.fractions`.
+    :rtype: np.ndarray
+    """
+    data = json.loads(text)
+    if isinstance(data, dict):
+        where = ["entry {}".format(symbol) for symbol in data]
+        records = []
+        for symbol, fracs in data.items():
+            if not isinstance(fracs, dict):
+                raise ValueError(
+                    "Invalid dataset:\n  entry {} is not an object".format(symbol)
+                )
+            records.append(dict(fracs, symbol=symbol))
+    elif isinstance(data, list):
+        where = ["entry {}".format(idx) for idx in range(len(data))]
+        records = data
+        for idx, record in enumerate(records):
+            if not isinstance(record, dict):
+                raise ValueError(
+                    "Invalid dataset:\n  entry {} is not an object".format(idx)
+                )
+    else:
+        raise ValueError("Invalid dataset:\n  must be a JSON object or list")
+
+    # Put the records in the same form as the columns of a CSV
+    names = []
+    for record in records:
+        for name in record:
+            if name.lower() not in names:
+                names.append(name.lower())
+    columns = {name: [] for name in names}
+    for record in records:
+        record = {name.lower(): value for name, value in record.items()}
+        for name in names:
+            value = record.get(name, "")
+            columns[name].append("" if value is None else str(value))
+    return _from_table(columns, where)
+
+
+def load(path, cache_dir=None):
+    """
+    Load a dataset from a CSV or JSON file.
+
+    The parsed fractions are cached under the hash of the file, so loading the same
+    file again is much faster. The cache is only used if the file is exactly the
+    same, so changed files are always read again.
+
+    :param path: Path of the file. The extension must be ".csv" or ".json".
+    :param cache_dir: Directory to cache parsed datasets in. Defaults to
+                      `default_cache_dir()`. If False, nothing is cached.
+    :return: The dataset.
+    :rtype: Dataset
+    """
+    extension = os.path.splitext(path)[1].lower()
+    parsers = {".csv": parse_csv, ".json": parse_json}
+    if extension not in parsers:
+        raise ValueError("Datasets must be .csv or .json files, not {}".format(path))
+    with open(path, "rb") as in_file:
+        contents = in_file.read()
+    name = os.path.basename(path)
+
+    if cache_dir is None:
+        cache_dir = default_cache_dir()
+    cache_path = None
+    if cache_dir is not False:
+        digest = hashlib.sha256(contents).hexdigest()
+        cache_path = os.path.join(
+            cache_dir, "{}-v{}.npy".format(digest, _cache_version)
+        )
+        fractions = _read_cache(cache_path)
+        if fractions is not None:
+            return Dataset(fractions, name)
+
+    fractions = parsers[extension](contents.decode("utf-8-sig"))
+    if cache_path is not None:
+        _write_cache(cache_path, fractions)
+    return Dataset(fractions, name)
+
+
+def _read_cache(path):
+    """
+    Read cached fractions, if they are there.
+
+    :param path: Path of the cached file.
+    :return: Array of the fractions, or None if the file isn't cached or can't be
+             read.
+    """
+    try:
+        fractions = np.load(path, allow_pickle=False)
+    except (OSError, ValueError):
+        return None
+    if fractions.shape != catalog.fractions.shape:
+        return None
+    return fractions
+
+
+def _write_cache(path, fractions):
+    """
+    Cache parsed fractions. This never fails, since the cache is only to speed
+    things up.
+
+    :param path: Path of the cached file.
+    :param fractions: Array of the fractions.
+    :return: None
+    """
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # write then rename, so other processes never see a partial file
+        temp = "{}.{}.tmp".format(path, os.getpid())
+        with open(temp, "wb") as out_file:
+            np.save(out_file, fractions, allow_pickle=False)
+        os.replace(temp, path)
+    except OSError:
+        pass
@@ -1,12 +1,32 @@
+from collections.abc import Mapping
+
 import numpy as np
 import matplotlib.patheffects as PathEffects
 import betterplotlib as bpl
 
+from .batched import fade_all, _fade_color
+from . import catalog
+from . import style
+
 
 class ColorChange(object):
     """Plot item that can have its color changed to be paler, or totally hidden
     from view."""
 
+    # There are many of these on each table, so they only store what they need.
+    # How to get and set the color depends on the kind of matplotlib object, see
+    # `_kind`
+    __slots__ = (
+        "plot_item",
+        "faded",
+        "hidden",
+        "fade_zorder_change",
+        "_kind",
+        "original_alpha",
+        "original_color",
+        "original_zorder",
+    )
+
     def __init__(self, plot_item, fade_zorder_change=-10):
         """
         Initialize the object
@@ -24,53 +44,67 @@ class ColorChange(object):
         # Then figure out what the functions to modify the color are. This depends
         # on what kind of matplotlib object we have. We do have to check for the
         # special case of the path effects
-        if type(plot_item) != PathEffects.withStroke:
-            try:
-                self.get_color = self.plot_item.get_color
-                self._set_color_base = self.plot_item.set_color
-            except AttributeError:
-                # for facecolor the thing it returns is a different format, so
-                # we have to parse it to make it play nice with the other functions.
-                # It also depends on what kind of thing we have, strangely
-                if len(self.plot_item.get_facecolor()) == 1:
-                    # This returns an array with an array of an RGBA tuple. We extract
-                    # the inner array and ignore alpha
-                    self.get_color = lambda: self.plot_item.get_facecolor()[0][0:3]
-                elif len(self.plot_item.get_facecolor()) == 4:
-                    # here there is no outer array, so we just ignore alpha
-                    self.get_color = lambda: self.plot_item.get_facecolor()[0:3]
-
-                self._set_color_base = self.plot_item.set_facecolor
-
-            # Then set functions to modify the alpha
-            self.get_alpha = self.plot_item.get_alpha
-            self.set_alpha = self.plot_item.set_alpha
-
-            # ... and zorder
-            self.get_zorder = self.plot_item.get_zorder
-            self.set_zorder = self.plot_item.set_zorder
-        else:  # path effects are weird
-            self.get_color = lambda: self.plot_item._gc["foreground"]
-
-            def temp_set_color_base(color):
-                self.plot_item._gc["foreground"] = color
-
-            self._set_color_base = temp_set_color_base
-
-            # alpha and zorderdoesn't work here, use dummy functions
-            self.get_alpha = lambda: 1
-            self.set_alpha = lambda x: None
-            self.get_zorder = lambda: 1
-            self.set_zorder = lambda x: None
-
-        # Then calculate what color and zorder will be used when the object is faded.
-        # We store this now, but it can be modified later if the object's color is
-        # directly changed by the user
+        if type(plot_item) == PathEffects.withStroke:
+            self._kind = "stroke"
+        elif hasattr(plot_item, "get_color"):
+            self._kind = "color"
+        else:
+            self._kind = "face"
+
+        # Then store what color and zorder will be used when the object is faded.
+        # The faded color comes from a table shared by all objects, and follows the
+        # original color if the user changes it.
         self.original_alpha = self.get_alpha()
         self.original_color = self.get_color()
-        self.faded_color = bpl.fade_color(self.original_color)
         self.original_zorder = self.get_zorder()
-        self.faded_zorder = self.original_zorder + self.fade_zorder_change
+
+    @property
+    def faded_color(self):
+        return _fade_color(self.original_color)
+
+    @property
+    def faded_zorder(self):
+        return self.original_zorder + self.fade_zorder_change
+
+    def get_color(self):
+        if self._kind == "color":
+            return self.plot_item.get_color()
+        if self._kind == "stroke":
+            return self.plot_item._gc["foreground"]
+        # for facecolor the thing it returns is a different format, so we have to
+        # parse it to make it play nice with the other functions. It also depends on
+        # what kind of thing we have, strangely. Either way we ignore alpha.
+        facecolor = self.plot_item.get_facecolor()
+        if len(facecolor) == 1:
+            return tuple(facecolor[0][0:3])
+        return tuple(facecolor[0:3])
+
+    def _set_color_base(self, color):
+        if self._kind == "color":
+            self.plot_item.set_color(color)
+        elif self._kind == "stroke":
+            self.plot_item._gc["foreground"] = color
+        else:
+            self.plot_item.set_facecolor(color)
+
+    # alpha and zorder don't work with path effects, so they're ignored for them
+    def get_alpha(self):
+        if self._kind == "stroke":
+            return 1
+        return self.plot_item.get_alpha()
+
+    def set_alpha(self, alpha):
+        if self._kind != "stroke":
+            self.plot_item.set_alpha(alpha)
+
+    def get_zorder(self):
+        if self._kind == "stroke":
+            return 1
+        return self.plot_item.get_zorder()
+
+    def set_zorder(self, zorder):
+        if self._kind != "stroke":
+            self.plot_item.set_zorder(zorder)
 
     def fade(self):
         """
@@ -125,7 +159,6 @@ class ColorChange(object):
         :param color: color to be used as the original color
         """
         self.original_color = color
-        self.faded_color = bpl.fade_color(color)
         if self.faded:
             self._set_color_base(self.faded_color)
         else:
@@ -161,21 +194,57 @@ def box_fraction_line(frac):
     return lambda x: max(min(x + b, 1.0), 0.0)
 
 
+class Fractions(Mapping):
+    """
+    Read only view of an element's fractions, which looks up the fraction from each
+    source by name.
+    """
+
+    __slots__ = ("_fracs",)
+
+    def __init__(self, fracs):
+        """
+        :param fracs: Array of the fraction from each source, in the order of
+                      `catalog.sources`.
+        """
+        self._fracs = fracs
+
+    def __getitem__(self, source):
+        return float(self._fracs[catalog.source_idx[source]])
+
+    def __iter__(self):
+        return iter(catalog.sources)
+
+    def __len__(self):
+        return len(catalog.sources)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
 class Element(object):
-    fontsize = 30
-
-    # The colors used for each source will be shared by the class. Initialize with
-    # default colors. This will be modifed by the periodic table class
-    colors = {
-        "bb": "#D7E5CC",
-        "cr": "#C3DDFA",
-        "snia": "#fe9443",
-        "snii": "#FEE844",
-        "r": "#AFBF75",
-        "s": "#73A0CC",
-        "unstable": "#CCCCCC",
-    }
-    colors["agb"] = colors["s"]
+    fontsize = style.element_fontsize
+
+    # Each table has an Element for every element, so they only store what they need.
+    __slots__ = (
+        "number",
+        "symbol",
+        "row_flip",
+        "row",
+        "column",
+        "hidden",
+        "highlight",
+        "faded",
+        "_fracs",
+        "_shown",
+        "colors",
+        "fills",
+        "ax_name_highlight",
+        "ax_name_highlight_stroke",
+        "ax_name",
+        "ax_num",
+        "box_list",
+    )
 
     def __init__(
         self,
@@ -191,6 +260,7 @@ class Element(object):
         frac_s=0.0,
         frac_r=0.0,
         frac_unstable=0.0,
+        colors=None,
     ):
         """
         Set up the Element class
@@ -209,56 +279,132 @@ class Element(object):
         :param frac_s: Fraction of this element's abundance that comes from S process
         :param frac_r: Fraction of this element's abundance that comes from R process
         :param frac_unstable: This will be 1.0 if the element is not naturally occuring
+        :param colors: Dictionary of the color of each source. The table shares one
+                       dictionary between all its elements, so `set_scheme` changes
+                       all of them. Defaults to a copy of the default colors.
+        """
+        # setup which sources contributed to this element, then double check them
+        fracs = np.array(
+            [
+                [
+                    frac_bb,
+                    frac_cr,
+                    frac_snii,
+                    frac_snia,
+                    frac_agb,
+                    frac_s,
+                    frac_r,
+                    frac_unstable,
+                ]
+            ],
+            dtype=float,
+        )
+        catalog.check_fractions(fracs, [symbol])
+        self._set_up(number, symbol, row, column, fracs[0], colors)
+
+    @classmethod
+    def from_catalog(cls, idx, colors=None, fractions=None):
+        """
+        Create an element from the catalog. Its fractions are a view into
+        `catalog.fractions`, which has already been checked.
+
+        :param idx: Index of the element in the catalog.
+        :param colors: Dictionary of the color of each source. See `__init__`.
+        :param fractions: Fractions of all the elements to take this element's
+                          from, in the layout of `catalog.fractions`. These must
+                          already be checked. Defaults to `catalog.fractions`.
+        :return: The element.
+        :rtype: Element
+        """
+        if fractions is None:
+            fractions = catalog.fractions
+        elt = cls.__new__(cls)
+        elt._set_up(
+            catalog.numbers[idx],
+            catalog.symbols[idx],
+            catalog.rows[idx],
+            catalog.columns[idx],
+            fractions[idx],
+            colors,
+        )
+        return elt
+
+    def _set_up(self, number, symbol, row, column, fracs, colors):
+        """
+        Set the data and initial state of the element.
+
+        :param number: Elemental number (number of protons)
+        :param symbol: Two letter symbol for the element
+        :param row: Row of the periodic table where this element is located.
+        :param column: Column of the periodic table where this element is location.
+        :param fracs: Array of the fraction from each source, in the order of
+                      `catalog.sources`.
+        :param colors: Dictionary of the color of each source, or None.
+        :return: None
         """
         # Set up the element's basic info. We mess around with the indices a little to
-        # match our table's setup.
-        self.number = number
-        self.symbol = symbol
-        self.row_flip = row
-        self.row = 11 - row
-        self.column = column
-
-        # We can hide or highlight this element, but to start neither will be true.
+        # match our table's setup. The values may come from the catalog arrays, so
+        # they're converted to plain Python types.
+        self.number = number.item() if isinstance(number, np.generic) else number
+        self.symbol = symbol.item() if isinstance(symbol, np.generic) else symbol
+        self.row_flip = int(row)
+        self.row = 11 - self.row_flip
+        self.column = int(column)
+
+        # We can hide, highlight, or fade this element, but to start none will be true.
         self.hidden = False
         self.highlight = False
+        self.faded = False
 
-        # setup which sources contributed to this element
-        self.fracs = {
-            "bb": frac_bb,
-            "cr": frac_cr,
-            "snii": frac_snii,
-            "snia": frac_snia,
-            "agb": frac_agb,
-            "s": frac_s,
-            "r": frac_r,
-            "unstable": frac_unstable,
-        }
+        # which sources contributed to this element
+        self._fracs = fracs
+
+        if colors is None:
+            colors = dict(style.default_colors)
+            colors["agb"] = colors["s"]
+        self.colors = colors
 
-        # Then double check this
-        total_fracs = sum(self.fracs.values())
-        if not np.isclose(total_fracs, 1):
-            raise ValueError("Fractions don't sum to 1.")
-        for frac in self.fracs.values():
-            if frac < 0 or frac > 1:
-                raise ValueError("Fractions must be between 0 and 1.")
-        # also check that only Li and He are ones with more then 2 elements
-        nonzero_sources = 0
-        for frac in self.fracs.values():
-            if frac > 0:
-                nonzero_sources += 1
-        if nonzero_sources > 2 and self.symbol not in ["He", "Li"]:
-            raise ValueError(
-                "Element {} has more then 2 sources.".format(self.symbol)
-                + "This is not yet implemented"
-            )
-
-        # None of the sources will be initially shown on the table.
-        self.shown = {source: False for source in self.colors}
+        # None of the sources will be initially shown on the table. This holds one bit
+        # for each source, in the order of `catalog.sources`. See `shown`
+        self._shown = 0
+        # The fills are items of the table's collections, which we only get once the
+        # element is added to a table
         self.fills = dict()
 
         # note that here we don't call setup, since we don't know which axis to put
         # this element on yet.
 
+    @property
+    def fracs(self):
+        """
+        Read only mapping of the fraction of this element from each source.
+        """
+        return Fractions(self._fracs)
+
+    @property
+    def shown(self):
+        """
+        Dictionary of whether each source is shown on this element.
+        """
+        return {
+            source: bool(self._shown & (1 << idx))
+            for idx, source in enumerate(catalog.sources)
+        }
+
+    def set_shown(self, source, shown):
+        """
+        Record whether a source is shown on this element, without changing its fill.
+
+        :param source: Lowercase name of the source.
+        :param shown: Whether the source is shown.
+        :return: None
+        """
+        bit = 1 << catalog.source_idx[source]
+        if shown:
+            self._shown |= bit
+        else:
+            self._shown &= ~bit
+
     def set_scheme(
         self,
         color_bb,
@@ -270,7 +416,9 @@ class Element(object):
         color_unstable,
     ):
         """
-        Set the color scheme for the elements
+        Set the color scheme for the elements. This changes the colors of all the
+        elements that share this element's colors, which is all the elements of a
+        table.
 
         :param color_bb: Color for Big Bang fill
         :param color_cr: Color for cosmic ray fill
@@ -291,95 +439,65 @@ class Element(object):
 
         self.colors["agb"] = self.colors["s"]
 
-    def setup(self, ax):
+    def setup(self, ax, text, lines):
         """
         Add this element to the given axis
 
         :param ax: Axis to add this element to.
+        :param text: TextLayers object that draws all text on this axis.
+        :param lines: LineBatch that draws all lines on this axis.
         :return: None
         """
         # When we highlight the element, the text for the name will be white, with a
-        # black outline. We need to have a separate text object for this.
+        # black outline. This is separate from the regular text, and has separate
+        # objects for the text and the outline.
         highlight_color = "white"
-        highlight_text = ax.add_text(
+        self.ax_name_highlight, self.ax_name_highlight_stroke = text.add_highlight_text(
             x=self.column + 0.5,
             y=self.row + 0.65,
             text=self.symbol,
-            coords="data",
             fontsize=self.fontsize,
             color=highlight_color,
-            horizontalalignment="center",
-            verticalalignment="center",
-            zorder=100,
-        )
-        highlight_text.set_path_effects(
-            [PathEffects.withStroke(linewidth=5, foreground=bpl.almost_black)]
+            stroke_color=bpl.almost_black,
+            linewidth=style.element_highlight_linewidth,
         )
-        # Setting the ColorChange for the highted text is tricky. We should use both
-        # the main object (although I don't think it will matter becase it is white),
-        # but also the path effect that is highlighted.
-        self.ax_name_highlight_stroke = ColorChange(highlight_text._path_effects[0])
-        self.ax_name_highlight = ColorChange(highlight_text)
-        # This highlighted name is originally hidden. This hides the stroke too
+        # This highlighted name is originally hidden.
         self.ax_name_highlight.hide()
+        self.ax_name_highlight_stroke.hide()
 
         # When it's not highlighted, the text is just black. This is basiclly the same
-        # as highlight_text, just without the highlight
-        name = ax.add_text(
+        # as the highlighted text, just without the highlight
+        self.ax_name = text.add_text(
             x=self.column + 0.5,
             y=self.row + 0.65,
             text=self.symbol,
-            coords="data",
-            color=bpl.almost_black,
             fontsize=self.fontsize,
-            horizontalalignment="center",
-            verticalalignment="center",
-            zorder=100,
+            color=bpl.almost_black,
         )
-        self.ax_name = ColorChange(name)
 
         # The number is never highlighted
-        num = ax.add_text(
+        self.ax_num = text.add_text(
             x=self.column + 0.5,
             y=self.row + 0.25,
             text=self.number,
+            fontsize=style.number_fontsize,
             color=bpl.almost_black,
-            coords="data",
-            fontsize=0.6 * self.fontsize,
-            horizontalalignment="center",
-            verticalalignment="center",
         )
-        self.ax_num = ColorChange(num)
 
-        # Then draw the box around the element. This is just a square.
-        box = ax.plot(
+        # Then draw the box around the element. This is just a square. The boxes of
+        # all elements are drawn together by the table's lines.
+        box = lines.add_line(
             [self.column, self.column, self.column + 1, self.column + 1, self.column],
             [self.row, self.row + 1, self.row + 1, self.row, self.row],
-            c=bpl.almost_black,
-            lw=5,
+            bpl.almost_black,
+            style.element_linewidth,
             zorder=100,
         )
-        # We do store these box segmments so they can be faded later.
-        self.box_list = [ColorChange(segment) for segment in box]
-
-        self.ax_name_highlight.hide()
-
-        # fill the box white. This will be the base that's seen when the sources are
-        # hidden.
-        self.white_fill = ax.fill_between(
-            x=[self.column, self.column + 1],
-            y1=self.row,
-            y2=self.row + 1,
-            color="white",
-            alpha=0.5,
-            zorder=-100,
-        )
+        # We do store the box so it can be faded later.
+        self.box_list = [box]
 
-        # then fill the rest
-        self.box_fill(ax)
-        # hide all the fills to start
-        for fills in self.fills.values():
-            fills.hide()
+        # Note that the fills are not made here. They are drawn for all elements at
+        # once by the periodic table, which then stores them in `self.fills`.
 
     def show_source(self, source):
         """
@@ -388,7 +506,7 @@ class Element(object):
         :param source: Which source to show
         :return: None
         """
-        self.shown[source] = True
+        self.set_shown(source, True)
         try:
             self.fills[source].unhide()
         except KeyError:  # this source isn't present.
@@ -403,7 +521,7 @@ class Element(object):
         :param source: Which source to show
         :return: None
         """
-        self.shown[source] = False
+        self.set_shown(source, False)
         try:
             self.fills[source].hide()
         except KeyError:  # this source isn't present.
@@ -411,7 +529,7 @@ class Element(object):
             # raise an error
             pass
 
-    def highlight_bool(self, source):
+    def highlight_bool(self, source, threshold=None):
         """
         Internal function to calculate whether an element has more than 50% contribution
         from a given source
@@ -420,21 +538,17 @@ class Element(object):
         and AGB.
 
         :param source: Which source to check if it needs to be highlighted
+        :param threshold: Fraction the contribution must be over. Defaults to
+                          `catalog.highlight_threshold`.
         :return: Whether or not this source has a greater than 50$ contribution.
         :rtype: bool
         """
         if source is None:
             return False
-        else:
-            highlight_threshold = 0.5
-            # low mass has a special check
-            if source == "low mass":
-                return (
-                    self.fracs["agb"] > highlight_threshold
-                    or self.fracs["s"] > highlight_threshold
-                )
-            else:
-                return self.fracs[source] > highlight_threshold
+        if threshold is None:
+            threshold = catalog.highlight_threshold
+        cols = catalog.source_columns(source)
+        return bool(np.any(self._fracs[cols] > threshold))
 
     def highlight_source(self, source):
         """
@@ -444,30 +558,45 @@ class Element(object):
         :param source: Which source to highlight
         :return: None, but the highlight text is activated
         """
-        self.highlight = self.highlight_bool(source)
+        self.set_highlight(self.highlight_bool(source))
+
+    def set_highlight(self, highlight):
+        """
+        Turn the highlighting of the element name on or off.
+
+        :param highlight: Whether to highlight the name.
+        :return: None
+        """
+        self.highlight = highlight
 
         if self.highlight:
             self.ax_name_highlight.unhide()
+            self.ax_name_highlight_stroke.unhide()
             self.ax_name.hide()
         else:
             self.ax_name_highlight.hide()
+            self.ax_name_highlight_stroke.hide()
             self.ax_name.unhide()
 
+    def parts(self):
+        """
+        Get everything drawn for this element, which is faded along with it.
+
+        :return: List of the box segments, text, and fills of this element.
+        :rtype: list
+        """
+        parts = list(self.box_list)
+        parts += [self.ax_name_highlight, self.ax_name_highlight_stroke]
+        parts += [self.ax_name, self.ax_num]
+        return parts + list(self.fills.values())
+
     def fade(self):
         """
         Fade this element, including all parts of it (name, box, fills)
         :return: None
         """
         self.faded = True
-        for segment in self.box_list:
-            segment.fade()
-        self.ax_name_highlight.fade()
-        self.ax_name_highlight_stroke.fade()
-        self.ax_name.fade()
-        self.ax_num.fade()
-
-        for fill in self.fills.values():
-            fill.fade()
+        fade_all(self.parts(), True)
 
     def unfade(self):
         """
@@ -475,139 +604,4 @@ class Element(object):
         :return: None
         """
         self.faded = False
-        for segment in self.box_list:
-            segment.unfade()
-        self.ax_name_highlight.unfade()
-        self.ax_name_highlight_stroke.unfade()
-        self.ax_name.unfade()
-        self.ax_num.unfade()
-
-        for fill in self.fills.values():
-            fill.unfade()
-
-    def box_fill(self, ax):
-        """
-        Fill in all the polygons that represent the fractions that come from all sources
-
-        :param ax: Axis to do this on
-        :return: None, but the fills are made
-        """
-        # then add certain sources. Here are the rules:
-        # BB: full (except He and Li)
-        # CR: full (except Li)
-        # R: always on top
-        # S: always on bottom
-        # SNIa: Always on bottom
-        # SNII: Always on top
-        # AGB: Always on bottom
-
-        # We do this as follows: For elements that are "under," we fill the entire box
-        # with the representative color. Then for elements that are "over," we fill in
-        # the section from the bottom to the needed line.
-
-        top = ["bb", "cr", "r", "snii", "manmade"]
-        bottom = ["agb", "s", "snia"]
-
-        # setup some x and y values for the plotting
-        x_left = self.column
-        x_right = x_left + 1
-        y_bottom = self.row
-        y_top = y_bottom + 1
-
-        n_points = 1000
-        xs = np.linspace(x_left, x_right, n_points)
-        # the line function needs values between 0 and 1.
-        base_xs = np.linspace(0, 1, n_points)
-
-        # He and Li are special cases with 3 important elements. Handle those first
-        if self.symbol == "He":
-            # Start with the bottom bb line
-            bb_line = [
-                y_bottom + box_fraction_line(self.fracs["bb"])(x) for x in base_xs
-            ]
-            # Then the AGB line will be in the middle. We can use the total fraction
-            # of BB and AGB to get this
-            total_agb_frac = self.fracs["bb"] + self.fracs["agb"]
-            agb_line = [
-                y_bottom + box_fraction_line(total_agb_frac)(x) for x in base_xs
-            ]
-            # Then the rest will be snii
-
-            # We can fill this all in
-            bb = ax.fill_between(
-                x=xs, y1=y_bottom, y2=bb_line, lw=0, color=self.colors["bb"], zorder=1
-            )
-            agb = ax.fill_between(
-                x=xs, y1=bb_line, y2=agb_line, lw=0, color=self.colors["agb"], zorder=1
-            )
-            snii = ax.fill_between(
-                x=xs, y1=agb_line, y2=y_top, lw=0, color=self.colors["snii"], zorder=1
-            )
-
-            self.fills["snii"] = ColorChange(snii)
-            self.fills["agb"] = ColorChange(agb)
-            self.fills["bb"] = ColorChange(bb)
-
-        elif self.symbol == "Li":
-            # Start with the bottom bb line
-            bb_line = [
-                y_bottom + box_fraction_line(self.fracs["bb"])(x) for x in base_xs
-            ]
-            # Then the AGB line will be in the middle. We can use the total fraction
-            # of BB and AGB to get this
-            total_agb_frac = self.fracs["bb"] + self.fracs["agb"]
-            agb_line = [
-                y_bottom + box_fraction_line(total_agb_frac)(x) for x in base_xs
-            ]
-            # Then the rest will be cosmic rays
-
-            # We can fill this all in
-            bb = ax.fill_between(
-                x=xs, y1=y_bottom, y2=bb_line, lw=0, color=self.colors["bb"], zorder=1
-            )
-            agb = ax.fill_between(
-                x=xs, y1=bb_line, y2=agb_line, lw=0, color=self.colors["agb"], zorder=1
-            )
-            cr = ax.fill_between(
-                x=xs, y1=agb_line, y2=y_top, lw=0, color=self.colors["cr"], zorder=1
-            )
-
-            self.fills["cr"] = ColorChange(cr)
-            self.fills["agb"] = ColorChange(agb)
-            self.fills["bb"] = ColorChange(bb)
-
-        else:
-            # go through the ones on top first
-            for source in self.fracs:
-                if self.fracs[source] == 0:
-                    continue
-
-                if source in top:
-                    # We can calculate the line needed for the 1-fraction, then fill
-                    # from the top to that line
-                    line_func = box_fraction_line(1.0 - self.fracs[source])
-                    line_ys = [min(y_bottom + line_func(x), y_top) for x in base_xs]
-
-                    fill = ax.fill_between(
-                        x=xs,
-                        y1=line_ys,
-                        y2=y_top,
-                        lw=0,
-                        color=self.colors[source],
-                        zorder=1,
-                    )
-                    self.fills[source] = ColorChange(fill)
-                else:  # in under
-                    line_ys = [
-                        y_bottom + box_fraction_line(self.fracs[source])(x)
-                        for x in base_xs
-                    ]
-                    fill = ax.fill_between(
-                        x=xs,
-                        y1=y_bottom,
-                        y2=line_ys,
-                        lw=0,
-                        color=self.colors[source],
-                        zorder=1,
-                    )
-                    self.fills[source] = ColorChange(fill)
+        fade_all(self.parts(), False)
@@ -0,0 +1,82 @@
+from matplotlib.collections import Collection, PolyCollection
+from matplotlib.path import Path
+import numpy as np
+
+from .batched import BatchedCollection
+
+
+class FillBatch(BatchedCollection):
+    """
+    Polygons drawn as one matplotlib PolyCollection, each of which can be faded or
+    hidden, and moved in place.
+
+    Each polygon has the same number of vertices. Their vertices are all held in
+    one array, which the paths drawn by matplotlib are views of, so moving the
+    polygons only writes to that array, rather than making new paths.
+    """
+
+    def __init__(self, ax, verts, colors, **kwargs):
+        """
+        Initialize the collection and add it to an axis.
+
+        :param ax: Axis to add the polygons to.
+        :param verts: Array of shape (n_polygons, n_vertices, 2) holding the
+                      vertices of each polygon, in data coordinates. The polygons are
+                      closed automatically.
+        :param colors: List of colors, one for each polygon.
+        :param kwargs: Additional keyword arguments passed to the PolyCollection,
+                       which apply to all polygons.
+        """
+        verts = np.asarray(verts, dtype=float)
+        collection = PolyCollection([], **kwargs)
+        self._n_vertices = verts.shape[1]
+        self._set_vertex_array(collection, verts)
+        ax.add_collection(collection)
+        super(FillBatch, self).__init__(collection, colors)
+
+    def _set_vertex_array(self, collection, verts):
+        """
+        Hold new vertices of all polygons, and make the paths of the collection
+        views of them.
+
+        :param collection: The PolyCollection drawing the polygons.
+        :param verts: Array of shape (n_polygons, n_vertices, 2).
+        :return: None
+        """
+        # the last vertex closes the polygon, as matplotlib does for PolyCollections
+        self._verts = np.concatenate([verts, verts[:, :1]], axis=1)
+        codes = np.full(self._n_vertices + 1, Path.LINETO, dtype=Path.code_type)
+        codes[0] = Path.MOVETO
+        codes[-1] = Path.CLOSEPOLY
+        # The paths are never given a different number of vertices or non-finite
+        # ones, which is all matplotlib works out from the vertices up front, so the
+        # vertices can be changed in place.
+        paths = [Path(xy, codes) for xy in self._verts]
+        # PolyCollection.set_paths would copy the vertices
+        Collection.set_paths(collection, paths)
+
+    def set_vertices(self, idx, verts):
+        """
+        Move polygons in place.
+
+        :param idx: Index or array of indices of the polygons to move.
+        :param verts: Array of the new vertices of each polygon, with shape
+                      (n_vertices, 2) or (len(idx), n_vertices, 2).
+        :return: None
+        """
+        self._verts[idx, :-1] = verts
+        self._verts[idx, -1] = self._verts[idx, 0]
+        self.collection.stale = True
+
+    def add_fill(self, verts, color):
+        """
+        Add a new polygon to the end of the collection.
+
+        :param verts: Array of shape (n_vertices, 2) holding its vertices.
+        :param color: Color of the polygon.
+        :return: Object that can fade or hide this polygon.
+        :rtype: BatchedItem
+        """
+        verts = np.concatenate([self._verts[:, :-1], [verts]])
+        self._set_vertex_array(self.collection, verts)
+        return self.add(color)
@@ -0,0 +1,187 @@
+import numpy as np
+
+# The order of the sources in the fraction arrays used throughout this module. This
+# matches the order of `Element.fracs`.
+from .catalog import sources
+
+# Sources that are drawn from the top of the box down, and those drawn from the
+# bottom of the box up. See `fill_bounds` for how these are used.
+top_sources = ["bb", "cr", "r", "snii", "unstable"]
+bottom_sources = ["agb", "s", "snia"]
+
+# Elements with more than two sources (He and Li) are stacked from the bottom of the
+# box in this order instead.
+stack_order = ["bb", "agb", "cr", "snii", "snia", "s", "r", "unstable"]
+
+
+def fraction_intercepts(fracs):
+    """
+    Calculate the intercepts of the unit slope lines enclosing the given fractions.
+
+    This is the vectorized version of `element.box_fraction_line`. The line enclosing
+    a fraction `frac` of the unit square below it is y = x + b, clipped to the square.
+
+    :param fracs: Array of fractions of the unit square to enclose below the lines.
+    :type fracs: np.ndarray
+    :return: Array of intercepts of the same shape as `fracs`.
+    :rtype: np.ndarray
+    """
+    fracs = np.asarray(fracs, dtype=float)
+    if np.any(fracs < 0) or np.any(fracs > 1):
+        raise ValueError("Frac must be between zero and one.")
+
+    # See `box_fraction_line` for the derivation. The two branches are mirror images
+    # of each other, so we can combine them using the distance from 0.5
+    below = fracs < 0.5
+    dist = np.where(below, 1 - 2 * fracs, 2 * fracs - 1)
+    root = (2 - np.sqrt(4 - 4 * dist)) / 2.0
+    return np.where(below, -root, root)
+
+
+def _line_points(intercepts):
+    """
+    Get the vertices of the clipped unit slope lines, from left to right.
+
+    A line of unit slope clipped to the unit square has at most one kink inside the
+    square: where it leaves the top edge (for positive intercepts) or the bottom edge
+    (for negative intercepts). The line is therefore exactly described by its values
+    at x=0, at the kink, and at x=1.
+
+    :param intercepts: Array of intercepts, with any shape.
+    :return: Array with shape intercepts.shape + (3, 2) holding x and y values.
+    """
+    b = intercepts[..., np.newaxis]
+    x_kink = np.where(b >= 0, 1 - b, -b)
+    xs = np.concatenate([np.zeros_like(b), x_kink, np.ones_like(b)], axis=-1)
+    ys = np.clip(xs + b, 0, 1)
+    return np.stack([xs, ys], axis=-1)
+
+
+def region_vertices(lower_fracs, upper_fracs):
+    """
+    Get the vertices of the regions of the unit square between two fraction lines.
+
+    Each region is the part of the unit square above the line enclosing
+    `lower_fracs` and below the line enclosing `upper_fracs`. It is a convex polygon
+    with at most 6 vertices, which are returned in counterclockwise order. Regions
+    with fewer vertices have some repeated, so that all regions share the same shape.
+
+    :param lower_fracs: Fraction of the square below the bottom of each region.
+    :param upper_fracs: Fraction of the square below the top of each region.
+    :return: Array of shape lower_fracs.shape + (6, 2) holding the vertices.
+    :rtype: np.ndarray
+    """
+    lower = _line_points(fraction_intercepts(lower_fracs))
+    upper = _line_points(fraction_intercepts(upper_fracs))
+    # go left to right along the bottom, then back right to left along the top
+    return np.concatenate([lower, upper[..., ::-1, :]], axis=-2)
+
+
+def fill_bounds(fracs):
+    """
+    Calculate the fraction lines bounding each source's fill within each element.
+
+    The rules for where each source goes in the box are:
+    BB: full (except He and Li)
+    CR: full (except Li)
+    R: always on top
+    S: always on bottom
+    SNIa: Always on bottom
+    SNII: Always on top
+    AGB: Always on bottom
+
+    For elements with more than two sources (He and Li), the sources are instead
+    stacked from the bottom of the box in the order given by `stack_order`.
+
+    :param fracs: Array of shape (n_elements, n_sources), with the columns in the
+                  order of `sources`.
+    :return: Two arrays of the same shape as `fracs`, holding the lower and upper
+             fraction bounding each fill.
+    """
+    fracs = np.asarray(fracs, dtype=float)
+
+    is_top = np.array([source in top_sources for source in sources])
+    lower = np.where(is_top, 1.0 - fracs, 0.0)
+    upper = np.where(is_top, 1.0, fracs)
+
+    # then handle the stacked elements
+    stacked = np.count_nonzero(fracs > 0, axis=1) > 2
+    order = [sources.index(source) for source in stack_order]
+    cumulative = np.empty_like(fracs)
+    cumulative[:, order] = np.cumsum(fracs[:, order], axis=1)
+    # floating point sums can creep just above 1
+    cumulative = np.minimum(cumulative, 1.0)
+    lower = np.where(stacked[:, np.newaxis], cumulative - fracs, lower)
+    upper = np.where(stacked[:, np.newaxis], cumulative, upper)
+    return np.clip(lower, 0, 1), upper
+
+
+def fill_vertices(fracs, columns, rows):
+    """
+    Calculate the vertices of every source fill of every element at once.
+
+    :param fracs: Array of shape (n_elements, n_sources), with the columns in the
+                  order of `sources`.
+    :param columns: Array of the x position of the lower left corner of each element.
+    :param rows: Array of the y position of the lower left corner of each element.
+    :return: Array of shape (n_elements, n_sources, 6, 2) holding the vertices of each
+             fill in data coordinates. Fills of sources with zero fraction are
+             degenerate, and should not be drawn.
+    :rtype: np.ndarray
+    """
+    lower, upper = fill_bounds(fracs)
+    verts = region_vertices(lower, upper)
+    corners = np.stack([columns, rows], axis=-1).astype(float)
+    return verts + corners[:, np.newaxis, np.newaxis, :]
+
+
+# Where the label of each source goes in the grid of labels at the top of the table,
+# as (x index, y index) from the bottom left. The AGB source shares the "s" label.
+label_positions = {
+    "bb": (0, 3),
+    "cr": (1, 3),
+    "s": (0, 2),
+    "snii": (1, 2),
+    "snia": (0, 1),
+    "r": (1, 1),
+    "unstable": (0, 0),
+}
+
+
+def label_box(x_idx, y_idx):
+    """
+    Calculate where a label goes in the space at the top of the table.
+
+    :param x_idx: The x index in the grid of labels. This is not the element
+                  position, this is the index among the labels.
+    :param y_idx: The y index in the grid of labels.
+    :return: The x and y position of the lower left corner of the label's box, and
+             its width and height.
+    :rtype: tuple
+    """
+    spacing = 0.25
+    # The X space for these labels goes from 3 to 13.
+    x_0 = 3
+    x_1 = 13
+    # we need 3 spaces: left, right, center
+    width = ((x_1 - x_0) - 3 * spacing) / 2.0
+
+    # Y space goes from 8 to 11
+    y_0 = 8
+    y_1 = 11
+    # we need 4 spaces: bottom, inbetween the 3 labels. No space at top, it aligns
+    # with the top of the figure.
+    height = ((y_1 - y_0) - 4 * spacing) / 4.0
+
+    # Then figure out where the lower left corner of the box is
+    x = x_0 + spacing * (x_idx + 1) + width * x_idx
+    y = y_0 + spacing * (y_idx + 1) + height * y_idx
+    return x, y, width, height
+
+
+# The x and y points of the lines connecting the Lanthanides and Actinides to the
+# rest of the table.
+connector_lines = [
+    ([3, 3.6666666, 3.666666, 4], [5.5, 5.5, 2.5, 2.5]),
+    ([3, 3.3333333, 3.333333, 4], [4.5, 4.5, 1.5, 1.5]),
+]
@@ -0,0 +1,248 @@
+"""
+Optional instrumentation of the table: how long each phase of building, changing,
+and saving it takes, and how much is drawn.
+
+Timings are only taken when a table is given a metrics callback (see
+`PeriodicTable`), so tables that aren't instrumented don't pay for them. The
+callback is called with the name of each phase, the time it took in seconds, and a
+dictionary of details about it, which makes it easy to forward to a metrics system.
+`log_metrics` sends them to this module's logger at debug level:
+
+    import logging
+    from periodic_table.instrument import log_metrics
+
+    logging.basicConfig(level=logging.DEBUG)
+    table = PeriodicTable(metrics=log_metrics)
+
+The phases are:
+
+- "construct.<part>" for each part of building the table ("elements", "figure",
+  "labels", "element_setup", and "fills"), then "construct" for the whole thing.
+- "state_change" whenever the table changes what is shown, with the number of
+  elements and labels that changed.
+- "draw.<artist class>" for the total time spent drawing each class of artist when
+  the table is saved, with the number of artists of that class, then "save" for the
+  whole save, with the format and dpi.
+- "render" when the table is drawn to its canvas by `to_buffer` or `to_array`,
+  with the dpi, after the "draw.<artist class>" phases of the drawing.
+"""
+
+from collections import OrderedDict
+from contextlib import contextmanager
+import logging
+import time
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def log_metrics(name, seconds, details):
+    """
+    Metrics callback that logs each phase at debug level.
+
+    :param name: Name of the phase.
+    :param seconds: Time the phase took.
+    :param details: Dictionary of details about the phase.
+    :return: None
+    """
+    logger.debug("%s took %.6f s %s", name, seconds, details)
+
+
+class Instruments(object):
+    """
+    Times the phases of a table and reports them to a callback.
+
+    The total time and number of calls of each phase are also kept, see `totals`.
+    """
+
+    def __init__(self, callback=None):
+        """
+        :param callback: Function called as `callback(name, seconds, details)` after
+                         each phase. If None, nothing is timed.
+        """
+        self.callback = callback
+        self.totals = OrderedDict()
+
+    @property
+    def enabled(self):
+        """
+        Whether anything is being timed.
+        """
+        return self.callback is not None
+
+    def report(self, name, seconds, **details):
+        """
+        Record how long a phase took.
+
+        :param name: Name of the phase.
+        :param seconds: Time the phase took.
+        :param details: Anything else to pass to the callback.
+        :return: None
+        """
+        total = self.totals.setdefault(name, {"calls": 0, "seconds": 0.0})
+        total["calls"] += 1
+        total["seconds"] += seconds
+        self.callback(name, seconds, details)
+
+    @contextmanager
+    def phase(self, name, **details):
+        """
+        Time the code in a `with` block.
+
+        :param name: Name of the phase.
+        :param details: Anything else to pass to the callback. The dictionary is
+                        given to the `with` block, so more can be added to it.
+        :return: Context manager giving the details.
+        """
+        if not self.enabled:
+            yield details
+            return
+        start = time.perf_counter()
+        yield details
+        self.report(name, time.perf_counter() - start, **details)
+
+    def laps(self, name):
+        """
+        Start timing a phase made of several parts in a row.
+
+        :param name: Name of the whole phase.
+        :return: Object whose `lap` method is called after each part, and `done`
+                 method at the end.
+        :rtype: Laps
+        """
+        return Laps(self, name)
+
+    @contextmanager
+    def draws(self, artists):
+        """
+        Time how long drawing each class of artist takes, while in a `with` block.
+
+        :param artists: List of the artists to time.
+        :return: Context manager
+        """
+        if not self.enabled:
+            yield
+            return
+        times = OrderedDict()
+        counts = dict()
+
+        def timed(artist):
+            draw = artist.draw
+            name = type(artist).__name__
+            times.setdefault(name, 0.0)
+            counts[name] = counts.get(name, 0) + 1
+
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return draw(*args, **kwargs)
+                finally:
+                    times[name] += time.perf_counter() - start
+
+            return wrapper
+
+        # the wrappers are set on the artists themselves, so that they are called
+        # by whatever draws the artists
+        for artist in artists:
+            artist.draw = timed(artist)
+        try:
+            yield
+        finally:
+            for artist in artists:
+                del artist.draw
+        for name, seconds in times.items():
+            self.report("draw." + name, seconds, count=counts[name])
+
+
+class Laps(object):
+    """
+    Times the parts of a phase. See `Instruments.laps`.
+    """
+
+    def __init__(self, instruments, name):
+        self.instruments = instruments
+        self.name = name
+        self.start = self.last = time.perf_counter()
+
+    def lap(self, part, **details):
+        """
+        Record the time since the last part finished.
+
+        :param part: Name of the part that just finished.
+        :param details: Anything else to pass to the callback.
+        :return: None
+        """
+        if self.instruments.enabled:
+            now = time.perf_counter()
+            self.instruments.report(self.name + "." + part, now - self.last, **details)
+            self.last = now
+
+    def done(self, **details):
+        """
+        Record the time of the whole phase.
+
+        :param details: Anything else to pass to the callback.
+        :return: None
+        """
+        if self.instruments.enabled:
+            seconds = time.perf_counter() - self.start
+            self.instruments.report(self.name, seconds, **details)
+
+
+def artist_stats(ax):
+    """
+    Count what is drawn on an axis.
+
+    :param ax: Matplotlib axis.
+    :return: Dictionary with the number of artists of each class ("artists"), the
+             number of polygons and lines ("paths") and their vertices
+             ("vertices"), and the bytes taken up by the vertices
+             ("vertex_bytes").
+    :rtype: dict
+    """
+    from matplotlib.collections import Collection
+    from matplotlib.lines import Line2D
+    from matplotlib.patches import Patch
+
+    artists = OrderedDict()
+    paths = vertices = vertex_bytes = 0
+    for artist in ax.get_children():
+        name = type(artist).__name__
+        artists[name] = artists.get(name, 0) + 1
+        if isinstance(artist, Collection):
+            artist_paths = artist.get_paths()
+        elif isinstance(artist, Patch):
+            artist_paths = [artist.get_path()]
+        elif isinstance(artist, Line2D):
+            artist_paths = [artist.get_path()]
+        else:
+            continue
+        paths += len(artist_paths)
+        for path in artist_paths:
+            vertices += len(path.vertices)
+            vertex_bytes += np.asarray(path.vertices).nbytes
+    return {
+        "artists": artists,
+        "paths": paths,
+        "vertices": vertices,
+        "vertex_bytes": vertex_bytes,
+    }
+
+
+def max_rss_bytes():
+    """
+    Get the peak memory used by this process.
+
+    :return: Peak resident set size in bytes, or None on systems where it isn't
+             available.
+    """
+    try:
+        import resource
+    except ImportError:  # not available on Windows
+        return None
+    import sys
+
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, and macOS bytes
+    return rss if sys.platform == "darwin" else rss * 1024
@@ -0,0 +1,738 @@
+from matplotlib.backends.backend_agg import RendererAgg
+from matplotlib.transforms import Bbox
+import numpy as np
+
+from . import state as table_state
+from . import style
+
+
+def isolate(table, elt):
+    """
+    Hover callback that isolates the element under the cursor.
+
+    :param table: PeriodicTable being interacted with.
+    :param elt: Element under the cursor, or None if the cursor is not on an element.
+    :return: None
+    """
+    if elt is None:
+        table.unisolate_all_elts()
+    else:
+        table.isolate_elt_label(elt.symbol)
+
+
+def highlight(table, elt):
+    """
+    Click callback that highlights the main source of the element clicked on.
+
+    :param table: PeriodicTable being interacted with.
+    :param elt: Element clicked on, or None if the click was not on an element.
+    :return: None
+    """
+    if elt is None:
+        table.unhighlight_all_sources()
+    else:
+        # highlight the source that contributes the most to this element
+        sources = list(elt.fracs)
+        source = sources[np.argmax([elt.fracs[s] for s in sources])]
+        table.highlight_source(source)
+
+
+class InteractiveTable(object):
+    """
+    Interactive mode for a periodic table, which only draws the parts of the table
+    that changed.
+
+    The table is drawn in layers. The background, which never changes (like the
+    white boxes behind the elements), is drawn by matplotlib whenever the whole
+    figure is drawn. Then there are three groups of artists that change with the
+    state of the table: the fills, the label boxes, and the highlighted text. The
+    image of the table underneath each of these groups is kept, so that when an
+    element or label changes, only its part of the image is drawn again, starting
+    from the lowest group that changed there.
+
+    On top are the element boxes, symbols, and numbers, the plain text of the labels,
+    and the lines connecting the Lanthanides and Actinides, which are slow to draw.
+    These only change when they are faded or hidden, so they are drawn once in each
+    of those looks, and the part of each element and label is copied from the look
+    it has. Where the lines of a faded and an unfaded element meet, the unfaded line
+    is put on top of the faded one, just as matplotlib draws them.
+
+    Changes that only touch a few elements are quick, but the ones that change the
+    whole table still draw most of it again. Measured with the Agg backend at 100
+    dpi (see the interactive benchmarks in `benchmark`), moving the cursor from one
+    element to another takes about 12 ms, moving it onto the table (which fades
+    every other element) about 55 ms, a click that highlights a source about 25 ms,
+    of which about 5 ms is matplotlib looking for artists to pick, and showing or
+    hiding every source 25 to 40 ms. Starting takes a few seconds, since every part
+    of the table is drawn in each of its looks.
+
+    Note that only the background is included when the table is saved while
+    interactive mode is on. Call `stop` before saving.
+    """
+
+    def __init__(self, table, on_hover=isolate, on_click=highlight):
+        """
+        Start interactive mode on a table.
+
+        :param table: PeriodicTable to make interactive.
+        :param on_hover: Function called when the cursor moves onto a different
+                         element. It is passed the table and the element under the
+                         cursor (or None if the cursor left the elements). Pass None
+                         to do nothing when hovering.
+        :param on_click: Function called when the table is clicked. It is passed the
+                         table and the element clicked on (or None). Pass None to do
+                         nothing on clicks.
+        """
+        self.table = table
+        self.on_hover = on_hover
+        self.on_click = on_click
+        self.canvas = table.get_figure().canvas
+
+        # The groups in the middle, in the order they are drawn, then the top layer.
+        self._groups = [[fill.collection for fill in table._fills.values()], [], []]
+        for label in table_state.labels:
+            label = table._labels[label]
+            self._groups[1] += [label.box.plot_item]
+            self._groups[1] += [line.plot_item for line in label.box_lines]
+        for layer in list(table._text.strokes.values()) + [table._text.highlight]:
+            self._groups[2].append(layer.collection)
+        self._top = [table._text.plain.collection, table._lines.collection]
+        # Everything else is the background.
+        self._layered = self._top + [a for group in self._groups for a in group]
+        ax = table._ax
+        artists = ax.collections + ax.lines + ax.patches
+        self._static = [a for a in artists if a not in self._layered]
+        for artist in self._layered:
+            artist.set_animated(True)
+
+        # Elements are looked up by their position on the grid
+        self._positions = {(elt.column, elt.row): elt for elt in table.elts}
+        self._hovered = None
+
+        # The image of the table underneath each group and underneath the top layer,
+        # the image of the top layer, and the state and fractions they show.
+        self._under = None
+        self._top_image = None
+        self._drawn_bits = None
+        self._fractions_version = None
+        # The parts of the table, and the size of the figure they were found for. See
+        # `_prepare`.
+        self._parts = None
+        self._size = None
+        self._callback_ids = [
+            self.canvas.mpl_connect("draw_event", self._on_draw),
+            self.canvas.mpl_connect("motion_notify_event", self._on_move),
+            self.canvas.mpl_connect("button_press_event", self._on_click),
+        ]
+        # Drawing the whole figure finds the parts of the table and draws their
+        # looks, which takes a few seconds, so it's done now rather than on the
+        # first hover or click.
+        self.canvas.draw()
+
+    def stop(self):
+        """
+        Stop interactive mode, returning the table to normal.
+
+        :return: None
+        """
+        for cid in self._callback_ids:
+            self.canvas.mpl_disconnect(cid)
+        for artist in self._layered:
+            artist.set_animated(False)
+        self._under = None
+        self._top_image = None
+        self._parts = None
+
+    def element_at(self, x, y):
+        """
+        Find the element at a given location.
+
+        :param x: X position in data coordinates.
+        :param y: Y position in data coordinates.
+        :return: The element at this location, or None if there isn't one.
+        """
+        if x is None or y is None:
+            return None
+        return self._positions.get((int(np.floor(x)), int(np.floor(y))))
+
+    def _prepare(self, renderer):
+        """
+        Find the part of the image each element and label is drawn in, and draw the
+        top layer of each in all its looks.
+
+        The looks are with everything faded or not, and with the symbols of the
+        elements and the plain text of the labels hidden or not. The table is put
+        back how it was afterwards.
+
+        :param renderer: Renderer the table is drawn with.
+        :return: None
+        """
+        table = self.table
+        width, height = int(renderer.width), int(renderer.height)
+        lines, text = table._lines, table._text.plain
+
+        def region(x0, y0, x1, y1, pad):
+            # pixel coordinates start from the bottom, but images from the top
+            rows = slice(
+                max(0, int(round(height - y1)) - pad),
+                min(height, int(round(height - y0)) + pad),
+            )
+            cols = slice(max(0, int(round(x0)) - pad), min(width, int(round(x1)) + pad))
+            return rows, cols
+
+        def data_region(xs, ys, pad):
+            corners = [[min(xs), min(ys)], [max(xs), max(ys)]]
+            return region(*table._ax.transData.transform(corners).ravel(), pad=pad)
+
+        # the lines are allowed their width, and another pixel for antialiasing
+        line_pad = int(np.ceil(style.element_linewidth * renderer.dpi / 72.0)) + 1
+        label_pad = int(np.ceil(style.label_linewidth * renderer.dpi / 72.0)) + 1
+        parts = []
+        for elt in table.elts:
+            xs, ys = [elt.column, elt.column + 1], [elt.row, elt.row + 1]
+            cell = data_region(xs, ys, 0)
+            parts.append(_Part(cell, data_region(xs, ys, line_pad), elt.box_list))
+        for label in table_state.labels:
+            label = table._labels[label]
+            extent = label.box.plot_item.get_window_extent(renderer).extents
+            cell = region(*extent, pad=label_pad)
+            parts.append(_Part(cell, cell, []))
+        points = np.concatenate(
+            [lines._segments[line.idx] for line in table._connector_lines]
+        )
+        outer = data_region(points[:, 0], points[:, 1], line_pad)
+        parts.append(_Part(None, outer, table._connector_lines))
+
+        hideable = np.zeros(len(text), dtype=bool)
+        hideable[[elt.ax_name.idx for elt in table.elts]] = True
+        hideable[[label.text.idx for label in table._labels.values()]] = True
+        saved = [
+            (batch, batch.faded.copy(), batch.hidden.copy()) for batch in [lines, text]
+        ]
+        layer = RendererAgg(width, height, renderer.dpi)
+
+        def draw(artist):
+            layer.clear()
+            artist.draw(layer)
+            return np.array(layer.buffer_rgba())
+
+        try:
+            # The text of each part is copied from the look it has
+            for faded in [False, True]:
+                for hidden in [False, True]:
+                    _set_looks(
+                        text,
+                        np.full(len(text), faded),
+                        np.where(hideable, hidden, text.hidden),
+                    )
+                    image = draw(text.collection)
+                    for part in parts:
+                        if part.cell is not None:
+                            part.text[(faded, hidden)] = image[part.cell]
+
+            # The lines are drawn faded and unfaded for each part, to put together
+            # the pixels where the lines of parts in different looks meet. Parts
+            # whose lines don't touch are drawn at the same time.
+            classes = [[] for _ in range(5)]
+            for elt, part in zip(table.elts, parts):
+                classes[elt.column % 2 + 2 * (elt.row % 2)].append(part)
+            classes[4].append(parts[-1])
+            pixels, owners, looks = [], [], []
+            for members in classes:
+                shown = np.zeros(len(lines), dtype=bool)
+                for part in members:
+                    shown[[line.idx for line in part.line_items]] = True
+                images = []
+                for faded in [False, True]:
+                    _set_looks(lines, np.full(len(lines), faded), ~shown)
+                    images.append(draw(lines.collection))
+                for part in members:
+                    rows, cols = part.outer
+                    covered = np.zeros((height, width), dtype=bool)
+                    covered[rows, cols] = images[0][rows, cols, 3] > 0
+                    covered[rows, cols] |= images[1][rows, cols, 3] > 0
+                    covered = np.flatnonzero(covered)
+                    pixels.append(covered)
+                    owners.append(np.full(len(covered), parts.index(part)))
+                    looks.append(
+                        np.stack([im.reshape(-1, 4)[covered] for im in images], axis=1)
+                    )
+            # where every line on a pixel has the same look, it is drawn all at once
+            full_looks = []
+            for faded in [False, True]:
+                _set_looks(lines, np.full(len(lines), faded), np.zeros(len(lines)))
+                full_looks.append(draw(lines.collection).reshape(-1, 4))
+        finally:
+            for batch, batch_faded, batch_hidden in saved:
+                _set_looks(batch, batch_faded, batch_hidden)
+
+        # Each part's look of each pixel it draws lines on, sorted by the pixel
+        pixels = np.concatenate(pixels)
+        order = np.argsort(pixels, kind="stable")
+        line_pixels, entry_pixels = np.unique(pixels[order], return_inverse=True)
+        self._line_pixels = line_pixels
+        self._line_entries = (
+            entry_pixels,
+            np.concatenate(owners)[order],
+            np.concatenate(looks)[order],
+        )
+        # the looks of each pixel are stored as one 32 bit number, to copy them faster
+        self._line_looks = np.stack(
+            [look[line_pixels].view(np.uint32)[:, 0] for look in full_looks], axis=1
+        )
+        self._line_counts = np.bincount(entry_pixels, minlength=len(line_pixels))
+        # The pixels each part changes, which are those of its lines and those of
+        # the lines inside its cell, where the text is copied over them.
+        pixel_idx = np.arange(height * width).reshape(height, width)
+        for idx, part in enumerate(parts):
+            changed = entry_pixels[self._line_entries[1] == idx]
+            if part.cell is not None:
+                inside = np.isin(line_pixels, pixel_idx[part.cell])
+                part.cell_lines = line_pixels[inside]
+                changed = np.concatenate([changed, np.flatnonzero(inside)])
+            part.lines = np.flatnonzero(np.isin(entry_pixels, changed))
+        self._parts = parts
+        self._size = (width, height, renderer.dpi)
+
+    def _looks(self, bits):
+        """
+        Get the look of the top layer of each part of the table in a state.
+
+        :param bits: Encoded state of the table.
+        :type bits: state.TableState
+        :return: List of whether each part is faded, and whether its symbol or
+                 label text is hidden, in the order of the parts.
+        :rtype: list
+        """
+        faded = bits.elements & table_state.FADED > 0
+        hidden = bits.elements & table_state.HIGHLIGHT > 0
+        looks = list(zip(faded.tolist(), hidden.tolist()))
+        # the plain text of a label is hidden unless it is shown and not highlighted
+        label_faded = bits.labels & table_state.LABEL_FADED > 0
+        label_hidden = (bits.labels & table_state.LABEL_SHOWN == 0) | (
+            bits.labels & table_state.LABEL_HIGHLIGHT > 0
+        )
+        looks += list(zip(label_faded.tolist(), label_hidden.tolist()))
+        looks.append((bool(bits.connectors_faded), False))
+        return looks
+
+    def _update_top(self, changed, looks, empty=False):
+        """
+        Put the top layer of some parts of the table into new looks.
+
+        :param changed: Indices of the parts that changed.
+        :param looks: Look of every part. See `_looks`.
+        :param empty: Whether the top layer is empty, so that the lines of these
+                      parts have to be put together even if they didn't change.
+        :return: None
+        """
+        refresh = []
+        top = self._top_image.reshape(-1, 4)
+        for idx in changed:
+            part = self._parts[idx]
+            faded, hidden = looks[idx]
+            if not empty and (faded, hidden) == (
+                self._lines_faded[idx],
+                self._text_hidden[idx],
+            ):
+                # only what is underneath the top layer changed
+                continue
+            self._text_hidden[idx] = hidden
+            if empty or faded != self._lines_faded[idx]:
+                self._lines_faded[idx] = faded
+                refresh.append(part.lines)
+                if part.cell is not None:
+                    self._top_image[part.cell] = part.text[(faded, hidden)]
+            elif part.cell is not None:
+                # the text is copied over the lines in the cell, which stay the same
+                cell_lines = top[part.cell_lines]
+                self._top_image[part.cell] = part.text[(faded, hidden)]
+                top[part.cell_lines] = cell_lines
+        if len(refresh) == 0:
+            return
+        entry_pixels, owners, entry_looks = self._line_entries
+        if sum(len(part_entries) for part_entries in refresh) < len(owners) // 2:
+            entries = np.zeros(len(owners), dtype=bool)
+            for part_entries in refresh:
+                entries[part_entries] = True
+            entries = np.flatnonzero(entries)
+            # the entries are sorted by their pixel
+            entry_pixels = entry_pixels[entries]
+            first = np.ones(len(entries), dtype=bool)
+            first[1:] = entry_pixels[1:] != entry_pixels[:-1]
+            pixels = entry_pixels[first]
+            entry_pixels = np.cumsum(first) - 1
+            n_lines = np.diff(np.append(np.flatnonzero(first), len(entries)))
+            line_looks = self._line_looks[pixels]
+        else:
+            # most of the lines changed, so it's quicker to put them all together
+            entries = np.arange(len(owners))
+            pixels = slice(None)
+            n_lines = self._line_counts
+            line_looks = self._line_looks
+        entry_faded = self._lines_faded[owners[entries]]
+        n_faded = np.bincount(entry_pixels, entry_faded, len(n_lines))
+        top = np.where(n_faded > 0, line_looks[:, 1], line_looks[:, 0])
+
+        # Where faded and unfaded lines meet, the faded ones are drawn first, so the
+        # unfaded ones go on top of them.
+        mixed = (n_faded > 0) & (n_faded < n_lines)
+        if np.any(mixed):
+            in_mixed = mixed[entry_pixels]
+            entry_pixels = (np.cumsum(mixed) - 1)[entry_pixels[in_mixed]]
+            entry_faded = entry_faded[in_mixed]
+            entries = entries[in_mixed]
+            color = entry_looks[entries, entry_faded.astype(int)] / 255.0
+            n_mixed = np.count_nonzero(mixed)
+
+            def coverage(entry_mask):
+                # Lines of the same color drawn over each other, where each one covers
+                # a fraction of the pixel
+                alpha = np.where(entry_mask, np.minimum(color[:, 3], 0.9999), 0)
+                weights = np.bincount(entry_pixels, alpha, n_mixed)
+                rgb = np.stack(
+                    [
+                        np.bincount(entry_pixels, alpha * color[:, channel], n_mixed)
+                        for channel in range(3)
+                    ],
+                    axis=1,
+                )
+                rgb /= np.maximum(weights, 1e-12)[:, np.newaxis]
+                log_clear = np.bincount(entry_pixels, np.log1p(-alpha), n_mixed)
+                return rgb, -np.expm1(log_clear)[:, np.newaxis]
+
+            faded_rgb, faded_alpha = coverage(entry_faded)
+            unfaded_rgb, unfaded_alpha = coverage(~entry_faded)
+            faded_alpha *= 1 - unfaded_alpha
+            alpha = unfaded_alpha + faded_alpha
+            rgb = unfaded_rgb * unfaded_alpha + faded_rgb * faded_alpha
+            rgb /= np.maximum(alpha, 1e-12)
+            rgba = np.round(np.concatenate([rgb, alpha], axis=1) * 255)
+            top[mixed] = rgba.astype(np.uint8).view(np.uint32)[:, 0]
+        self._top_image.view(np.uint32).reshape(-1)[self._line_pixels[pixels]] = top
+
+    def _draw_group(self, group, parts, buffer):
+        """
+        Draw one of the groups in the cells of some parts of the table, on top of the
+        image of the table underneath it.
+
+        :param group: Index of the group in `_groups`.
+        :param parts: List of each part to draw, and the artists to draw in it.
+        :param buffer: Array of the pixels of the canvas.
+        :return: The region the whole group was drawn in, or None if it was only
+                 drawn in the cells of the parts.
+        :rtype: tuple
+        """
+        under = self._under[group]
+        region = None
+        # Regions drawn from a lower group up draw all of this group, so the parts
+        # inside them don't need to be drawn as well.
+        covered = [part.cell for part, _ in parts if isinstance(part, _Region)]
+        parts = [
+            (part, artists)
+            for part, artists in parts
+            if isinstance(part, _Region)
+            or not any(_contains(outer, part.cell) for outer in covered)
+        ]
+        # Drawing an artist costs about the same however little of it is drawn, so
+        # when there are many parts, the whole group is drawn once over all of them.
+        # The rest of the region has to be drawn from this group up.
+        if sum(len(artists) for _, artists in parts) > 3 * len(self._groups[group]):
+            region = _union([part.cell for part, _ in parts])
+            parts = [(_Region(region), self._groups[group])]
+        for part, artists in parts:
+            rows, cols = part.cell
+            buffer[rows, cols] = under[rows, cols]
+            clip = _bbox(part.cell, buffer.shape[0])
+            # Fading changes the zorder of some artists, so we have to sort every
+            # time. This sort is stable, so artists with the same zorder are drawn in
+            # the order they were added, just as matplotlib does.
+            for artist in sorted(artists, key=lambda a: a.get_zorder()):
+                # The clip box is set directly, since `set_clip_box` would mark the
+                # figure as needing to be drawn again.
+                clipbox = artist.clipbox
+                artist.clipbox = clip
+                self.table._ax.draw_artist(artist)
+                artist.clipbox = clipbox
+            self._under[group + 1][rows, cols] = buffer[rows, cols]
+        return region
+
+    def _draw_top(self, regions, buffer):
+        """
+        Draw the top layer in parts of the image, on top of the image of everything
+        underneath it.
+
+        :param regions: List of the rows and columns of the image to draw.
+        :param buffer: Array of the pixels of the canvas.
+        :return: None
+        """
+        union = _union(regions)
+        if sum(_area(region) for region in regions) > _area(union):
+            regions = [union]
+        renderer = self.canvas.get_renderer()
+        for rows, cols in regions:
+            buffer[rows, cols] = self._under[3][rows, cols]
+            # images start from the top, but are drawn from the bottom
+            top = self._top_image[rows, cols][::-1]
+            renderer.draw_image(
+                renderer.new_gc(), cols.start, buffer.shape[0] - rows.stop, top
+            )
+
+    def _on_draw(self, event):
+        """
+        Store the background whenever the whole figure is drawn, then draw the rest
+        of the table on top of it.
+
+        :param event: Matplotlib draw event.
+        :return: None
+        """
+        table = self.table
+        renderer = self.canvas.get_renderer()
+        if self._parts is None or self._size != (
+            int(renderer.width),
+            int(renderer.height),
+            renderer.dpi,
+        ):
+            self._prepare(renderer)
+        # new fills are made when the fractions change
+        for elt, part in zip(table.elts, self._parts):
+            part.fills = [item.batch.collection for item in elt.fills.values()]
+
+        buffer = np.asarray(self.canvas.buffer_rgba())
+        self._under = [buffer.copy()]
+        for artists in self._groups:
+            for artist in sorted(artists, key=lambda a: a.get_zorder()):
+                table._ax.draw_artist(artist)
+            self._under.append(buffer.copy())
+
+        bits = table._bits
+        looks = self._looks(bits)
+        self._top_image = np.zeros_like(buffer)
+        self._lines_faded = np.zeros(len(self._parts), dtype=bool)
+        self._text_hidden = np.zeros(len(self._parts), dtype=bool)
+        self._update_top(range(len(self._parts)), looks, empty=True)
+        height, width = buffer.shape[:2]
+        self._draw_top([(slice(0, height), slice(0, width))], buffer)
+        self._drawn_bits = bits
+        self._fractions_version = table._fractions_version
+
+    def _draw_changes(self):
+        """
+        Draw the parts of the table that changed since it was last drawn.
+
+        :return: Bounding box of the part of the figure that was drawn, or None if
+                 nothing changed.
+        :rtype: matplotlib.transforms.Bbox
+        """
+        new = self.table._bits
+        old = self._drawn_bits
+        diff = new ^ old
+        n_elts = len(diff.elements)
+        changed = np.flatnonzero(diff.elements).tolist()
+        changed += (n_elts + np.flatnonzero(diff.labels)).tolist()
+        if diff.connectors_faded:
+            changed.append(len(self._parts) - 1)
+        if len(changed) == 0:
+            return None
+        self._drawn_bits = new
+        self._update_top(changed, self._looks(new))
+
+        # The lowest group that changed in each part, and the artists to draw in it
+        # in each group from there up
+        plans = []
+        text = self._groups[2]
+        for idx in changed:
+            part = self._parts[idx]
+            if idx < n_elts:
+                bits = diff.elements[idx]
+                highlight = old.elements[idx] | new.elements[idx]
+                highlight &= table_state.HIGHLIGHT
+                changed_fills = bits & (table_state.SOURCES | table_state.FADED)
+                start = 0 if changed_fills else 2
+                artists = [part.fills, [], text if highlight else []]
+            elif idx < len(self._parts) - 1:
+                label_idx = idx - n_elts
+                bits = diff.labels[label_idx]
+                highlight = old.labels[label_idx] | new.labels[label_idx]
+                highlight &= table_state.LABEL_HIGHLIGHT
+                changed_box = bits & (table_state.LABEL_SHOWN | table_state.LABEL_FADED)
+                start = 1 if changed_box else 2
+                label = self.table._labels[table_state.labels[label_idx]]
+                box = [label.box.plot_item] + [l.plot_item for l in label.box_lines]
+                artists = [[], box, text if highlight else []]
+            else:
+                # the connecting lines are only in the top layer
+                continue
+            plans.append((part, start, artists))
+
+        buffer = np.asarray(self.canvas.buffer_rgba())
+        regions = [self._parts[idx].outer for idx in changed]
+        for group in range(len(self._groups)):
+            parts = [
+                (part, artists[group])
+                for part, start, artists in plans
+                if start <= group
+            ]
+            if len(parts) > 0:
+                region = self._draw_group(group, parts, buffer)
+                if region is not None:
+                    plans.append((_Region(region), group + 1, self._groups))
+                    regions.append(region)
+        self._draw_top(regions, buffer)
+        return _bbox(_union(regions), buffer.shape[0])
+
+    def update(self):
+        """
+        Show any changes made to the table.
+
+        :return: None
+        """
+        # matplotlib marks artists as stale when they're modified, until they are next
+        # drawn. If any part of the background changed, we have to redraw everything,
+        # as we do when the fills are moved by changing the fractions.
+        if (
+            self._under is None
+            or any(a.stale for a in self._static)
+            or self._fractions_version != self.table._fractions_version
+        ):
+            self.canvas.draw()
+            bbox = self.table.get_figure().bbox
+        else:
+            bbox = self._draw_changes()
+        if bbox is not None:
+            self.canvas.blit(bbox)
+        self.canvas.flush_events()
+
+    def _on_move(self, event):
+        """
+        Call the hover function when the cursor moves to a different element.
+
+        :param event: Matplotlib mouse event.
+        :return: None
+        """
+        if self.on_hover is None or event.inaxes is not self.table._ax:
+            return
+        elt = self.element_at(event.xdata, event.ydata)
+        if elt is not self._hovered:
+            self._hovered = elt
+            self.on_hover(self.table, elt)
+            self.update()
+
+    def _on_click(self, event):
+        """
+        Call the click function
+
+        :param event: Matplotlib mouse event.
+        :return: None
+        """
+        if self.on_click is None or event.inaxes is not self.table._ax:
+            return
+        self.on_click(self.table, self.element_at(event.xdata, event.ydata))
+        self.update()
+
+
+class _Part(object):
+    """
+    An element, label, or the connecting lines, which are each drawn in their own
+    part of the image.
+    """
+
+    def __init__(self, cell, outer, line_items):
+        """
+        :param cell: Rows and columns of the image (as slices) that the fills,
+                     label box, and text of this part are drawn in, or None if
+                     there are none.
+        :param outer: Rows and columns of the image that all of this part, including
+                      its lines, is drawn in.
+        :param line_items: Items of the table's lines that belong to this part.
+        """
+        self.cell = cell
+        self.outer = outer
+        self.line_items = line_items
+        # images of the text in the cell in each look, with (faded, hidden) as keys
+        self.text = dict()
+        # entries of the lines that have to be put together again when this part
+        # changes (see `InteractiveTable._update_top`)
+        self.lines = np.zeros(0, dtype=int)
+        # pixels of the image covered by lines inside the cell
+        self.cell_lines = np.zeros(0, dtype=int)
+        # the fills of an element
+        self.fills = []
+
+
+class _Region(object):
+    """
+    A region of the image to draw, in place of a part of the table.
+    """
+
+    def __init__(self, cell):
+        """
+        :param cell: Rows and columns of the image, as slices.
+        """
+        self.cell = cell
+
+
+def _union(regions):
+    """
+    Find the smallest region of an image holding several others.
+
+    :param regions: List of the rows and columns of each region, as slices.
+    :return: Rows and columns of the region holding all of them.
+    :rtype: tuple
+    """
+    rows = slice(min(r.start for r, _ in regions), max(r.stop for r, _ in regions))
+    cols = slice(min(c.start for _, c in regions), max(c.stop for _, c in regions))
+    return rows, cols
+
+
+def _contains(outer, inner):
+    """
+    :param outer: Rows and columns of a region of an image, as slices.
+    :param inner: Rows and columns of another region.
+    :return: Whether the second region is inside the first.
+    :rtype: bool
+    """
+    return all(o.start <= i.start and i.stop <= o.stop for o, i in zip(outer, inner))
+
+
+def _area(region):
+    """
+    :param region: Rows and columns of a region of an image, as slices.
+    :return: Number of pixels in the region.
+    :rtype: int
+    """
+    rows, cols = region
+    return (rows.stop - rows.start) * (cols.stop - cols.start)
+
+
+def _bbox(region, height):
+    """
+    Get the bounding box of a region of an image in pixel coordinates, which start
+    from the bottom.
+
+    :param region: Rows and columns of the region, as slices.
+    :param height: Height of the image.
+    :return: Bounding box of the region.
+    :rtype: matplotlib.transforms.Bbox
+    """
+    rows, cols = region
+    return Bbox.from_extents(
+        cols.start, height - rows.stop, cols.stop, height - rows.start
+    )
+
+
+def _set_looks(batch, faded, hidden):
+    """
+    Set which members of a batch are faded and hidden.
+
+    :param batch: BatchedCollection to change.
+    :param faded: Array of whether each member is faded.
+    :param hidden: Array of whether each member is hidden.
+    :return: None
+    """
+    faded = np.array(faded, dtype=bool)
+    hidden = np.array(hidden, dtype=bool)
+    batch.fade(faded)
+    batch.unfade(~faded)
+    batch.hide(hidden)
+    batch.unhide(~hidden)
@@ -0,0 +1,296 @@
+"""
+Produce images of the table with any combination of sources shown, without drawing
+the table again for each one.
+
+The table is made of independent layers: the background underneath the fills, the
+fills of each source, the element boxes and text on top of the fills, and the labels
+of each source. Each layer is drawn once, then any combination of sources is made by
+compositing the layers of the sources that are shown.
+"""
+
+from collections import OrderedDict
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+import numpy as np
+
+# The labels are this many pixels bigger than their boxes, to include their outlines.
+_label_padding = 3
+
+
+def _premultiply(rgba):
+    """
+    Convert RGBA colors from Agg to floats with premultiplied alpha.
+
+    :param rgba: Array of uint8 RGBA colors, with any shape.
+    :return: Array of float32 RGBA colors with premultiplied alpha.
+    :rtype: np.ndarray
+    """
+    rgba = rgba.astype(np.float32) / 255.0
+    rgba[..., :3] *= rgba[..., 3:]
+    return rgba
+
+
+def _unpremultiply(rgba):
+    """
+    Convert floats with premultiplied alpha back to the colors Agg would produce.
+
+    :param rgba: Array of float32 RGBA colors with premultiplied alpha, with shape
+                 (n_pixels, 4).
+    :return: Array of the colors as uint8 RGBA packed into one uint32 per pixel.
+    :rtype: np.ndarray
+    """
+    alpha = rgba[:, 3:]
+    rgb = np.divide(rgba[:, :3], alpha, out=np.zeros_like(rgba[:, :3]), where=alpha > 0)
+    rgba = np.concatenate([rgb, alpha], axis=-1)
+    rgba = np.round(np.clip(rgba, 0, 1) * 255).astype(np.uint8)
+    return rgba.view(np.uint32).ravel()
+
+
+def _over(top, bottom):
+    """
+    Composite colors with premultiplied alpha on top of others.
+
+    :param top: Array of the colors on top.
+    :param bottom: Array of the colors on the bottom, with the same shape.
+    :return: Array of the composited colors.
+    :rtype: np.ndarray
+    """
+    return top + bottom * (1 - top[..., 3:])
+
+
+class _Layers(object):
+    """
+    The layers of the table, for one combination of highlighted and isolated
+    elements.
+
+    Almost every pixel is covered by at most one fill, so rather than compositing
+    the layers from scratch every time, we precompute the final color of these
+    pixels when their fill is shown. Making an image is then mostly copying these
+    pixels in. Only the few pixels covered by multiple fills (at the edges between
+    fills) are composited each time.
+    """
+
+    def __init__(self, shape, under, fills, over, labels):
+        """
+        Precompute the final colors of the pixels from the layers.
+
+        :param shape: Shape of the images.
+        :param under: Flattened image of what's underneath the fills, with
+                      premultiplied alpha.
+        :param fills: Dictionary with the sources as keys, holding the indices of
+                      the pixels each fill covers and their premultiplied colors.
+        :param over: Flattened image of what's on top of the fills, with
+                     premultiplied alpha.
+        :param labels: List of tuples, each holding the sources of a label, the
+                       indices of the pixels the label covers, and their
+                       premultiplied colors.
+        """
+        self.shape = shape
+        base = _over(over, under)
+        self.base = _unpremultiply(base)
+
+        # find the pixels covered by more than one fill
+        counts = np.zeros(len(under), dtype=np.int32)
+        for idx, _ in fills.values():
+            counts[idx] += 1
+        shared = counts > 1
+        self.shared_idx = np.flatnonzero(shared)
+        self.shared_under = under[self.shared_idx]
+        self.shared_over = over[self.shared_idx]
+
+        self.fills = OrderedDict()
+        self.shared_fills = dict()
+        for source, (idx, rgba) in fills.items():
+            only = ~shared[idx]
+            final = _over(over[idx[only]], _over(rgba[only], under[idx[only]]))
+            self.fills[source] = (idx[only], _unpremultiply(final))
+
+            shared_fill = np.zeros_like(self.shared_under)
+            shared_fill[np.searchsorted(self.shared_idx, idx[~only])] = rgba[~only]
+            self.shared_fills[source] = shared_fill
+
+        # Nothing else is drawn where the labels are, so they just go on top.
+        self.labels = [
+            (label_sources, idx, _unpremultiply(_over(rgba, base[idx])))
+            for label_sources, idx, rgba in labels
+        ]
+
+    def render(self, sources):
+        """
+        Make an image with the given sources shown.
+
+        :param sources: List of the lowercase names of the sources to show.
+        :return: RGBA image.
+        :rtype: np.ndarray
+        """
+        image = self.base.copy()
+        shared = self.shared_under.copy()
+        # the fills are composited in the same order matplotlib draws them
+        for source, (idx, final) in self.fills.items():
+            if source in sources:
+                image[idx] = final
+                shared = _over(self.shared_fills[source], shared)
+        image[self.shared_idx] = _unpremultiply(_over(self.shared_over, shared))
+
+        for label_sources, idx, final in self.labels:
+            if any(source in sources for source in label_sources):
+                image[idx] = final
+
+        return image.view(np.uint8).reshape(self.shape)
+
+
+class LayeredRenderer(object):
+    """
+    Makes images of a table with any combination of sources shown by compositing
+    cached layers.
+
+    The layers depend on what is highlighted and isolated on the table and on the
+    fractions of its elements, so they are drawn again the first time each
+    combination of those is used. The layers of the most recently used
+    combinations are kept.
+
+    Interactive mode must be stopped when the layers are drawn, since it keeps parts
+    of the table from being drawn normally.
+    """
+
+    def __init__(self, table, dpi=100, max_variants=4):
+        """
+        Initialize the renderer. No layers are drawn until they are needed.
+
+        :param table: PeriodicTable to render.
+        :param dpi: Resolution of the images. The table is 20 by 12 inches.
+        :param max_variants: How many different combinations of highlighted and
+                             isolated elements to keep the layers for.
+        """
+        self.table = table
+        self.dpi = dpi
+        self.max_variants = max_variants
+        # the order of this dictionary tracks which were used most recently.
+        self._variants = OrderedDict()
+
+    def render(self, sources=None):
+        """
+        Make an image of the table with the given sources shown.
+
+        What is highlighted and isolated is taken from the current state of the
+        table. The table itself is not changed.
+
+        :param sources: List of sources to show, in any format accepted by
+                        `PeriodicTable.show_source`. If None, the sources currently
+                        shown on the table are used.
+        :return: RGBA image with shape (height, width, 4). This matches drawing the
+                 table in this state, other than rounding. The background is
+                 transparent.
+        :rtype: np.ndarray
+        """
+        if sources is None:
+            sources = self.table.get_state()["sources"]
+        sources = self.table._parse_sources(sources)
+        return self._get_layers().render(sources)
+
+    def _get_layers(self):
+        """
+        Get the layers for what is currently highlighted and isolated on the table,
+        and its current fractions, drawing them if needed.
+
+        :return: Layers of the table.
+        :rtype: _Layers
+        """
+        state = self.table.get_state()
+        key = (
+            state["highlight"],
+            None if state["isolate"] is None else tuple(state["isolate"]),
+            state["isolate_label"],
+            self.table._fractions_version,
+        )
+        if key in self._variants:
+            self._variants.move_to_end(key)
+        else:
+            self._variants[key] = self._draw_layers()
+            while len(self._variants) > self.max_variants:
+                self._variants.popitem(last=False)
+        return self._variants[key]
+
+    def _draw_layers(self):
+        """
+        Draw each layer of the table in its current state.
+
+        :return: Layers of the table.
+        :rtype: _Layers
+        """
+        table = self.table
+        fig = table.get_figure()
+        state = table.get_state()
+
+        # Sort out which artists belong in which layer.
+        fills = {source: fill.collection for source, fill in table._fills.items()}
+        labels = dict()  # the S and AGB sources share a label
+        for source, label in table._labels.items():
+            labels.setdefault(label, []).append(source)
+        label_artists = []
+        for label in labels:
+            label_artists += [label.box.plot_item]
+            label_artists += [line.plot_item for line in label.box_lines]
+        text = table._text.collections()
+
+        artists = table._ax.get_children()
+        fill_zorder = min(fill.get_zorder() for fill in fills.values())
+        under = [a for a in artists if a.get_zorder() < fill_zorder]
+        skip = under + list(fills.values()) + label_artists
+        over = [a for a in artists if a.get_zorder() >= fill_zorder and a not in skip]
+
+        visible = {artist: artist.get_visible() for artist in artists}
+        old_canvas = fig.canvas
+        old_dpi = fig.get_dpi()
+        # we draw on our own Agg canvas, so this works with any backend
+        canvas = FigureCanvasAgg(fig)
+        fig.set_dpi(self.dpi)
+
+        def draw(layer_artists):
+            for artist in artists:
+                artist.set_visible(artist in layer_artists and visible[artist])
+            canvas.draw()
+            return np.asarray(canvas.buffer_rgba()).reshape(-1, 4)
+
+        def sparse(rgba, mask=True):
+            idx = np.flatnonzero((rgba[:, 3] > 0) & mask)
+            return idx, _premultiply(rgba[idx])
+
+        try:
+            # All sources are shown so that the fills and labels are drawn.
+            table.set_state(dict(state, sources=list(table.sources_on)))
+            under_rgba = _premultiply(draw(under))
+            fills_rgba = OrderedDict(
+                (source, sparse(draw([fill]))) for source, fill in fills.items()
+            )
+
+            # The labels share the text collections with the elements, so we only
+            # keep the pixels around each label.
+            rgba = draw(label_artists + text)
+            renderer = canvas.get_renderer()
+            height, width = int(renderer.height), int(renderer.width)
+            labels_rgba = []
+            for label, label_sources in labels.items():
+                extent = label.box.plot_item.get_window_extent(renderer)
+                # pixel coordinates start from the bottom, but images from the top
+                top = max(0, int(height - extent.y1) - _label_padding)
+                bottom = int(np.ceil(height - extent.y0)) + _label_padding
+                left = max(0, int(extent.x0) - _label_padding)
+                right = int(np.ceil(extent.x1)) + _label_padding
+                window = np.zeros((height, width), dtype=bool)
+                window[top:bottom, left:right] = True
+                labels_rgba.append((label_sources,) + sparse(rgba, window.ravel()))
+
+            # Then the element boxes and text, without any labels
+            table.set_state(dict(state, sources=[]))
+            over_rgba = _premultiply(draw(over))
+        finally:
+            for artist in artists:
+                artist.set_visible(visible[artist])
+            fig.set_dpi(old_dpi)
+            fig.set_canvas(old_canvas)
+            table.set_state(state)
+
+        return _Layers(
+            (height, width, 4), under_rgba, fills_rgba, over_rgba, labels_rgba
+        )
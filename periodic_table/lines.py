@@ -0,0 +1,68 @@
+from matplotlib.collections import LineCollection
+import numpy as np
+
+from .batched import BatchedCollection
+
+
+class LineBatch(BatchedCollection):
+    """
+    Lines drawn as one matplotlib LineCollection, each of which can be faded or
+    hidden.
+
+    Lines drawn separately are put in order by their zorder, which goes down when
+    they are faded. A collection is drawn all at once, so instead each line has a
+    zorder that sets the order lines are drawn in within the collection. Faded lines
+    are drawn before the others, just as they would be if they were separate.
+    """
+
+    def __init__(self, ax, fade_zorder_change=-10, **kwargs):
+        """
+        Initialize the collection and add it to an axis. It will start empty.
+
+        :param ax: Axis to add the lines to.
+        :param fade_zorder_change: How much the zorder of a line goes down when it is
+                                   faded.
+        :param kwargs: Additional keyword arguments passed to the LineCollection,
+                       which apply to all lines.
+        """
+        self.fade_zorder_change = fade_zorder_change
+        self._segments = []
+        self._linewidths = np.empty(0)
+        self._zorders = np.empty(0)
+        collection = LineCollection([], **kwargs)
+        ax.add_collection(collection, autolim=False)
+        super(LineBatch, self).__init__(collection, [], "edgecolor")
+
+    def add_line(self, xs, ys, color, linewidth, zorder=0):
+        """
+        Add a line to the collection.
+
+        :param xs: X values of the points on the line, in data coordinates.
+        :param ys: Y values of the points on the line, in data coordinates.
+        :param color: Color of the line.
+        :param linewidth: Width of the line in points.
+        :param zorder: Order to draw this line in, relative to the others in the
+                       collection.
+        :return: Object that can fade or hide this line.
+        :rtype: BatchedItem
+        """
+        self._segments.append(np.column_stack([xs, ys]).astype(float))
+        self._linewidths = np.append(self._linewidths, linewidth)
+        self._zorders = np.append(self._zorders, zorder)
+        return self.add(color)
+
+    def _update(self):
+        """
+        Push the lines that are not hidden to the collection in the order they are
+        drawn, with their colors.
+
+        :return: None
+        """
+        zorders = self._zorders + self.fade_zorder_change * self.faded
+        # the sort is stable, so lines with the same zorder are drawn in the order
+        # they were added
+        order = np.argsort(zorders, kind="stable")
+        order = order[~self.hidden[order]]
+        self.collection.set_segments([self._segments[idx] for idx in order])
+        self.collection.set_linewidths(self._linewidths[order])
+        self._set_color_base(self._colors()[order])
@@ -1,135 +1,116 @@
+from collections.abc import Mapping
+from contextlib import contextmanager
+import io
+import os
+
 import betterplotlib as bpl
-import matplotlib.patheffects as PathEffects
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 import matplotlib.patches as patches
+from matplotlib.collections import PolyCollection
+from matplotlib.font_manager import FontProperties
+import numpy as np
 
 from .element import Element, ColorChange
+from .batched import BatchedItem, fade_all, hide_all
+from .fills import FillBatch
+from .lines import LineBatch
+from .text import TextLayers
+from .instrument import Instruments
+from . import instrument
+from . import cache
+from . import geometry
+from . import query
+from . import catalog
+from . import datasets
+from . import state as table_state
+from . import style
+from .style import font
+
+# The style of the table is only applied to the table's figure, so we don't modify
+# the global matplotlib settings. See `style` for the rest of the style.
+savefig_kwargs = {"dpi": 300, "facecolor": "w"}
+
+# Formats that are drawn by the Agg canvas of the table. See `PeriodicTable._use_dpi`
+raster_formats = ["png", "jpg", "jpeg", "tif", "tiff", "webp", "raw", "rgba"]
+
+# The Element objects returned by `get_elements` are only created when they're
+# first needed.
+_elts = None
+
+
+def make_elements(colors=None, fractions=None):
+    """
+    Create a new Element object for every element in the catalog.
+
+    :param colors: Dictionary of the color of each source, shared by all the
+                   elements. Defaults to the default colors.
+    :param fractions: Fractions of all the elements, in the layout of
+                      `catalog.fractions`. Each element's fractions are a view
+                      into this. Defaults to `catalog.fractions`.
+    :return: List of all elements
+    :rtype: list
+    """
+    return [
+        Element.from_catalog(idx, colors, fractions)
+        for idx in range(len(catalog.elements))
+    ]
+
+
+def get_elements():
+    """
+    Get Element objects for all elements, creating them the first time.
+
+    These elements are not part of any table, and are only useful for their data.
+    Each table has its own elements, see `PeriodicTable.elts`.
+
+    :return: List of all elements
+    :rtype: list
+    """
+    global _elts
+    if _elts is None:
+        _elts = make_elements()
+    return _elts
+
 
-bpl.set_style(font="Avenir", fontweight="medium")
-
-# Element fractions come from Jennifer Johnson
-# https://science.sciencemag.org/content/363/6426/474
-# specifically table S1
-# https://science.sciencemag.org/content/sci/suppl/2019/01/30/363.6426.474.DC1/aau9540-Johnson-SM.pdf
-elts = [
-    Element(1, "H", 1, 1, frac_bb=1.00),
-    Element(2, "He", 1, 18, frac_bb=0.90, frac_snii=0.05, frac_agb=0.05),
-    Element(3, "Li", 2, 1, frac_bb=0.25, frac_agb=0.6, frac_cr=0.15),
-    Element(4, "Be", 2, 2, frac_cr=1.00),
-    Element(5, "B", 2, 13, frac_cr=1.00),
-    Element(6, "C", 2, 14, frac_agb=0.75, frac_snii=0.25),
-    Element(7, "N", 2, 15, frac_agb=0.75, frac_snii=0.25),
-    Element(8, "O", 2, 16, frac_snii=1.0),
-    Element(9, "F", 2, 17, frac_snii=1.0),
-    Element(10, "Ne", 2, 18, frac_snii=1.0),
-    Element(11, "Na", 3, 1, frac_snii=1.0),
-    Element(12, "Mg", 3, 2, frac_snii=0.99, frac_snia=0.01),
-    Element(13, "Al", 3, 13, frac_snii=1.0),
-    Element(14, "Si", 3, 14, frac_snii=0.70, frac_snia=0.30),
-    Element(15, "P", 3, 15, frac_snii=0.97, frac_snia=0.03),
-    Element(16, "S", 3, 16, frac_snii=0.57, frac_snia=0.43),
-    Element(17, "Cl", 3, 17, frac_snii=0.83, frac_snia=0.17),
-    Element(18, "Ar", 3, 18, frac_snii=0.56, frac_snia=0.44),
-    Element(19, "K", 4, 1, frac_snii=0.81, frac_snia=0.19),
-    Element(20, "Ca", 4, 2, frac_snii=0.50, frac_snia=0.50),
-    Element(21, "Sc", 4, 3, frac_snii=0.81, frac_snia=0.19),
-    Element(22, "Ti", 4, 4, frac_snii=0.34, frac_snia=0.66),
-    Element(23, "V", 4, 5, frac_snii=0.26, frac_snia=0.74),
-    Element(24, "Cr", 4, 6, frac_snii=0.24, frac_snia=0.76),
-    Element(25, "Mn", 4, 7, frac_snii=0.18, frac_snia=0.82),
-    Element(26, "Fe", 4, 8, frac_snii=0.32, frac_snia=0.68),
-    Element(27, "Co", 4, 9, frac_snii=0.32, frac_snia=0.68),
-    Element(28, "Ni", 4, 10, frac_snii=0.29, frac_snia=0.71),
-    Element(29, "Cu", 4, 11, frac_snii=0.42, frac_snia=0.58),
-    Element(30, "Zn", 4, 12, frac_snii=0.44, frac_snia=0.56),
-    Element(31, "Ga", 4, 13, frac_snii=1.0),
-    Element(32, "Ge", 4, 14, frac_snii=1.0),
-    Element(33, "As", 4, 15, frac_snii=1.0),
-    Element(34, "Se", 4, 16, frac_snii=1.0),
-    Element(35, "Br", 4, 17, frac_snii=1.0),
-    Element(36, "Kr", 4, 18, frac_snii=1.0),
-    Element(37, "Rb", 5, 1, frac_snii=1.0),
-    Element(38, "Sr", 5, 2, frac_s=0.87, frac_snii=0.13),
-    Element(39, "Y", 5, 3, frac_s=0.92, frac_snii=0.08),
-    Element(40, "Zr", 5, 4, frac_s=0.84, frac_snii=0.16),
-    Element(41, "Nb", 5, 5, frac_s=0.85, frac_r=0.15),
-    Element(42, "Mo", 5, 6, frac_s=0.62, frac_r=0.38),
-    Element(43, "Tc", 5, 7, frac_unstable=1.0),
-    Element(44, "Ru", 5, 8, frac_s=0.33, frac_r=0.67),
-    Element(45, "Rh", 5, 9, frac_s=0.14, frac_r=0.86),
-    Element(46, "Pd", 5, 10, frac_s=0.46, frac_r=0.54),
-    Element(47, "Ag", 5, 11, frac_s=0.20, frac_r=0.80),
-    Element(48, "Cd", 5, 12, frac_s=0.53, frac_r=0.47),
-    Element(49, "In", 5, 13, frac_s=0.36, frac_r=0.64),
-    Element(50, "Sn", 5, 14, frac_s=0.70, frac_r=0.30),
-    Element(51, "Sb", 5, 15, frac_s=0.25, frac_r=0.75),
-    Element(52, "Te", 5, 16, frac_s=0.58, frac_r=0.42),
-    Element(53, "I", 5, 17, frac_s=0.05, frac_r=0.95),
-    Element(54, "Xe", 5, 18, frac_s=0.17, frac_r=0.83),
-    Element(55, "Cs", 6, 1, frac_s=0.15, frac_r=0.85),
-    Element(56, "Ba", 6, 2, frac_s=0.81, frac_r=0.19),
-    Element(57, "La", 9, 4, frac_s=0.62, frac_r=0.38),
-    Element(58, "Ce", 9, 5, frac_s=0.76, frac_r=0.24),
-    Element(59, "Pr", 9, 6, frac_s=0.49, frac_r=0.51),
-    Element(60, "Nd", 9, 7, frac_s=0.60, frac_r=0.40),
-    Element(61, "Pm", 9, 8, frac_unstable=1.0),
-    Element(62, "Sm", 9, 9, frac_s=0.30, frac_r=0.70),
-    Element(63, "Eu", 9, 10, frac_s=0.06, frac_r=0.94),
-    Element(64, "Gd", 9, 11, frac_s=0.15, frac_r=0.85),
-    Element(65, "Tb", 9, 12, frac_s=0.07, frac_r=0.93),
-    Element(66, "Dy", 9, 13, frac_s=0.15, frac_r=0.85),
-    Element(67, "Ho", 9, 14, frac_s=0.08, frac_r=0.92),
-    Element(68, "Er", 9, 15, frac_s=0.17, frac_r=0.83),
-    Element(69, "Tm", 9, 16, frac_s=0.13, frac_r=0.87),
-    Element(70, "Yb", 9, 17, frac_s=0.33, frac_r=0.67),
-    Element(71, "Lu", 9, 18, frac_s=0.20, frac_r=0.80),
-    Element(72, "Hf", 6, 4, frac_s=0.56, frac_r=0.44),
-    Element(73, "Ta", 6, 5, frac_s=0.41, frac_r=0.59),
-    Element(74, "W", 6, 6, frac_s=0.56, frac_r=0.44),
-    Element(75, "Re", 6, 7, frac_s=0.09, frac_r=0.91),
-    Element(76, "Os", 6, 8, frac_s=0.09, frac_r=0.91),
-    Element(77, "Ir", 6, 9, frac_s=0.01, frac_r=0.99),
-    Element(78, "Pt", 6, 10, frac_s=0.05, frac_r=0.95),
-    Element(79, "Au", 6, 11, frac_s=0.06, frac_r=0.94),
-    Element(80, "Hg", 6, 12, frac_s=0.61, frac_r=0.39),
-    Element(81, "Tl", 6, 13, frac_s=0.76, frac_r=0.24),
-    Element(82, "Pb", 6, 14, frac_s=0.87, frac_r=0.13),
-    Element(83, "Bi", 6, 15, frac_s=0.26, frac_r=0.74),
-    Element(84, "Po", 6, 16, frac_unstable=1.0),
-    Element(85, "At", 6, 17, frac_unstable=1.0),
-    Element(86, "Rn", 6, 18, frac_unstable=1.0),
-    Element(87, "Fr", 7, 1, frac_unstable=1.0),
-    Element(88, "Ra", 7, 2, frac_unstable=1.0),
-    Element(89, "Ac", 10, 4, frac_unstable=1.0),
-    Element(90, "Th", 10, 5, frac_r=1.0),
-    Element(91, "Pa", 10, 6, frac_unstable=1.0),
-    Element(92, "U", 10, 7, frac_r=1.0),
-    Element(93, "Np", 10, 8, frac_unstable=1.0),
-    Element(94, "Pu", 10, 9, frac_r=1.0),
-    Element(95, "Am", 10, 10, frac_unstable=1.0),
-    Element(96, "Cm", 10, 11, frac_unstable=1.0),
-    Element(97, "Bk", 10, 12, frac_unstable=1.0),
-    Element(98, "Cf", 10, 13, frac_unstable=1.0),
-    Element(99, "Es", 10, 14, frac_unstable=1.0),
-    Element(100, "Fm", 10, 15, frac_unstable=1.0),
-    Element(101, "Md", 10, 16, frac_unstable=1.0),
-    Element(102, "No", 10, 17, frac_unstable=1.0),
-    Element(103, "Lr", 10, 18, frac_unstable=1.0),
-    Element(104, "Rf", 7, 4, frac_unstable=1.0),
-    Element(105, "Db", 7, 5, frac_unstable=1.0),
-    Element(106, "Sg", 7, 6, frac_unstable=1.0),
-    Element(107, "Bh", 7, 7, frac_unstable=1.0),
-    Element(108, "Hs", 7, 8, frac_unstable=1.0),
-    Element(109, "Mt", 7, 9, frac_unstable=1.0),
-    Element(110, "Ds", 7, 10, frac_unstable=1.0),
-    Element(111, "Rg", 7, 11, frac_unstable=1.0),
-    Element(112, "Cn", 7, 12, frac_unstable=1.0),
-    Element(113, "Nh", 7, 13, frac_unstable=1.0),
-    Element(114, "Fl", 7, 14, frac_unstable=1.0),
-    Element(115, "Mc", 7, 15, frac_unstable=1.0),
-    Element(116, "Lv", 7, 16, frac_unstable=1.0),
-    Element(117, "Ts", 7, 17, frac_unstable=1.0),
-    Element(118, "Og", 7, 18, frac_unstable=1.0),
-]
+def __getattr__(name):
+    # `elts` used to be a module level list. Keep it available, but only create it
+    # when it's used.
+    if name == "elts":
+        return get_elements()
+    raise AttributeError("module {} has no attribute {}".format(__name__, name))
+
+
+def _label_visibility(bits):
+    """
+    Get which parts of a label are visible.
+
+    :param bits: Bits of the label. See `state.TableState`.
+    :return: Whether the box, the highlighted text, and the plain text are visible.
+    :rtype: tuple
+    """
+    shown = bool(bits & table_state.LABEL_SHOWN)
+    highlight = bool(bits & table_state.LABEL_HIGHLIGHT)
+    return shown, shown and highlight, shown and not highlight
+
+
+def _artists(items):
+    """
+    Get the matplotlib artists that draw some items.
+
+    :param items: List of `BatchedItem` or `ColorChange` objects.
+    :return: List of the artists, without repeats.
+    :rtype: list
+    """
+    artists = []
+    for item in items:
+        if isinstance(item, BatchedItem):
+            artist = item.batch.collection
+        else:
+            artist = item.plot_item
+        if artist not in artists:
+            artists.append(artist)
+    return artists
 
 
 class SourceLabels(object):
@@ -137,11 +118,23 @@ class SourceLabels(object):
     Class holding the labels that go at the top of the table.
     """
 
-    def __init__(self, ax, x_idx, y_idx, text, color):
+    __slots__ = (
+        "shown",
+        "highlight",
+        "ax",
+        "box",
+        "box_lines",
+        "text_hl",
+        "text_hl_stroke",
+        "text",
+    )
+
+    def __init__(self, ax, text_layers, x_idx, y_idx, text, color):
         """
         Initialize these labels
 
         :param ax: Axis where these labels willbe placed
+        :param text_layers: TextLayers object that draws all text on the axis.
         :param x_idx: The x index in the grid of labels. This is not the element
                       position, this is the index among the labls.
         :param y_idx: The y index in the grid of labels. This is not the element
@@ -154,33 +147,13 @@ class SourceLabels(object):
         self.highlight = False
         self.ax = ax
 
-        fontsize = 27
-
-        # Then figure out where to put the label. We do some math based on the available
-        # spacing, then figure out where to put this one
-        # idx starts from bottom left
-        spacing = 0.25
-        # The X space for these labels goes from 3 to 13.
-        x_0 = 3
-        x_1 = 13
-        # we need 3 spaces: left, right, center
-        width_rect = ((x_1 - x_0) - 3 * spacing) / 2.0
-
-        # Y space goes from 8 to 11
-        y_0 = 8
-        y_1 = 11
-        # we need 4 spaces: bottom, inbetween the 3 labels. No space at top, it aligns
-        # with the top of the figure.
-        height_rect = ((y_1 - y_0) - 4 * spacing) / 4.0
-
-        # The text needs to be offset by half the box size
+        fontsize = style.label_fontsize
+
+        # Then figure out where to put the label, and the text in its center.
+        x, y, width_rect, height_rect = geometry.label_box(x_idx, y_idx)
         dx_text = width_rect / 2.0
         dy_text = height_rect / 2.0
 
-        # Then figure out where the lower left corner of the box is
-        x = x_0 + spacing * (x_idx + 1) + width_rect * x_idx
-        y = y_0 + spacing * (y_idx + 1) + height_rect * y_idx
-
         # Then we can add the box to the plot. Note that we have to make the edge line
         # separately, since the fade functions only handle facecolor of the box.
         rect = patches.Rectangle(
@@ -198,7 +171,7 @@ class SourceLabels(object):
         lines = ax.plot(
             [x, x, x + width_rect, x + width_rect, x],
             [y, y + height_rect, y + height_rect, y, y],
-            lw=1,
+            lw=style.label_linewidth,
             color=bpl.almost_black,
         )
 
@@ -206,40 +179,27 @@ class SourceLabels(object):
         self.box = ColorChange(rect)
         self.box_lines = [ColorChange(l) for l in lines]
 
-        # Then add the text for the highlight
+        # Then add the text for the highlight. The text and its outline are separate
+        # objects.
         highlight_color = "white"
-        txt_hl = self.ax.add_text(
+        self.text_hl, self.text_hl_stroke = text_layers.add_highlight_text(
             x=x + dx_text,
             y=y + dy_text,
-            ha="center",
-            va="center",
-            zorder=3,
-            color=highlight_color,
             text=text,
             fontsize=fontsize,
+            color=highlight_color,
+            stroke_color=bpl.almost_black,
+            linewidth=style.label_highlight_linewidth,
         )
-        txt_hl.set_path_effects(
-            [PathEffects.withStroke(linewidth=4, foreground=bpl.almost_black)]
-        )
-        # Setting the ColorChange for the highted text is tricky. We should use both
-        # the main object (although I don't think it will matter becase it is white),
-        # but also the path effect that is highlighted.
-        self.text_hl_stroke = ColorChange(txt_hl._path_effects[0])
-        self.text_hl = ColorChange(txt_hl)
-        # hide it initially. This hides the stroke too.
-        self.text_hl.hide()
 
         # then add the regular text.
-        txt = self.ax.add_text(
+        self.text = text_layers.add_text(
             x=x + dx_text,
             y=y + dy_text,
-            ha="center",
-            va="center",
-            zorder=3,
             text=text,
             fontsize=fontsize,
+            color=bpl.almost_black,
         )
-        self.text = ColorChange(txt)
 
         # The labels are initially hidden
         self.unshow()
@@ -269,6 +229,7 @@ class SourceLabels(object):
         self.shown = False
         self.text.hide()
         self.text_hl.hide()
+        self.text_hl_stroke.hide()
         self.box.hide()
         for line in self.box_lines:
             line.hide()
@@ -282,6 +243,7 @@ class SourceLabels(object):
         self.highlight = True
         if self.shown:  # only highlight the text if the label is already shown.
             self.text_hl.unhide()
+            self.text_hl_stroke.unhide()
             self.text.hide()
 
     def highlight_off(self):
@@ -293,20 +255,27 @@ class SourceLabels(object):
         self.highlight = False
         if self.shown:  # only unhighlight the text if the label is already shown.
             self.text_hl.hide()
+            self.text_hl_stroke.hide()
             self.text.unhide()
 
+    def parts(self):
+        """
+        Get everything drawn for this label, which is faded along with it.
+
+        :return: List of the text, box, and box outline of this label.
+        :rtype: list
+        """
+        return [self.text_hl, self.text_hl_stroke, self.text, self.box] + list(
+            self.box_lines
+        )
+
     def fade(self, to_print=False):
         """
         Fade all attributes on this label
 
         :return: None
         """
-        self.text_hl.fade()
-        self.text_hl_stroke.fade()
-        self.text.fade()
-        self.box.fade()
-        for line in self.box_lines:
-            line.fade()
+        fade_all(self.parts(), True)
 
     def unfade(self):
         """
@@ -314,63 +283,82 @@ class SourceLabels(object):
 
         :return: None
         """
-        self.text_hl.unfade()
-        self.text_hl_stroke.unfade()
-        self.text.unfade()
-        self.box.unfade()
-        for line in self.box_lines:
-            line.unfade()
+        fade_all(self.parts(), False)
 
 
 class PeriodicTable(object):
     def __init__(
         self,
-        label_bb="Big Bang",
-        label_cr="Cosmic Ray Spallation",
-        label_agb="Low Mass Stars",
-        label_snii="Exploding Massive Stars",
-        label_snia="Exploding White Dwarfs",
-        label_r="Merging Neutron Stars?",
-        label_unstable="Not Naturally Occurring",
-        color_bb="#D7E5CC",
-        color_cr="#C3DDFA",
-        color_snia="#fe9443",
-        color_snii="#FEE844",
-        color_r="#AFBF75",
-        color_agb="#73A0CC",
-        color_unstable="#CCCCCC",
+        label_bb=style.default_labels["bb"],
+        label_cr=style.default_labels["cr"],
+        label_agb=style.default_labels["s"],
+        label_snii=style.default_labels["snii"],
+        label_snia=style.default_labels["snia"],
+        label_r=style.default_labels["r"],
+        label_unstable=style.default_labels["unstable"],
+        color_bb=style.default_colors["bb"],
+        color_cr=style.default_colors["cr"],
+        color_snia=style.default_colors["snia"],
+        color_snii=style.default_colors["snii"],
+        color_r=style.default_colors["r"],
+        color_agb=style.default_colors["s"],
+        color_unstable=style.default_colors["unstable"],
+        dataset=None,
+        metrics=None,
     ):
         """
         Set up the periodic table figure and axes.
+
+        :param dataset: Fractions of each element's abundance from each source, as
+                        a `datasets.Dataset`. Defaults to the fractions from
+                        Johnson (2019) in the catalog.
+        :param metrics: Function called with the time taken by each phase of
+                        building, changing, and saving the table. See
+                        `instrument`. If None, nothing is timed.
         """
-        # set the element color scheme. This attribute is shared by all members of the
-        # element class, so it will be applied to all.
-        elts[0].set_scheme(
-            color_bb,
-            color_cr,
-            color_snia,
-            color_snii,
-            color_r,
-            color_agb,
-            color_unstable,
-        )
+        # Store the labels and colors, since they are part of what the table looks
+        # like. See `state_hash`
+        self._config = {
+            name: value
+            for name, value in locals().items()
+            if name not in ["self", "dataset", "metrics"]
+        }
+        self._instruments = Instruments(metrics)
+        laps = self._instruments.laps("construct")
+
+        # Each table has its own elements, which all share the table's colors. Nothing
+        # is shared with other tables, so tables can be used from different threads.
+        self._colors = {
+            "bb": color_bb,
+            "cr": color_cr,
+            "snii": color_snii,
+            "snia": color_snia,
+            "agb": color_agb,
+            "s": color_agb,
+            "r": color_r,
+            "unstable": color_unstable,
+        }
+        # The table keeps its own copy of the fractions, which the elements and
+        # fills are made from.
+        if dataset is None:
+            dataset = datasets.johnson2019
+        self.dataset = dataset
+        self._fractions = np.array(dataset.fractions)
+        # counts the changes to the fractions, for anything cached from them
+        self._fractions_version = 0
+        self.elts = make_elements(self._colors, self._fractions)
+        laps.lap("elements")
 
         # The periodic table layout has 18 columns and 9 rows (counting Lanthanides and
         # Actinides separately). I'll add spacing columns on the left and right, top and
         # bottom, plus between the Lanthanides and Actinides and the rest of the table.
         # we make the figure 1 inch per square. There will be no space on the outside.
-        fig, ax = bpl.subplots(
-            figsize=[20, 12],
-            tight_layout=False,
-            gridspec_kw={
-                "hspace": 0,
-                "wspace": 0,
-                "left": 0,
-                "right": 1,
-                "bottom": 0,
-                "top": 1,
-            },
-        )
+        # The figure is not made with pyplot, which is not thread safe. It has its
+        # own Agg canvas instead, so tables can be drawn from different threads.
+        fig = Figure(figsize=[20, 12])
+        FigureCanvasAgg(fig)
+        fig.subplots_adjust(left=0, right=1, bottom=0, top=1, hspace=0, wspace=0)
+        ax = fig.add_subplot(projection="bpl")
 
         self._fig = fig
         self._ax = ax
@@ -391,42 +379,283 @@ class PeriodicTable(object):
         # and make the overall axis transparent.
         self._ax.patch.set_alpha(0)
 
-        # add the lines connecting the Lanthanides and Actinides
-        l1 = self._ax.plot(
-            [3, 3.6666666, 3.666666, 4],
-            [5.5, 5.5, 2.5, 2.5],
-            lw=4,
-            c=bpl.almost_black,
-            zorder=-1000,
-        )
-        l2 = self._ax.plot(
-            [3, 3.3333333, 3.333333, 4],
-            [4.5, 4.5, 1.5, 1.5],
-            lw=4,
-            c=bpl.almost_black,
-            zorder=-1000,
-        )
-        self._connector_lines = [ColorChange(segment) for segment in l1 + l2]
+        # All the text on the table is drawn by these glyph collections
+        self._text = TextLayers(self._ax, FontProperties(**font))
 
-        # add the labels
-        self._labels = dict()
-        self._labels["bb"] = SourceLabels(self._ax, 0, 3, label_bb, color_bb)
-        self._labels["cr"] = SourceLabels(self._ax, 1, 3, label_cr, color_cr)
-        self._labels["s"] = SourceLabels(self._ax, 0, 2, label_agb, color_agb)
-        self._labels["agb"] = self._labels["s"]
-        self._labels["snii"] = SourceLabels(self._ax, 1, 2, label_snii, color_snii)
-        self._labels["snia"] = SourceLabels(self._ax, 0, 1, label_snia, color_snia)
-        self._labels["r"] = SourceLabels(self._ax, 1, 1, label_r, color_r)
-        self._labels["unstable"] = SourceLabels(
-            self._ax, 0, 0, label_unstable, color_unstable
+        # All the lines on the table (the element boxes and the lines connecting the
+        # Lanthanides and Actinides) are drawn by one collection, on top of the text.
+        # The lines keep the order they would have had as separate artists, so the
+        # connectors are drawn first, underneath everything else.
+        self._lines = LineBatch(
+            self._ax, zorder=100, capstyle="projecting", joinstyle="round"
         )
+        self._connector_lines = [
+            self._lines.add_line(
+                xs, ys, bpl.almost_black, style.connector_linewidth, zorder=-1000
+            )
+            for xs, ys in geometry.connector_lines
+        ]
+        laps.lap("figure")
+
+        # add the labels. AGB and S share a label.
+        labels = {
+            "bb": label_bb,
+            "cr": label_cr,
+            "s": label_agb,
+            "snii": label_snii,
+            "snia": label_snia,
+            "r": label_r,
+            "unstable": label_unstable,
+        }
+        colors = {
+            "bb": color_bb,
+            "cr": color_cr,
+            "s": color_agb,
+            "snii": color_snii,
+            "snia": color_snia,
+            "r": color_r,
+            "unstable": color_unstable,
+        }
+        self._labels = dict()
+        for source, (x_idx, y_idx) in geometry.label_positions.items():
+            self._labels[source] = SourceLabels(
+                self._ax, self._text, x_idx, y_idx, labels[source], colors[source]
+            )
+            if source == "s":
+                self._labels["agb"] = self._labels["s"]
 
         # have a dictionary showing which sources are visible
         self.sources_on = {label: False for label in self._labels}
+        # Everything visible on the table is also held as bits, which are compared to
+        # find what changes when the state changes. See `set_state`
+        self._bits = table_state.TableState.encode(fractions=self._fractions)
+        # Inside `batch`, the state to change to once the batch is done.
+        self._batch_depth = 0
+        self._pending = None
+        # then keep track of what is highlighted and isolated. See `get_state`
+        self.highlighted = None
+        self.isolated = None
+        self.isolated_label = False
+
+        laps.lap("labels")
 
         # Then add each of the elements
-        for elt in elts:
-            elt.setup(self._ax)
+        for elt in self.elts:
+            elt.setup(self._ax, self._text, self._lines)
+        laps.lap("element_setup", count=len(self.elts))
+        self._setup_fills()
+        laps.lap("fills")
+        laps.done()
+
+    def _setup_fills(self):
+        """
+        Draw the fills of all elements, then hand them out to the elements.
+
+        Rather than each element drawing its own fills, we draw one collection per
+        source that holds the fills of all elements. This is much faster to draw.
+
+        :return: None
+        """
+        # fill the boxes white. This will be the base that's seen when the sources are
+        # hidden.
+        self._white_fill = PolyCollection(
+            [
+                [
+                    (elt.column, elt.row),
+                    (elt.column + 1, elt.row),
+                    (elt.column + 1, elt.row + 1),
+                    (elt.column, elt.row + 1),
+                ]
+                for elt in self.elts
+            ],
+            facecolors="white",
+            alpha=0.5,
+            lw=0,
+            zorder=-100,
+        )
+        self._ax.add_collection(self._white_fill)
+
+        # Then calculate the fills of all the sources at once
+        fracs = self._fractions
+        columns = catalog.columns
+        # The rows are flipped on the table, see `Element`
+        rows = 11 - catalog.rows
+        verts = geometry.fill_vertices(fracs, columns, rows)
+
+        self._fills = dict()
+        # The index of each element's fill in the collection of each source, or -1 if
+        # the source doesn't contribute to the element.
+        self._fill_idx = dict()
+        for s_idx, source in enumerate(geometry.sources):
+            # only elements with some contribution from this source get a fill
+            elt_idxs = np.flatnonzero(fracs[:, s_idx] > 0)
+            # The zorder of a collection can't change for only some of its members
+            # when they are faded, so we always use the faded zorder. This keeps the
+            # fills below the (possibly faded) text and boxes.
+            self._fills[source] = FillBatch(
+                self._ax,
+                verts[elt_idxs, s_idx],
+                [self._colors[source]] * len(elt_idxs),
+                lw=0,
+                zorder=-9,
+            )
+            # hide all the fills to start
+            self._fills[source].hide(slice(None))
+            self._fill_idx[source] = np.full(len(self.elts), -1)
+            self._fill_idx[source][elt_idxs] = np.arange(len(elt_idxs))
+
+            for fill_idx, elt_idx in enumerate(elt_idxs):
+                self.elts[elt_idx].fills[source] = self._fills[source].item(fill_idx)
+
+    def set_fractions(self, *args, **fractions):
+        """
+        Change the fractions of some elements, without making the table again.
+
+        Either give one element and its fractions as keywords, a dictionary with
+        elements as keys and dictionaries of their fractions as values, or an array
+        of the fractions of every element in the layout of `catalog.fractions`:
+
+            table.set_fractions("Eu", r=0.9, s=0.1)
+            table.set_fractions({"Eu": {"r": 0.9, "s": 0.1}, "Fe": {"snia": 1.0}})
+            table.set_fractions(catalog.fractions)
+
+        Sources that are left out of an element's fractions are set to zero. The
+        new fractions are checked the same way as those of the catalog, and nothing
+        is changed if any are invalid. Only the fills of the elements that changed
+        are moved, and what is highlighted is updated to match. Unlike changes to
+        what is shown, this happens right away, even inside `batch`.
+
+        :param args: Symbol or number of an element, a dictionary of elements, or an
+                     array of the fractions of every element.
+        :param fractions: Fraction from each source, when one element is given.
+        :return: Dictionary with the symbols of the elements whose fractions changed
+                 ("elements"), and the matplotlib artists that look different and
+                 need to be drawn again ("artists").
+        :rtype: dict
+        """
+        if len(args) == 1 and np.ndim(args[0]) == 2 and not fractions:
+            new_fractions = np.array(args[0], dtype=float)
+            if new_fractions.shape != catalog.fractions.shape:
+                raise ValueError(
+                    "Fractions must have shape {}, not {}.".format(
+                        catalog.fractions.shape, new_fractions.shape
+                    )
+                )
+            catalog.check_fractions(new_fractions, catalog.symbols)
+            return self._change_fractions(new_fractions)
+        elif len(args) == 1 and isinstance(args[0], Mapping) and not fractions:
+            changes = args[0]
+        elif len(args) == 1 and not isinstance(args[0], Mapping):
+            changes = {args[0]: fractions}
+        else:
+            raise ValueError(
+                "Give either one element and its fractions, or a dictionary of "
+                "elements and their fractions."
+            )
+
+        idxs = np.array([catalog.index(element) for element in changes], dtype=int)
+        rows = np.zeros((len(idxs), len(catalog.sources)))
+        for row, fracs in zip(rows, changes.values()):
+            for source, frac in fracs.items():
+                if source.lower() not in catalog.source_idx:
+                    raise ValueError("Source {} not correct.".format(source))
+                row[catalog.source_idx[source.lower()]] = frac
+        catalog.check_fractions(rows, catalog.symbols[idxs])
+
+        new_fractions = np.array(self._fractions)
+        new_fractions[idxs] = rows
+        return self._change_fractions(new_fractions)
+
+    def _change_fractions(self, fractions):
+        """
+        Change the fractions of the elements, moving the fills of the elements that
+        changed in place rather than drawing them again.
+
+        The fractions are not checked here. See `set_fractions`.
+
+        :param fractions: Array of the fractions of all elements, in the layout of
+                          `catalog.fractions`.
+        :return: What changed. See `set_fractions`.
+        :rtype: dict
+        """
+        fractions = np.asarray(fractions, dtype=float)
+        changed = np.flatnonzero(np.any(fractions != self._fractions, axis=1))
+        if len(changed) == 0:
+            return {"elements": [], "artists": []}
+        # The elements' fractions are views of these, so they change too
+        self._fractions[changed] = fractions[changed]
+        self._fractions_version += 1
+        verts = geometry.fill_vertices(
+            self._fractions[changed],
+            catalog.columns[changed],
+            11 - catalog.rows[changed],
+        )
+        artists = []
+        for s_idx, source in enumerate(geometry.sources):
+            fill = self._fills[source]
+            fill_idx = self._fill_idx[source][changed]
+            has_fill = fill_idx >= 0
+            if np.any(has_fill):
+                # Fills of sources that no longer contribute are kept, but with no
+                # area, so they are ready if the source contributes again.
+                fill.set_vertices(fill_idx[has_fill], verts[has_fill, s_idx])
+            # Elements that a source contributes to for the first time get a fill
+            new_fill = ~has_fill & (fractions[changed, s_idx] > 0)
+            for idx in np.flatnonzero(new_fill):
+                elt = self.elts[changed[idx]]
+                item = fill.add_fill(verts[idx, s_idx], self._colors[source])
+                if not elt.shown[source]:
+                    item.hide()
+                if elt.faded:
+                    item.fade()
+                elt.fills[source] = item
+                self._fill_idx[source][changed[idx]] = item.idx
+            if np.any(has_fill) or np.any(new_fill):
+                artists.append(fill.collection)
+
+        # What is highlighted depends on the fractions
+        new = table_state.TableState.encode(self.get_state(), self._fractions)
+        if self._batch_depth > 0:
+            self._pending = new
+        else:
+            for artist in _artists(self._transition(new)):
+                if artist not in artists:
+                    artists.append(artist)
+        return {"elements": catalog.symbols[changed].tolist(), "artists": artists}
+
+    def _dynamic_artists(self):
+        """
+        Get the artists that change when sources are shown or highlighted.
+
+        :return: List of matplotlib artists
+        :rtype: list
+        """
+        artists = [fill.collection for fill in self._fills.values()]
+        artists += self._text.collections()
+        for label in self._labels.values():
+            artists.append(label.box.plot_item)
+            artists += [line.plot_item for line in label.box_lines]
+        return artists
+
+    def interactive(self, **kwargs):
+        """
+        Start interactive mode, where only the parts of the table that change are
+        redrawn. See `interactive.InteractiveTable` for the details and the options.
+
+        :param kwargs: Keyword arguments passed to `InteractiveTable`.
+        :return: Object controlling the interactive mode. Call its `update` method
+                 to show changes made to the table.
+        :rtype: InteractiveTable
+        """
+        from .interactive import InteractiveTable
+
+        if self._fig.canvas.manager is None:
+            # The figure isn't made with pyplot, so it has no window to interact
+            # with. Hand it to pyplot to get one from the current backend.
+            import matplotlib.pyplot as plt
+
+            plt.figure(FigureClass=lambda *args, **kwargs: self._fig)
+        return InteractiveTable(self, **kwargs)
 
     def highlight_source(self, source):
         """
@@ -438,20 +667,7 @@ class PeriodicTable(object):
         :param source: Source to highlight
         :return: None
         """
-        source = source.lower()
-        # start with the labels
-        for label in self._labels:
-            # the AGB label is tricky, since there is an alias in the labels list.
-            # We need to be sure we don't accidentally unhighlight one of the aliases
-            abg_aliases = ["s", "agb", "low mass"]
-            if label == source or (label in abg_aliases and source in abg_aliases):
-                self._labels[label].highlight_on()
-            else:
-                self._labels[label].highlight_off()
-
-        # Then the elements
-        for elt in elts:
-            elt.highlight_source(source)
+        self.set_state(dict(self.get_state(), highlight=source))
 
     def unhighlight_all_sources(self):
         """
@@ -459,12 +675,19 @@ class PeriodicTable(object):
 
         :return: None
         """
-        # go through the labels.
-        for label in self._labels:
-            self._labels[label].highlight_off()
-        # then the elements
-        for elt in elts:
-            elt.highlight_source(None)
+        self.set_state(dict(self.get_state(), highlight=None))
+
+    def _parse_sources(self, sources):
+        """
+        Check that the sources given by the user are valid, and put them in the
+        format used internally. See `state.parse_sources`.
+
+        :param sources: List of source names, in any case.
+        :return: List of lowercase source names, with the "low mass" source
+                 replaced by the S and AGB sources it stands for.
+        :rtype: list
+        """
+        return table_state.parse_sources(sources)
 
     def show_source(self, *args):
         """
@@ -473,27 +696,8 @@ class PeriodicTable(object):
         :param args: As many sources as you want to add.
         :return: None
         """
-        sources = [item.lower() for item in args]
-        # there is a separate low mass label that is both AGB and S
-        if "low mass" in sources:
-            sources.append("s")
-            sources.append("agb")
-            sources.remove("low mass")
-
-        # then add these to our dictionary. This also does the error checking
-        for source in sources:
-            if source not in self.sources_on:
-                raise ValueError("Source {} not correct.".format(source))
-            self.sources_on[source] = True
-
-        # add the labels
-        for source in sources:
-            self._labels[source].show()
-
-        # Then show all the elements
-        for elt in elts:
-            for source in sources:
-                elt.show_source(source)
+        sources = self.get_state()["sources"] + self._parse_sources(args)
+        self.set_state(dict(self.get_state(), sources=sources))
 
     def unshow_source(self, *args):
         """
@@ -502,33 +706,9 @@ class PeriodicTable(object):
         :param args: As many sources as you want to unshow
         :return: None
         """
-        sources = [item.lower() for item in args]
-        # there is a separate low mass label that is both AGB and S
-        if "low mass" in sources:
-            sources.append("s")
-            sources.append("agb")
-            sources.remove("low mass")
-
-        # then add these to our dictionary. This also does the error checking
-        for source in sources:
-            if source not in self.sources_on:
-                raise ValueError("Source {} not correct.".format(source))
-            self.sources_on[source] = False
-
-        # go through the labels. We have to be careful about AGB and S process. We want
-        # the label if either of those is present
-        for source in sources:
-            if source in ["agb", "s"]:
-                if self.sources_on["agb"] is False and self.sources_on["s"] is False:
-                    self._labels[source].unshow()
-            # otherwise we just remove it
-            else:
-                self._labels[source].unshow()
-
-        # then do the elements
-        for elt in elts:
-            for source in sources:
-                elt.unshow_source(source)
+        to_unshow = self._parse_sources(args)
+        sources = [s for s in self.get_state()["sources"] if s not in to_unshow]
+        self.set_state(dict(self.get_state(), sources=sources))
 
     def show_all_sources(self):
         """
@@ -550,44 +730,42 @@ class PeriodicTable(object):
         """
         self.unshow_source("bb", "cr", "s", "agb", "snii", "snia", "r", "unstable")
 
+    def select(self, *conditions, **fields):
+        """
+        Select the elements matching some conditions, to pass to `isolate_elt` or
+        `isolate_elt_label`. See `query.select` for the conditions, which are
+        evaluated with this table's fractions.
+
+        :param conditions: Selections, like `query.frac_r > 0.9`.
+        :param fields: Values of "number", "period", "row", or "column" to select.
+        :return: The selected elements.
+        :rtype: query.Selection
+        """
+        return query.select(*conditions, fractions=self._fractions, **fields)
+
     def isolate_elt(self, *args):
         """
         Isolate a given element by fading all other elements.
 
-        :param args: As many elements as you want to isolate.
+        :param args: As many elements as you want to isolate, given by symbol or
+                     number, or as Selections from `select`. With none, every
+                     element is faded.
         :return: None
         """
-        # fade the Lanthanide and Actinide lines
-        for l in self._connector_lines:
-            l.fade()
-
-        # fade all labels
-        for label in self._labels:
-            self._labels[label].fade()
-
-        # then fade the elements that are not listed
-        for elt in elts:
-            if elt.symbol not in args:
-                elt.fade()
-            else:
-                elt.unfade()
+        isolate = query.to_symbols(args, self._fractions)
+        self.set_state(dict(self.get_state(), isolate=isolate, isolate_label=False))
 
     def isolate_elt_label(self, *args):
         """
         Isolate a given element by fading all other elements. This also fades all the
         labels other than the ones that are primary in the elements isolated.
 
-        :param args: As many elements as you want to isolate.
+        :param args: As many elements as you want to isolate, given by symbol or
+                     number, or as Selections from `select`.
         :return: None
         """
-        # first use the fade_elt to fade the elements and all labels, then unfade
-        # the label of interest
-        self.isolate_elt(*args)
-
-        for label in self._labels:
-            for elt in elts:
-                if elt.symbol in args and elt.highlight_bool(label):
-                    self._labels[label].unfade()
+        isolate = query.to_symbols(args, self._fractions)
+        self.set_state(dict(self.get_state(), isolate=isolate, isolate_label=True))
 
     def unisolate_all_elts(self):
         """
@@ -595,17 +773,358 @@ class PeriodicTable(object):
 
         :return: None
         """
-        # Lanthanide and Actinide lines
-        for l in self._connector_lines:
-            l.unfade()
+        self.set_state(dict(self.get_state(), isolate=None, isolate_label=False))
 
-        # source labels
-        for label in self._labels.values():
-            label.unfade()
+    def get_state(self):
+        """
+        Get a description of what is currently shown on the table.
+
+        This can be passed to `set_state` to return a table to this state.
+
+        :return: Dictionary with the sources shown ("sources"), the source that is
+                 highlighted or None ("highlight"), the elements that are isolated
+                 or None if they aren't ("isolate"), and whether the labels were isolated with the elements
+                 ("isolate_label").
+        :rtype: dict
+        """
+        return {
+            "sources": [s for s in self.sources_on if self.sources_on[s]],
+            "highlight": self.highlighted,
+            "isolate": None if self.isolated is None else list(self.isolated),
+            "isolate_label": self.isolated_label,
+        }
+
+    def set_state(self, state):
+        """
+        Set what is shown on the table.
+
+        Only the parts of the table that look different in the new state are
+        changed, so the cost depends on how much changes rather than the size of
+        the table.
+
+        :param state: Dictionary describing the table, in the format returned by
+                      `get_state`. Any keys that are left out take their default
+                      values, which is the state of a newly created table.
+        :return: None
+        """
+        # This checks the whole state before anything is changed
+        new = table_state.TableState.encode(state, self._fractions)
+        if self._batch_depth > 0:
+            self._pending = new
+        else:
+            self._transition(new)
+
+        sources = self._parse_sources(state.get("sources", []))
+        for source in self.sources_on:
+            self.sources_on[source] = source in sources
+        highlight = state.get("highlight", None)
+        self.highlighted = None if highlight is None else highlight.lower()
+        isolate = state.get("isolate", None)
+        self.isolated = None if isolate is None else tuple(isolate)
+        self.isolated_label = isolate is not None and bool(
+            state.get("isolate_label", False)
+        )
+
+    def apply(self, state):
+        """
+        Change part of what is shown on the table at once.
+
+        This is the same as `set_state`, except that any keys left out of `state`
+        keep their current values.
+
+        :param state: Dictionary with any of the keys returned by `get_state`.
+        :return: None
+        """
+        for key in state:
+            if key not in ["sources", "highlight", "isolate", "isolate_label"]:
+                raise ValueError("Unknown state key {}.".format(key))
+        self.set_state(dict(self.get_state(), **state))
+
+    @contextmanager
+    def batch(self):
+        """
+        Make several changes to the table, with the artists only changed once at
+        the end.
+
+        Inside the `with` block, calls like `show_source` and `isolate_elt` update
+        the state of the table (so `get_state` is always current, and bad sources
+        still raise right away), but nothing is drawn differently until the block
+        is done. Then the table goes straight to the final state, so changes that
+        undo each other cost nothing. If the block raises an error, the table is
+        returned to the state it had before the block.
+
+        Batches can be nested, in which case the changes are made at the end of the
+        outermost one.
+
+        :return: Context manager giving this table.
+        """
+        before = self.get_state()
+        self._batch_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self._pending = None
+            # the artists haven't changed if this is the outermost batch, so this
+            # only resets the state.
+            self.set_state(before)
+            raise
+        self._batch_depth -= 1
+        if self._batch_depth == 0 and self._pending is not None:
+            pending, self._pending = self._pending, None
+            self._transition(pending)
+
+    def _transition(self, new):
+        """
+        Change the artists that look different in a new state from the current one,
+        which then becomes the current state.
+
+        :param new: Encoded state to change to.
+        :type new: state.TableState
+        :return: List of the items that were faded, unfaded, hidden, or unhidden.
+        :rtype: list
+        """
+        with self._instruments.phase("state_change") as details:
+            diff = new ^ self._bits
+            details["elements"] = int(np.count_nonzero(diff.elements))
+            details["labels"] = int(np.count_nonzero(diff.labels))
+            changed = self._change_artists(new, diff)
+        self._bits = new
+        return changed
+
+    def _change_artists(self, new, diff):
+        """
+        Change the artists that look different in a new state. See `_transition`.
+
+        :param new: Encoded state to change to.
+        :type new: state.TableState
+        :param diff: Bits that differ between the new state and the current one.
+        :type diff: state.TableState
+        :return: List of the items that were changed.
+        :rtype: list
+        """
+        fade, unfade, hide, unhide = [], [], [], []
+
+        # The fills of each source, which are batched per source already
+        for s_idx, source in enumerate(catalog.sources):
+            bit = 1 << s_idx
+            changed = np.flatnonzero(diff.elements & bit)
+            if len(changed) == 0:
+                continue
+            shown = (new.elements[changed] & bit) > 0
+            for elt_idx, elt_shown in zip(changed, shown):
+                self.elts[elt_idx].set_shown(source, elt_shown)
+            fill_idx = self._fill_idx[source][changed]
+            fill = self._fills[source]
+            for visible in [True, False]:
+                idx = fill_idx[(fill_idx >= 0) & (shown == visible)]
+                if len(idx) > 0:
+                    if visible:
+                        fill.unhide(idx)
+                    else:
+                        fill.hide(idx)
+
+        for elt_idx in np.flatnonzero(diff.elements & table_state.FADED):
+            elt = self.elts[elt_idx]
+            elt.faded = bool(new.elements[elt_idx] & table_state.FADED)
+            (fade if elt.faded else unfade).extend(elt.parts())
+
+        for elt_idx in np.flatnonzero(diff.elements & table_state.HIGHLIGHT):
+            elt = self.elts[elt_idx]
+            elt.highlight = bool(new.elements[elt_idx] & table_state.HIGHLIGHT)
+            highlight_text = [elt.ax_name_highlight, elt.ax_name_highlight_stroke]
+            if elt.highlight:
+                unhide += highlight_text
+                hide.append(elt.ax_name)
+            else:
+                hide += highlight_text
+                unhide.append(elt.ax_name)
+
+        for label_idx in np.flatnonzero(diff.labels):
+            label = self._labels[table_state.labels[label_idx]]
+            bits = new.labels[label_idx]
+            label.shown = bool(bits & table_state.LABEL_SHOWN)
+            label.highlight = bool(bits & table_state.LABEL_HIGHLIGHT)
+            # Only the parts whose visibility changes are touched
+            parts = [
+                [label.box] + label.box_lines,
+                [label.text_hl, label.text_hl_stroke],
+                [label.text],
+            ]
+            old_visible = _label_visibility(self._bits.labels[label_idx])
+            for items, was, now in zip(parts, old_visible, _label_visibility(bits)):
+                if was != now:
+                    (unhide if now else hide).extend(items)
+            if diff.labels[label_idx] & table_state.LABEL_FADED:
+                faded = bits & table_state.LABEL_FADED
+                (fade if faded else unfade).extend(label.parts())
+
+        if diff.connectors_faded:
+            (fade if new.connectors_faded else unfade).extend(self._connector_lines)
+
+        # Each collection is only updated once for each kind of change
+        fade_all(fade, True)
+        fade_all(unfade, False)
+        hide_all(hide, True)
+        hide_all(unhide, False)
+        return fade + unfade + hide + unhide
+
+    def state_hash(self, format="png", dpi=None):
+        """
+        Get a hash identifying what the table looks like when saved.
+
+        Two tables have the same hash if saving them with the same format and dpi
+        gives the same output. This includes the labels, colors, and dataset the
+        table was created with, not just what is shown.
+
+        :param format: File format the table will be saved as.
+        :param dpi: Resolution the table will be saved at. Defaults to the dpi used
+                    by `save`.
+        :return: Hex digest of the hash.
+        :rtype: str
+        """
+        if dpi is None:
+            dpi = savefig_kwargs["dpi"]
+        config = self._config
+        # tables with the default data hash the same as they always have
+        if not self._default_fractions():
+            config = dict(config, fractions=self._fractions.tolist())
+        return cache.state_hash(self.get_state(), config, format, dpi)
+
+    def _default_fractions(self):
+        """
+        Whether the table has the fractions of the catalog.
+
+        :return: True if the fractions are the same as `catalog.fractions`.
+        :rtype: bool
+        """
+        return np.array_equal(self._fractions, catalog.fractions)
+
+    def to_bytes(self, format="png", dpi=None):
+        """
+        Render the table as it would be saved, but to bytes rather than a file.
+
+        :param format: File format to render, like "png", "pdf", or "svg".
+        :param dpi: Resolution to render at. Defaults to the dpi used by `save`.
+        :return: The contents of the file.
+        :rtype: bytes
+        """
+        kwargs = dict(savefig_kwargs)
+        if dpi is not None:
+            kwargs["dpi"] = dpi
+        if format.lower() in raster_formats:
+            self._use_dpi(kwargs["dpi"])
+        output = io.BytesIO()
+        self._savefig(output, format=format, **kwargs)
+        return output.getvalue()
+
+    def to_buffer(self, dpi=None):
+        """
+        Draw the table, and get the pixels of its canvas without copying them.
+
+        The buffer belongs to the canvas, and is drawn over by the next render of
+        the table at the same dpi. Copy it (like `bytes(buffer)`) to keep it.
+
+        :param dpi: Resolution to render at. Defaults to the dpi used by `save`.
+        :return: Buffer of the RGBA pixels, with shape (height, width, 4), from the
+                 top left. The background is transparent, as it is when saved.
+        :rtype: memoryview
+        """
+        if dpi is None:
+            dpi = savefig_kwargs["dpi"]
+        self._use_dpi(dpi)
+        canvas = self._fig.canvas
+        with self._instruments.phase("render", dpi=dpi):
+            with self._instruments.draws(self._ax.get_children()):
+                canvas.draw()
+        return canvas.buffer_rgba()
+
+    def to_array(self, dpi=None):
+        """
+        Draw the table, and get its pixels as an array. See `to_buffer`.
+
+        :param dpi: Resolution to render at. Defaults to the dpi used by `save`.
+        :return: Array of the RGBA pixels with shape (height, width, 4). This is a
+                 view of the canvas, which is drawn over by the next render of the
+                 table at the same dpi, so copy it to keep it.
+        :rtype: np.ndarray
+        """
+        return np.asarray(self.to_buffer(dpi))
+
+    def _use_dpi(self, dpi):
+        """
+        Set the dpi of the figure before it's drawn by its Agg canvas.
+
+        The canvas keeps its renderer, which holds the pixel buffer, for as long as
+        the size and dpi of the figure stay the same. Saving at a different dpi
+        would only change the dpi while saving, so the next render at the
+        figure's own dpi would need a new buffer, as would the one after. Instead
+        the figure is left at the dpi it was last drawn at, so that renders at the
+        same dpi all reuse one buffer.
+
+        :param dpi: Resolution the figure is about to be drawn at.
+        :return: None
+        """
+        if self._fig.get_dpi() != dpi:
+            self._fig.set_dpi(dpi)
+
+    def _savefig(self, output, **kwargs):
+        """
+        Save the figure, timing the drawing of each kind of artist if the table is
+        instrumented.
+
+        :param output: Path or file object to save to.
+        :param kwargs: Keyword arguments passed to `Figure.savefig`.
+        :return: None
+        """
+        format = kwargs.get("format")
+        if format is None and isinstance(output, str):
+            format = os.path.splitext(output)[1].lstrip(".").lower()
+        with self._instruments.phase("save", format=format, dpi=kwargs.get("dpi")):
+            with self._instruments.draws(self._ax.get_children()):
+                self._fig.savefig(output, **kwargs)
+
+    def stats(self):
+        """
+        Count what is drawn on the table and how much memory it takes.
+
+        :return: Dictionary with the number of artists of each class ("artists"),
+                 the number of polygons and lines drawn ("paths") and their vertices
+                 ("vertices"), the bytes taken by the vertices ("vertex_bytes"), the
+                 number of strings of text ("text") and how many are visible
+                 ("visible_text"), the peak memory of the process in bytes
+                 ("max_rss_bytes"), and the total time and number of calls of each
+                 phase timed so far ("timings"). See `instrument`.
+        :rtype: dict
+        """
+        stats = instrument.artist_stats(self._ax)
+        layers = list(self._text.strokes.values())
+        layers += [self._text.highlight, self._text.plain]
+        stats["text"] = sum(len(layer) for layer in layers)
+        stats["visible_text"] = sum(
+            int(np.count_nonzero(~layer.hidden)) for layer in layers
+        )
+        stats["max_rss_bytes"] = instrument.max_rss_bytes()
+        stats["timings"] = {
+            name: dict(total) for name, total in self._instruments.totals.items()
+        }
+        return stats
+
+    def to_svg(self):
+        """
+        Write the table in its current state as an SVG.
+
+        This doesn't go through matplotlib, so it is much faster than saving the
+        table as an SVG, and the file is much smaller. See `svg.table_svg`.
+
+        :return: The SVG document.
+        :rtype: str
+        """
+        from .svg import table_svg
 
-        # elements
-        for elt in elts:
-            elt.unfade()
+        fractions = None if self._default_fractions() else self._fractions
+        return table_svg(self.get_state(), fractions=fractions, **self._config)
 
     def save(self, savename):
         """
@@ -614,7 +1133,7 @@ class PeriodicTable(object):
         :param savename: Path or filename to save the plot to
         :return: None
         """
-        self._fig.savefig(savename)
+        self._savefig(savename, **savefig_kwargs)
 
     def get_figure(self):
         """
@@ -0,0 +1,364 @@
+"""
+Select elements from the catalog by their data, for isolating them on the table.
+
+Conditions are made by comparing fields of the catalog, and each is evaluated over
+all the elements at once:
+
+    from periodic_table.query import select, frac, frac_r, period, number
+
+    select(frac_r > 0.9)
+    select(period=6)
+    select(number.between(57, 71))
+    select(frac("snii+snia") > 0.8, period=4)
+    select(primary("snii", threshold=0.3))
+
+The result is a `Selection`, which can be passed straight to
+`PeriodicTable.isolate_elt` and `PeriodicTable.isolate_elt_label`.
+
+Conditions on the fractions are evaluated with the catalog's fractions, but
+remember how they were made, so a table with its own dataset (see `datasets`)
+evaluates them again with its fractions. `PeriodicTable.select` does the same.
+
+This only needs the catalog, so it can be used without the plotting libraries.
+"""
+
+import numpy as np
+
+from . import catalog
+
+
+class Selection(object):
+    """
+    A set of elements from the catalog.
+
+    Selections can be combined with `&`, `|`, and `~`. Iterating over one gives the
+    symbols of its elements, in catalog order.
+    """
+
+    def __init__(self, mask, evaluate=None):
+        """
+        :param mask: Array of whether each element of the catalog is selected.
+        :param evaluate: For selections that depend on the fractions of the
+                         elements, a function that gives the mask for other
+                         fractions than the catalog's. See `with_fractions`.
+        """
+        mask = np.asarray(mask, dtype=bool)
+        if mask.shape != catalog.symbols.shape:
+            raise ValueError("Selection must have one value per element.")
+        mask.setflags(write=False)
+        self.mask = mask
+        self._evaluate = evaluate
+
+    def with_fractions(self, fractions):
+        """
+        Select the elements again, using other fractions than the catalog's.
+
+        :param fractions: Fractions of the elements, in the layout of
+                          `catalog.fractions`, or None for the catalog's own.
+        :return: The elements selected with these fractions. Selections that don't
+                 depend on the fractions are returned as they are.
+        :rtype: Selection
+        """
+        if self._evaluate is None or fractions is None:
+            return self
+        return Selection(self._evaluate(fractions), self._evaluate)
+
+    @property
+    def symbols(self):
+        """
+        List of the symbols of the selected elements.
+        """
+        return catalog.symbols[self.mask].tolist()
+
+    @property
+    def numbers(self):
+        """
+        List of the numbers of the selected elements.
+        """
+        return catalog.numbers[self.mask].tolist()
+
+    def __iter__(self):
+        return iter(self.symbols)
+
+    def __len__(self):
+        return int(np.count_nonzero(self.mask))
+
+    def __contains__(self, element):
+        try:
+            return bool(self.mask[catalog.index(element)])
+        except ValueError:
+            return False
+
+    def _combine(self, other, operator):
+        """
+        Combine this selection with another, element by element.
+
+        :param other: Selection, or the symbol or number of a single element.
+        :param operator: Function combining the two masks.
+        :return: The combined selection.
+        :rtype: Selection
+        """
+        other = _selection(other)
+        evaluate = None
+        if self._evaluate is not None or other._evaluate is not None:
+
+            def evaluate(fractions):
+                return operator(
+                    self.with_fractions(fractions).mask,
+                    other.with_fractions(fractions).mask,
+                )
+
+        return Selection(operator(self.mask, other.mask), evaluate)
+
+    def __and__(self, other):
+        return self._combine(other, np.logical_and)
+
+    def __or__(self, other):
+        return self._combine(other, np.logical_or)
+
+    def __invert__(self):
+        evaluate = None
+        if self._evaluate is not None:
+
+            def evaluate(fractions):
+                return ~self._evaluate(fractions)
+
+        return Selection(~self.mask, evaluate)
+
+    def __eq__(self, other):
+        return isinstance(other, Selection) and np.array_equal(self.mask, other.mask)
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "Selection({})".format(self.symbols)
+
+
+class Field(object):
+    """
+    A value of every element in the catalog, which is compared to make a Selection.
+
+    Fields of fractions can be added together, so that `frac_snii + frac_snia` is
+    the fraction from both kinds of supernovae.
+    """
+
+    def __init__(self, name, values, evaluate=None):
+        """
+        :param name: Name of the field, for error messages.
+        :param values: Array of the value of each element, in catalog order.
+        :param evaluate: For fields that depend on the fractions of the elements, a
+                         function that gives the values for other fractions than
+                         the catalog's.
+        """
+        self.name = name
+        self.values = values
+        self._evaluate = evaluate
+
+    def _values(self, fractions):
+        """
+        Get the value of each element, for some fractions.
+
+        :param fractions: Fractions of the elements, in the layout of
+                          `catalog.fractions`.
+        :return: Array of the values.
+        :rtype: np.ndarray
+        """
+        if self._evaluate is None:
+            return self.values
+        return self._evaluate(fractions)
+
+    def _select(self, condition):
+        """
+        Select the elements whose values meet a condition.
+
+        :param condition: Function of the array of values, giving whether each
+                          element is selected.
+        :return: The selected elements.
+        :rtype: Selection
+        """
+        evaluate = None
+        if self._evaluate is not None:
+
+            def evaluate(fractions):
+                return condition(self._evaluate(fractions))
+
+        return Selection(condition(self.values), evaluate)
+
+    def __add__(self, other):
+        if not isinstance(other, Field):
+            return NotImplemented
+        evaluate = None
+        if self._evaluate is not None or other._evaluate is not None:
+
+            def evaluate(fractions):
+                return self._values(fractions) + other._values(fractions)
+
+        return Field(self.name + "+" + other.name, self.values + other.values, evaluate)
+
+    def __gt__(self, value):
+        return self._select(lambda values: values > value)
+
+    def __ge__(self, value):
+        return self._select(lambda values: values >= value)
+
+    def __lt__(self, value):
+        return self._select(lambda values: values < value)
+
+    def __le__(self, value):
+        return self._select(lambda values: values <= value)
+
+    def __eq__(self, value):
+        return self._select(lambda values: values == value)
+
+    def __ne__(self, value):
+        return self._select(lambda values: values != value)
+
+    __hash__ = None
+
+    def between(self, low, high):
+        """
+        Select the elements whose value is in a range.
+
+        :param low: Lowest value included.
+        :param high: Highest value included.
+        :return: The elements in the range.
+        :rtype: Selection
+        """
+        return self._select(lambda values: (values >= low) & (values <= high))
+
+    def isin(self, values):
+        """
+        Select the elements whose value is one of the given values.
+
+        :param values: Values to select.
+        :return: The elements with any of these values.
+        :rtype: Selection
+        """
+        values = list(values)
+        return self._select(lambda field: np.isin(field, values))
+
+
+def frac(sources):
+    """
+    Get the fraction of each element's abundance that comes from some sources.
+
+    :param sources: Name of a source, or several joined with "+", like
+                    "snii+snia". "low mass" is both the AGB and S sources.
+    :return: The total fraction from the sources.
+    :rtype: Field
+    """
+    cols = []
+    for source in sources.lower().split("+"):
+        cols += catalog.source_columns(source.strip())
+
+    def evaluate(fractions):
+        return fractions[:, cols].sum(axis=1)
+
+    return Field(sources, evaluate(catalog.fractions), evaluate)
+
+
+def primary(source, threshold=None):
+    """
+    Select the elements that get most of their abundance from a source. See
+    `catalog.primary`.
+
+    :param source: Name of the source.
+    :param threshold: Elements are selected when more than this fraction of their
+                      abundance comes from the source. Defaults to the threshold used
+                      for highlighting.
+    :return: The selected elements.
+    :rtype: Selection
+    """
+    source = source.lower()
+
+    def evaluate(fractions):
+        return catalog.primary(source, threshold, fractions)
+
+    return Selection(evaluate(catalog.fractions), evaluate)
+
+
+number = Field("number", catalog.numbers)
+period = Field("period", catalog.periods)
+row = Field("row", catalog.rows)
+column = Field("column", catalog.columns)
+symbol = Field("symbol", catalog.symbols)
+
+frac_bb = frac("bb")
+frac_cr = frac("cr")
+frac_snii = frac("snii")
+frac_snia = frac("snia")
+frac_agb = frac("agb")
+frac_s = frac("s")
+frac_r = frac("r")
+frac_unstable = frac("unstable")
+frac_low_mass = frac("low mass")
+
+_fields = {"number": number, "period": period, "row": row, "column": column}
+
+
+def _selection(condition):
+    """
+    Get the elements a condition selects.
+
+    :param condition: Selection, or the symbol or number of a single element.
+    :return: The selected elements.
+    :rtype: Selection
+    """
+    if isinstance(condition, Selection):
+        return condition
+    mask = np.zeros(len(catalog.symbols), dtype=bool)
+    mask[catalog.index(condition)] = True
+    return Selection(mask)
+
+
+def select(*conditions, fractions=None, **fields):
+    """
+    Select the elements that match all the given conditions.
+
+    :param conditions: Any number of Selections, like `frac_r > 0.9`. Symbols or
+                       numbers of single elements can also be given.
+    :param fractions: Fractions of the elements to evaluate the conditions with, in
+                      the layout of `catalog.fractions`. Defaults to the catalog's
+                      own.
+    :param fields: Values of "number", "period", "row", or "column" to select.
+                   Each can be a single value, or a list or range of values.
+    :return: The elements matching everything. With no conditions this is every
+             element.
+    :rtype: Selection
+    """
+    mask = np.ones(len(catalog.symbols), dtype=bool)
+    for condition in conditions:
+        mask &= _selection(condition).with_fractions(fractions).mask
+    for name, value in fields.items():
+        if name not in _fields:
+            raise ValueError("Can't select by {}.".format(name))
+        if isinstance(value, (list, tuple, set, range, np.ndarray)):
+            mask &= _fields[name].isin(value).mask
+        else:
+            mask &= (_fields[name] == value).mask
+    return Selection(mask)
+
+
+def to_symbols(elements, fractions=None):
+    """
+    Get the symbols of a mix of elements and selections.
+
+    :param elements: List holding symbols, numbers, and Selections.
+    :param fractions: Fractions of the elements to evaluate the Selections with, in
+                      the layout of `catalog.fractions`. Defaults to the catalog's
+                      own.
+    :return: List of symbols, without repeats, in the order given.
+    :rtype: list
+    """
+    symbols = []
+    for element in elements:
+        if isinstance(element, Selection):
+            symbols += element.with_fractions(fractions).symbols
+        elif isinstance(element, str):
+            symbols.append(element)
+        else:
+            symbols.append(catalog.elements[catalog.index(element)][1])
+    return list(dict.fromkeys(symbols))
@@ -0,0 +1,656 @@
+"""
+Render the table straight into a NumPy array, without drawing it with matplotlib.
+
+This is meant for thumbnails and previews, where we need many small images quickly.
+Everything on the table is a unit square, lines along the edges of boxes, or short
+strings, so it can all be rasterized ahead of time as the fraction of each pixel it
+covers. Rendering a state of the table is then just compositing these coverages in
+the right colors. Matplotlib is only used when the renderer is created, to parse
+colors and to rasterize the outlines of the text.
+"""
+
+import numpy as np
+from matplotlib import colors as mpl_colors
+from matplotlib.backends.backend_agg import RendererAgg
+from matplotlib.font_manager import FontProperties
+from matplotlib.transforms import Affine2D, Bbox
+
+from . import catalog
+from . import datasets
+from . import geometry
+from . import state as table_state
+from . import style
+from .text import glyph_path
+
+# The size of the table in inches, which is also its size in data units
+_width = 20
+_height = 12
+
+
+def _interval_coverage(start, end, n_pixels):
+    """
+    Calculate how much of each pixel in a row is covered by an interval.
+
+    :param start: Start of the interval in pixels.
+    :param end: End of the interval in pixels.
+    :param n_pixels: Number of pixels in the row.
+    :return: The indices of the pixels that are at least partially covered, and
+             the fraction of each that is covered.
+    :rtype: tuple of np.ndarray
+    """
+    pixels = np.arange(max(0, int(np.floor(start))), min(n_pixels, int(np.ceil(end))))
+    coverage = np.minimum(pixels + 1, end) - np.maximum(pixels, start)
+    return pixels, np.clip(coverage, 0, 1)
+
+
+def _composite(image, idx, rgba):
+    """
+    Composite pixels on top of an image, with premultiplied alpha.
+
+    Images are flattened and kept with each channel in its own row, so they have
+    shape (4, n_pixels), which makes drawing many pixels at once much quicker.
+
+    :param image: Flattened image to draw on, which is modified.
+    :param idx: Indices of the pixels to draw on.
+    :param rgba: Premultiplied colors of these pixels, with shape (4, len(idx)).
+    :return: None
+    """
+    # take is much quicker than indexing with the array
+    image[:, idx] = rgba + image.take(idx, axis=1) * (1 - rgba[3])
+
+
+def _premultiply(coverage, rgb):
+    """
+    Get the premultiplied colors of pixels covered by a color.
+
+    :param coverage: Fraction of each pixel that is covered.
+    :param rgb: Color to draw with.
+    :return: Premultiplied colors of the pixels, with shape (4, len(coverage)).
+    :rtype: np.ndarray
+    """
+    rgba = np.empty((4, len(coverage)), dtype=np.float32)
+    rgba[:3] = np.multiply.outer(rgb, coverage)
+    rgba[3] = coverage
+    return rgba
+
+
+def _draw(image, idx, coverage, rgb):
+    """
+    Draw pixels on an image in a given color, with premultiplied alpha.
+
+    :param image: Flattened image to draw on, which is modified.
+    :param idx: Indices of the pixels to draw on.
+    :param coverage: Fraction of each pixel that is covered.
+    :param rgb: Color to draw with.
+    :return: None
+    """
+    _composite(image, idx, _premultiply(coverage, rgb))
+
+
+def _split_overlaps(idx, *values):
+    """
+    Split pixels into groups that can each be drawn all at once.
+
+    Pixels that appear more than once have to be drawn once for each time, so
+    every repeat of a pixel goes in a later group than the one before it. Things
+    drawn together rarely overlap, so there is almost always a single group.
+
+    :param idx: Indices of the pixels, in the order they are drawn.
+    :param values: Arrays of values of each pixel, like its coverage.
+    :return: List of groups, each a tuple of the indices and values of its pixels.
+    :rtype: list
+    """
+    groups = []
+    while len(idx) > 0:
+        # the first time each pixel appears
+        _, first = np.unique(idx, return_index=True)
+        groups.append((idx[first],) + tuple(value[first] for value in values))
+        rest = np.ones(len(idx), dtype=bool)
+        rest[first] = False
+        idx = idx[rest]
+        values = [value[rest] for value in values]
+    return groups
+
+
+class ThumbnailRenderer(object):
+    """
+    Renders the table directly into NumPy arrays.
+
+    The output closely matches drawing the table with matplotlib at the same
+    resolution, but takes a small fraction of the time. At dpi 10 a render takes
+    about a millisecond, or somewhere near a thousand images a second on one core,
+    and the time grows with the number of pixels. Creating the renderer takes a few
+    tenths of a second, so it should be reused for many images.
+    """
+
+    def __init__(
+        self,
+        dpi=10,
+        label_bb=style.default_labels["bb"],
+        label_cr=style.default_labels["cr"],
+        label_agb=style.default_labels["s"],
+        label_snii=style.default_labels["snii"],
+        label_snia=style.default_labels["snia"],
+        label_r=style.default_labels["r"],
+        label_unstable=style.default_labels["unstable"],
+        color_bb=style.default_colors["bb"],
+        color_cr=style.default_colors["cr"],
+        color_snia=style.default_colors["snia"],
+        color_snii=style.default_colors["snii"],
+        color_r=style.default_colors["r"],
+        color_agb=style.default_colors["s"],
+        color_unstable=style.default_colors["unstable"],
+        dataset=None,
+    ):
+        """
+        Rasterize all parts of the table.
+
+        :param dpi: Resolution of the images. The table is 20 by 12 inches.
+        :param label_bb: and the rest of the label and color parameters are the same
+                         as those of `PeriodicTable`.
+        :param dataset: Fractions of each element's abundance from each source, as
+                        a `datasets.Dataset`, which decide the fills and what is
+                        highlighted. Defaults to the fractions from Johnson (2019) in
+                        the catalog.
+        """
+        self.dpi = dpi
+        self.shape = (int(round(_height * dpi)), int(round(_width * dpi)), 4)
+        labels = {
+            "bb": label_bb,
+            "cr": label_cr,
+            "s": label_agb,
+            "snii": label_snii,
+            "snia": label_snia,
+            "r": label_r,
+            "unstable": label_unstable,
+        }
+        colors = {
+            "bb": color_bb,
+            "cr": color_cr,
+            "snii": color_snii,
+            "snia": color_snia,
+            "agb": color_agb,
+            "s": color_agb,
+            "r": color_r,
+            "unstable": color_unstable,
+        }
+
+        # The colors of everything, with the faded version of each in the second row
+        def with_faded(color_list):
+            faded = [style.fade_color(color) for color in color_list]
+            rgb = mpl_colors.to_rgba_array(list(color_list) + faded)[:, :3]
+            return rgb.reshape(2, len(color_list), 3).astype(np.float32)
+
+        self._fill_colors = with_faded([colors[s] for s in geometry.sources])
+        self._label_colors = {
+            label: with_faded([colors[label]])[:, 0]
+            for label in geometry.label_positions
+        }
+        self._black = with_faded([style.almost_black])[:, 0]
+        self._white = with_faded(["white"])[:, 0]
+        # The color of text, by whether it is highlighted and faded
+        self._text_colors = np.ones((2, 2, 4), dtype=np.float32)
+        self._text_colors[0, :, :3] = self._black
+        self._text_colors[1, :, :3] = self._white
+
+        self._symbols = catalog.symbols.tolist()
+        if dataset is None:
+            dataset = datasets.johnson2019
+        self._fracs = dataset.fractions
+        columns = catalog.columns
+        # The rows are flipped on the table, see `Element`
+        rows = 11 - catalog.rows
+
+        self._setup_fills(columns, rows)
+        self._setup_lines(columns, rows)
+        self._setup_text(columns, rows, labels)
+
+    def _pixel_index(self, rows, columns):
+        """
+        Get the index of pixels in the flattened image.
+        """
+        return (rows * self.shape[1] + columns).ravel()
+
+    def _rect(self, left, right, top, bottom):
+        """
+        Calculate the coverage of the pixels in a rectangle.
+
+        :param left: Left edge of the rectangle in pixels.
+        :param right: Right edge of the rectangle in pixels.
+        :param top: Top edge of the rectangle in pixels from the top of the image.
+        :param bottom: Bottom edge of the rectangle in pixels from the top.
+        :return: The indices of the pixels in the flattened image, and the fraction
+                 of each that is covered.
+        :rtype: tuple of np.ndarray
+        """
+        height, width = self.shape[:2]
+        cols, col_cov = _interval_coverage(left, right, width)
+        rows, row_cov = _interval_coverage(top, bottom, height)
+        idx = self._pixel_index(rows[:, np.newaxis], cols[np.newaxis, :])
+        return idx, np.outer(row_cov, col_cov).ravel()
+
+    def _snap(self, xs, ys, linewidth):
+        """
+        Convert points to pixels, snapping them to the pixel grid.
+
+        Matplotlib snaps paths made of horizontal and vertical segments so that
+        they are crisp, so we do the same to match it.
+
+        :param xs: X values of the points in data coordinates.
+        :param ys: Y values of the points in data coordinates.
+        :param linewidth: Width of the line in points. Lines an odd number of
+                          pixels wide are snapped to pixel centers, others to the
+                          edges.
+        :return: The x and y values in pixels from the top left of the image.
+        :rtype: tuple of np.ndarray
+        """
+        snap = 0.5 if np.floor(linewidth / 72.0 * self.dpi + 0.5) % 2 else 0.0
+        x = np.floor(np.asarray(xs) * self.dpi + 0.5) + snap
+        y = np.floor(self.shape[0] - np.asarray(ys) * self.dpi + 0.5) + snap
+        return x, y
+
+    def _lines(self, xs, ys, linewidth):
+        """
+        Calculate the coverage of the pixels by a line made of horizontal and
+        vertical segments.
+
+        :param xs: X values of the points along the line in data coordinates.
+        :param ys: Y values of the points along the line in data coordinates.
+        :param linewidth: Width of the line in points.
+        :return: The indices of the pixels in the flattened image, and the fraction
+                 of each that is covered.
+        :rtype: tuple of np.ndarray
+        """
+        xs, ys = self._snap(xs, ys, linewidth)
+        # Segments are extended by half the width on each end, as matplotlib does
+        half = linewidth / 72.0 * self.dpi / 2.0
+        rects = [
+            self._rect(
+                min(xs[idx], xs[idx + 1]) - half,
+                max(xs[idx], xs[idx + 1]) + half,
+                min(ys[idx], ys[idx + 1]) - half,
+                max(ys[idx], ys[idx + 1]) + half,
+            )
+            for idx in range(len(xs) - 1)
+        ]
+        # where the segments overlap, use the largest coverage
+        idx, inverse = np.unique(
+            np.concatenate([idx for idx, _ in rects]), return_inverse=True
+        )
+        coverage = np.zeros(len(idx))
+        np.maximum.at(coverage, inverse, np.concatenate([cov for _, cov in rects]))
+        return idx, coverage
+
+    def _setup_fills(self, columns, rows):
+        """
+        Calculate the coverage of the pixels in each element box by each source.
+
+        :param columns: Array of the x position of the lower left corner of each
+                        element.
+        :param rows: Array of the y position of the lower left corner of each
+                     element.
+        :return: None
+        """
+        height, width = self.shape[:2]
+        # Find which element each pixel is in, and where the pixel's center is
+        # within that element's box.
+        x = (np.arange(width) + 0.5) / self.dpi
+        y = _height - (np.arange(height) + 0.5) / self.dpi
+        grid = np.full((_width, _height), -1)
+        grid[columns, rows] = np.arange(len(columns))
+        elt = grid[
+            np.floor(x).astype(int)[np.newaxis, :],
+            np.floor(y).astype(int)[:, np.newaxis],
+        ]
+        self._cell_idx = np.flatnonzero(elt >= 0)
+        self._cell_elt = elt.ravel()[self._cell_idx]
+        u = np.broadcast_to(x[np.newaxis, :] % 1, elt.shape).ravel()[self._cell_idx]
+        v = np.broadcast_to(y[:, np.newaxis] % 1, elt.shape).ravel()[self._cell_idx]
+
+        # Each fill is the region between two lines of unit slope. We use the
+        # distance in pixels from each line to get the antialiased coverage.
+        lower, upper = geometry.fill_bounds(self._fracs)
+        b_lower = geometry.fraction_intercepts(lower)[self._cell_elt]
+        b_upper = geometry.fraction_intercepts(upper)[self._cell_elt]
+        diff = (v - u)[:, np.newaxis]
+        scale = self.dpi / np.sqrt(2)
+        above = np.clip(0.5 + (diff - b_lower) * scale, 0, 1)
+        below = np.clip(0.5 + (b_upper - diff) * scale, 0, 1)
+        coverage = np.clip(above + below - 1, 0, 1)
+        # sources with no contribution have no fill
+        coverage[self._fracs[self._cell_elt] == 0] = 0
+        # This is kept for every pixel of the image, which makes drawing the fills
+        # quicker than picking out the pixels in the boxes.
+        self._fill_cov = np.zeros((len(geometry.sources), elt.size), dtype=np.float32)
+        self._fill_cov[:, self._cell_idx] = coverage.T
+        self._pixel_elt = elt.ravel()
+
+    def _setup_lines(self, columns, rows):
+        """
+        Calculate the coverage of the element boxes, connecting lines, and labels.
+
+        :param columns: Array of the x position of the lower left corner of each
+                        element.
+        :param rows: Array of the y position of the lower left corner of each
+                     element.
+        :return: None
+        """
+        n_pixels = self.shape[0] * self.shape[1]
+        connectors = [
+            self._lines(xs, ys, style.connector_linewidth)
+            for xs, ys in geometry.connector_lines
+        ]
+        connectors = [np.concatenate(a) for a in zip(*connectors)]
+        # Everything under the fills only changes when the connectors are faded, so
+        # both versions are drawn here.
+        self._backgrounds = []
+        for faded in [0, 1]:
+            image = np.zeros((4, n_pixels), dtype=np.float32)
+            _draw(image, *connectors, self._black[faded])
+            # the white background of the boxes is half transparent
+            half = np.full(len(self._cell_idx), 0.5)
+            _draw(image, self._cell_idx, half, self._white[0])
+            self._backgrounds.append(image)
+
+        boxes = []
+        for column, row in zip(columns, rows):
+            xs = [column, column, column + 1, column + 1, column]
+            ys = [row, row + 1, row + 1, row, row]
+            boxes.append(self._lines(xs, ys, style.element_linewidth))
+        # The pixels covered by any box, and which of these each pixel of each box is
+        self._box_idx, self._box_pixel = np.unique(
+            np.concatenate([idx for idx, _ in boxes]), return_inverse=True
+        )
+        self._box_elt = np.repeat(np.arange(len(boxes)), [len(idx) for idx, _ in boxes])
+        # Neighboring boxes draw over each other where they share an edge. Drawing
+        # the same color on top of itself leaves the fraction of light that gets
+        # through each layer, so we keep the log of this to combine them.
+        coverage = np.concatenate([cov for _, cov in boxes])
+        self._box_log = np.log1p(-np.minimum(coverage, 1 - 1e-6))
+        # When nothing is faded, all the boxes are drawn the same way every time.
+        self._all_boxes = _premultiply(
+            self._combine_boxes(np.ones(len(boxes), dtype=bool)), self._black[0]
+        )
+
+        # Nothing else is drawn under the labels, so their boxes and outlines are
+        # combined into one layer in each color, and all the labels are drawn at
+        # once.
+        label_idx, label_rgba, label_item = [], [], []
+        for item, label in enumerate(table_state.labels):
+            x_idx, y_idx = geometry.label_positions[label]
+            x, y, box_width, box_height = geometry.label_box(x_idx, y_idx)
+            # the box has no outline, so its edges snap to the edges of pixels
+            xs, ys = self._snap([x, x + box_width], [y + box_height, y], 0)
+            fill = self._rect(xs[0], xs[1], ys[0], ys[1])
+            outline = self._lines(
+                [x, x, x + box_width, x + box_width, x],
+                [y, y + box_height, y + box_height, y, y],
+                style.label_linewidth,
+            )
+            image = np.zeros((2, 4, n_pixels), dtype=np.float32)
+            for faded in [0, 1]:
+                _draw(image[faded], *fill, self._label_colors[label][faded])
+                _draw(image[faded], *outline, self._black[faded])
+            idx = np.flatnonzero(image[0, 3])
+            label_idx.append(idx)
+            label_rgba.append(image[:, :, idx].transpose(2, 0, 1))
+            label_item.append(np.full(len(idx), item))
+        # each is the indices of the pixels, their colors with shape (2, 4, n), by
+        # whether they are faded, and the label each belongs to
+        self._label_layers = [
+            (idx, rgba.transpose(1, 2, 0), item)
+            for idx, rgba, item in _split_overlaps(
+                np.concatenate(label_idx),
+                np.concatenate(label_rgba),
+                np.concatenate(label_item),
+            )
+        ]
+
+    def _setup_text(self, columns, rows, labels):
+        """
+        Rasterize all the text on the table.
+
+        :param columns: Array of the x position of the lower left corner of each
+                        element.
+        :param rows: Array of the y position of the lower left corner of each
+                     element.
+        :param labels: Dictionary of the text of each label.
+        :return: None
+        """
+        self._fontproperties = FontProperties(**style.font)
+
+        # The text and position of each string, in the same places as the table
+        names = [
+            (symbol, style.element_fontsize, column + 0.5, row + 0.65)
+            for symbol, column, row in zip(self._symbols, columns, rows)
+        ]
+        numbers = [
+            (number, style.number_fontsize, column + 0.5, row + 0.25)
+            for (number, *_), column, row in zip(catalog.elements, columns, rows)
+        ]
+        label_text = []
+        for label in table_state.labels:
+            x, y, width, height = geometry.label_box(*geometry.label_positions[label])
+            label_text.append(
+                (labels[label], style.label_fontsize, x + width / 2.0, y + height / 2.0)
+            )
+
+        # The text is drawn in two layers: the outlines around highlighted text, then
+        # the text itself. The items of the outlines are the element names then the
+        # labels, and those of the text are the names, numbers, then labels.
+        self._stroke_layers = self._layers(
+            [self._text(*name, style.element_highlight_linewidth) for name in names]
+            + [
+                self._text(*text, style.label_highlight_linewidth)
+                for text in label_text
+            ]
+        )
+        self._text_layers = self._layers(
+            [self._text(*text) for text in names + numbers + label_text]
+        )
+
+    def _text(self, text, fontsize, x, y, linewidth=0):
+        """
+        Rasterize a string centered on a given position.
+
+        The outlines of the glyphs are the same as those drawn by `TextLayers`, and
+        are rasterized by Agg at their exact position, so they match the table.
+
+        :param text: String to rasterize.
+        :param fontsize: Font size in points.
+        :param x: X position of the center of the text in data coordinates.
+        :param y: Y position of the center of the text in data coordinates.
+        :param linewidth: If zero, the glyphs are filled. Otherwise, only the
+                          outline of the glyphs is drawn, with this width in points.
+        :return: The coverage of the text as a 2D array, and the row and column of
+                 the image where its top left corner goes.
+        :rtype: tuple
+        """
+        path = glyph_path(str(text), self._fontproperties, fontsize)
+        scale = self.dpi / 72.0
+        # the control points of the curves contain them, which is quicker than
+        # finding the exact extent, and the bitmap only needs to contain the text
+        extents = Bbox.null()
+        extents.update_from_data_xy(path.vertices)
+        pad = int(np.ceil(linewidth * scale / 2.0)) + 1
+        # The position of the center of the text in the image
+        center_x = x * self.dpi
+        center_y = self.shape[0] - y * self.dpi
+        left = int(np.floor(center_x + extents.x0 * scale)) - pad
+        top = int(np.floor(center_y - extents.y1 * scale)) - pad
+        width = int(np.ceil(center_x + extents.x1 * scale)) + pad - left
+        height = int(np.ceil(center_y - extents.y0 * scale)) + pad - top
+
+        renderer = RendererAgg(width, height, self.dpi)
+        gc = renderer.new_gc()
+        gc.set_snap(False)
+        gc.set_linewidth(linewidth)
+        # the renderer's y axis starts from the bottom
+        transform = (
+            Affine2D()
+            .scale(scale)
+            .translate(center_x - left, height - (center_y - top))
+        )
+        face = None if linewidth > 0 else (0, 0, 0, 1)
+        renderer.draw_path(gc, path, transform, face)
+        coverage = np.asarray(renderer.buffer_rgba())[..., 3] / 255.0
+        return coverage, top, left
+
+    def _layers(self, items):
+        """
+        Combine rasterized text into layers that can each be drawn all at once.
+
+        Strings rarely touch, so this is almost always a single layer. See
+        `_split_overlaps`.
+
+        :param items: List of rasterized text, from `_text`.
+        :return: List of layers, each holding the indices of its pixels in the
+                 flattened image, the coverage of each, and the index of the item
+                 each pixel belongs to.
+        :rtype: list
+        """
+        height, width = self.shape[:2]
+        all_idx, all_cov, all_item = [], [], []
+        for item, (bitmap, top, left) in enumerate(items):
+            rows, cols = np.nonzero(bitmap)
+            cov = bitmap[rows, cols]
+            rows = rows + top
+            cols = cols + left
+            # leave out anything that goes off the image
+            inside = (rows >= 0) & (rows < height) & (cols >= 0) & (cols < width)
+            all_idx.append(self._pixel_index(rows[inside], cols[inside]))
+            all_cov.append(cov[inside])
+            all_item.append(np.full(np.count_nonzero(inside), item))
+        return _split_overlaps(
+            np.concatenate(all_idx),
+            np.concatenate(all_cov).astype(np.float32),
+            np.concatenate(all_item),
+        )
+
+    def render(self, state=None):
+        """
+        Render the table in a given state.
+
+        :param state: Dictionary describing the table, in the format used by
+                      `PeriodicTable.set_state`. Defaults to the state of a newly
+                      created table.
+        :return: RGBA image with shape (height, width, 4). The background is
+                 transparent.
+        :rtype: np.ndarray
+        """
+        # What is shown, faded, and highlighted is worked out the same way as the table
+        bits = table_state.TableState.encode(state, self._fracs)
+        elt_faded = bits.faded
+        elt_highlight = bits.highlighted
+        label_shown = (bits.labels & table_state.LABEL_SHOWN) > 0
+        label_faded = (bits.labels & table_state.LABEL_FADED) > 0
+        label_highlight = label_shown & (
+            (bits.labels & table_state.LABEL_HIGHLIGHT) > 0
+        )
+
+        # The image is built with premultiplied alpha, starting from the back.
+        image = self._backgrounds[int(bits.connectors_faded)].copy()
+
+        # every element has the same sources shown
+        shown = np.array([bits.shown(source)[0] for source in geometry.sources])
+        if np.any(shown):
+            self._draw_fills(image, shown, elt_faded)
+
+        if np.any(label_shown):
+            for idx, rgba, item in self._label_layers:
+                rgba = np.where(label_faded[item], rgba[1], rgba[0])
+                _composite(image, idx, rgba * label_shown[item])
+
+        if np.any(elt_faded):
+            # Faded boxes are drawn underneath the others, as the table does
+            faded = _premultiply(self._combine_boxes(elt_faded), self._black[1])
+            rgba = _premultiply(self._combine_boxes(~elt_faded), self._black[0])
+            rgba += faded * (1 - rgba[3])
+            _composite(image, self._box_idx, rgba)
+        else:
+            _composite(image, self._box_idx, self._all_boxes)
+
+        # Then all the text, with the outlines of highlighted text underneath.
+        # Highlighted text is white. Labels that aren't shown are left transparent.
+        elt_faded = elt_faded.astype(int)
+        label_faded = label_faded.astype(int)
+        elt_highlight = elt_highlight.astype(int)
+        label_highlight = label_highlight.astype(int)
+        strokes = np.concatenate(
+            [
+                self._text_colors[0, elt_faded] * elt_highlight[:, np.newaxis],
+                self._text_colors[0, label_faded] * label_highlight[:, np.newaxis],
+            ]
+        )
+        text = np.concatenate(
+            [
+                self._text_colors[elt_highlight, elt_faded],
+                self._text_colors[0, elt_faded],
+                self._text_colors[label_highlight, label_faded]
+                * label_shown[:, np.newaxis],
+            ]
+        )
+        layers = [(self._text_layers, text)]
+        if np.any(strokes):
+            layers.insert(0, (self._stroke_layers, strokes))
+        for text_layers, colors in layers:
+            colors = np.ascontiguousarray(colors.T)
+            for idx, coverage, item in text_layers:
+                _composite(image, idx, colors[:, item] * coverage)
+
+        # Finally, convert to regular RGBA
+        alpha = image[3]
+        scale = np.zeros_like(alpha)
+        np.divide(255.0, alpha, out=scale, where=alpha > 0)
+        image[:3] *= scale
+        image[3] *= 255.0
+        # round to the nearest integer, which the cast alone would not do
+        image += 0.5
+        np.clip(image, 0, 255, out=image)
+        output = np.empty(self.shape, dtype=np.uint8)
+        output.reshape(-1, 4)[:] = image.T
+        return output
+
+    def _draw_fills(self, image, shown, elt_faded):
+        """
+        Draw the fills of the elements.
+
+        :param image: Flattened image to draw on, with premultiplied alpha.
+        :param shown: Array of whether each source is shown.
+        :param elt_faded: Array of whether each element is faded.
+        :return: None
+        """
+        # The color and alpha each source adds to a pixel it covers all of, by
+        # whether it is faded. Sources that aren't shown add nothing.
+        weights = np.zeros((2, 4, len(shown)), dtype=np.float32)
+        weights[:, :3, shown] = self._fill_colors[:, shown].transpose(0, 2, 1)
+        weights[:, 3, shown] = 1
+        # Most pixels are drawn in the color most elements have, then the pixels of
+        # the other elements are drawn again. Pixels outside the boxes have an element
+        # index of -1, which takes the same color as most elements.
+        mostly_faded = np.count_nonzero(elt_faded) > len(elt_faded) / 2
+        rgba = weights[int(mostly_faded)] @ self._fill_cov
+        if np.any(elt_faded != mostly_faded):
+            others = np.append(elt_faded != mostly_faded, False)[self._pixel_elt]
+            rgba[:, others] = weights[int(not mostly_faded)] @ self._fill_cov[:, others]
+        np.minimum(rgba[3], 1, out=rgba[3])
+        # the fills don't overlap, so we can draw all of them at once
+        image *= 1 - rgba[3]
+        image += rgba
+
+    def _combine_boxes(self, elts):
+        """
+        Get the coverage of the boxes around some of the elements, drawn on top of
+        each other.
+
+        :param elts: Array of whether each element is included.
+        :return: The fraction of each pixel of any box that is covered.
+        :rtype: np.ndarray
+        """
+        use = elts[self._box_elt]
+        log_transmitted = np.bincount(
+            self._box_pixel[use],
+            weights=self._box_log[use],
+            minlength=len(self._box_idx),
+        )
+        return -np.expm1(log_transmitted)
@@ -0,0 +1,585 @@
+"""
+HTTP service that renders the table.
+
+Run it with
+
+    python -m periodic_table.serve --port 8000
+
+then request images like
+
+    http://localhost:8000/?sources=bb,cr,low%20mass&highlight=bb&format=png&dpi=50
+
+The query parameters are "sources", "highlight", "isolate" (comma separated lists,
+or given more than once), "isolate_label", "format", and "dpi". Making a table takes
+seconds, so the tables are made once, in a pool of worker processes, when the
+service starts. Requests are then only the time to render.
+
+Responses have an ETag of the state hash (see `PeriodicTable.state_hash`), so clients
+that already have an image get a 304 without anything being rendered. Renders are
+also kept in a `RenderCache`. When the workers already have as many renders waiting
+as the service allows, new requests get a 503 right away rather than waiting in an
+ever longer queue.
+
+The same module has a load generator to benchmark a running service:
+
+    python -m periodic_table.serve --benchmark --port 8000 --requests 500
+"""
+
+import argparse
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+import os
+import time
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from . import catalog
+from . import query as table_query
+from . import state as table_state
+from . import style
+from .cache import RenderCache, state_hash
+
+content_types = {
+    "png": "image/png",
+    "svg": "image/svg+xml",
+    "pdf": "application/pdf",
+}
+# Limit the resolution, since a large dpi takes a long time and a lot of memory.
+max_dpi = 600
+
+_reasons = {
+    200: "OK",
+    304: "Not Modified",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+# The table used by each worker process. See `_init_worker`.
+_worker_table = None
+
+
+def _init_worker(table_kwargs):
+    """
+    Build the table used by a worker process.
+
+    :param table_kwargs: Keyword arguments passed to PeriodicTable.
+    :return: None
+    """
+    global _worker_table
+    from .periodic_table import PeriodicTable
+
+    _worker_table = PeriodicTable(**table_kwargs)
+
+
+def _ready():
+    """
+    Do nothing in a worker process. This is used to start the workers ahead of time.
+
+    :return: None
+    """
+    pass
+
+
+def _render(state, format, dpi):
+    """
+    Render the table in a worker process.
+
+    :param state: State of the table to render.
+    :param format: File format to render.
+    :param dpi: Resolution to render at.
+    :return: The contents of the file.
+    :rtype: bytes
+    """
+    _worker_table.set_state(state)
+    return _worker_table.to_bytes(format, dpi)
+
+
+def table_config(**table_kwargs):
+    """
+    Get the labels and colors of a table, in the format used by `state_hash`.
+
+    :param table_kwargs: Keyword arguments that would be passed to PeriodicTable.
+    :return: Dictionary with all the labels and colors of the table.
+    :rtype: dict
+    """
+    config = dict()
+    for source in ["bb", "cr", "agb", "snii", "snia", "r", "unstable"]:
+        # AGB uses the label and color of the S process
+        default = "s" if source == "agb" else source
+        config["label_" + source] = style.default_labels[default]
+        config["color_" + source] = style.default_colors[default]
+    for name in table_kwargs:
+        if name not in config:
+            raise ValueError("{} is not an option of the table.".format(name))
+    config.update(table_kwargs)
+    return config
+
+
+def _split(values):
+    """
+    Get a list from query values, which can be comma separated or repeated.
+
+    :param values: List of the values of one query parameter.
+    :return: List of all the items in the values.
+    :rtype: list
+    """
+    return [item.strip() for value in values for item in value.split(",") if item]
+
+
+def parse_query(query, default_dpi=100):
+    """
+    Get what to render from the query of a URL.
+
+    :param query: Query string of the URL.
+    :param default_dpi: Resolution used if the query doesn't give one.
+    :return: The state of the table, the file format, and the dpi.
+    :rtype: tuple
+    """
+    params = parse_qs(query, keep_blank_values=True)
+
+    sources = table_state.parse_sources(_split(params.get("sources", [])))
+    # sources given more than once are the same as given once
+    sources = sorted(set(sources))
+
+    highlight = params.get("highlight", [""])[-1].lower() or None
+    if highlight is not None:
+        # this checks the source
+        catalog.source_columns(highlight)
+
+    # an empty "isolate" fades every element, as isolating no elements does
+    isolate = None
+    if "isolate" in params:
+        # elements can be given by symbol or number, as in `PeriodicTable.isolate_elt`
+        elements = [
+            int(item) if item.isdigit() else item for item in _split(params["isolate"])
+        ]
+        for element in elements:
+            catalog.index(element)
+        isolate = table_query.to_symbols(elements)
+    isolate_label = params.get("isolate_label", ["false"])[-1].lower()
+    if isolate_label not in ["", "0", "1", "false", "true"]:
+        raise ValueError("isolate_label must be true or false.")
+
+    format = params.get("format", ["png"])[-1].lower()
+    if format not in content_types:
+        raise ValueError("Format {} is not supported.".format(format))
+    try:
+        dpi = float(params.get("dpi", [default_dpi])[-1])
+    except ValueError:
+        raise ValueError("dpi must be a number.")
+    if not 0 < dpi <= max_dpi:
+        raise ValueError("dpi must be between 0 and {}.".format(max_dpi))
+    # whole numbers are hashed the same as the integers a table would be given
+    if dpi == int(dpi):
+        dpi = int(dpi)
+
+    state = {
+        "sources": sources,
+        "highlight": highlight,
+        "isolate": isolate,
+        "isolate_label": isolate_label in ["1", "true"],
+    }
+    return state, format, dpi
+
+
+def _etag_matches(etag, if_none_match):
+    """
+    Check whether the If-None-Match header of a request matches an ETag.
+
+    :param etag: ETag of the response, in quotes.
+    :param if_none_match: Value of the header, which is "*" or a comma separated
+                          list of ETags. Weak ETags (with a "W/" prefix) match the
+                          same ETag, since If-None-Match compares ETags weakly.
+    :return: Whether the client already has the response.
+    :rtype: bool
+    """
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == etag or tag == "*":
+            return True
+    return False
+
+
+class RenderServer(object):
+    """
+    Renders tables for HTTP requests on a pool of worker processes, each holding its
+    own table.
+    """
+
+    def __init__(
+        self,
+        workers=None,
+        max_pending=None,
+        default_dpi=100,
+        cache_bytes=100 * 1024**2,
+        **table_kwargs
+    ):
+        """
+        Initialize the service. Nothing is started until `start` is called.
+
+        :param workers: Number of worker processes. Defaults to the number of CPUs.
+        :param max_pending: Most renders that can be running or waiting for a
+                            worker. Requests that would need to render more get a
+                            503. Defaults to twice the number of workers.
+        :param default_dpi: Resolution used when the request doesn't give one.
+        :param cache_bytes: Maximum total size of the renders kept in memory.
+        :param table_kwargs: Keyword arguments passed to PeriodicTable, to set the
+                             labels and colors.
+        """
+        self.workers = os.cpu_count() if workers is None else workers
+        if self.workers < 1:
+            raise ValueError("There must be at least one worker.")
+        self.max_pending = 2 * self.workers if max_pending is None else max_pending
+        self.default_dpi = default_dpi
+        self.table_kwargs = table_kwargs
+        self.config = table_config(**table_kwargs)
+        self.cache = RenderCache(max_bytes=cache_bytes)
+
+        # Renders that are running or waiting, by their hash. Requests for a state
+        # that is already being rendered wait on the same render.
+        self._pending = dict()
+        self._pool = None
+        self._server = None
+
+    @property
+    def port(self):
+        """
+        Port the service is listening on.
+        """
+        return self._server.sockets[0].getsockname()[1]
+
+    async def start(self, host="127.0.0.1", port=8000):
+        """
+        Start the worker processes, then start listening for requests. The tables
+        are all built before this returns.
+
+        :param host: Address to listen on.
+        :param port: Port to listen on. Use 0 to pick any free port.
+        :return: None
+        """
+        self._pool = ProcessPoolExecutor(
+            self.workers, initializer=_init_worker, initargs=(self.table_kwargs,)
+        )
+        loop = asyncio.get_running_loop()
+        # workers are only started when there is work for them, so give each one
+        # something to do
+        await asyncio.gather(
+            *[loop.run_in_executor(self._pool, _ready) for _ in range(self.workers)]
+        )
+        self._server = await asyncio.start_server(self._handle, host, port)
+
+    async def serve_forever(self):
+        """
+        Keep handling requests until cancelled.
+
+        :return: None
+        """
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        """
+        Stop listening for requests and shut down the worker processes.
+
+        :return: None
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._pool is not None:
+            self._pool.shutdown()
+
+    async def _handle(self, reader, writer):
+        """
+        Handle the requests on one connection. Connections are kept open for more
+        requests unless the client asks otherwise.
+
+        :param reader: Stream of the request.
+        :param writer: Stream for the response.
+        :return: None
+        """
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = dict()
+                while True:
+                    line = await reader.readline()
+                    if line in [b"\r\n", b"\n", b""]:
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._write(writer, "GET", 400, dict(), b"Bad request line")
+                    break
+                status, response_headers, body = await self.respond(
+                    method, target, headers
+                )
+                keep_alive = (
+                    version == "HTTP/1.1"
+                    and headers.get("connection", "").lower() != "close"
+                )
+                if not keep_alive:
+                    response_headers["Connection"] = "close"
+                await self._write(writer, method, status, response_headers, body)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass  # the client went away
+        finally:
+            writer.close()
+
+    async def _write(self, writer, method, status, headers, body):
+        """
+        Write a response.
+
+        :param writer: Stream for the response.
+        :param method: Method of the request. HEAD requests get no body.
+        :param status: Status code of the response.
+        :param headers: Dictionary of the headers of the response.
+        :param body: Body of the response, as bytes.
+        :return: None
+        """
+        head = ["HTTP/1.1 {} {}".format(status, _reasons[status])]
+        headers = dict(headers)
+        if status != 304:
+            headers.setdefault("Content-Type", "text/plain; charset=utf-8")
+            headers["Content-Length"] = str(len(body))
+        head += ["{}: {}".format(name, value) for name, value in headers.items()]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1"))
+        if method != "HEAD" and status != 304:
+            writer.write(body)
+        await writer.drain()
+
+    async def respond(self, method, target, headers):
+        """
+        Get the response to a request.
+
+        :param method: HTTP method of the request.
+        :param target: Path and query of the request.
+        :param headers: Dictionary of the headers of the request, with lowercase
+                        names.
+        :return: The status code, the headers, and the body of the response.
+        :rtype: tuple
+        """
+        if method not in ["GET", "HEAD"]:
+            return 405, {"Allow": "GET, HEAD"}, b"Only GET and HEAD are supported"
+        url = urlsplit(target)
+        if url.path != "/":
+            return 404, dict(), b"Not found"
+        try:
+            state, format, dpi = parse_query(url.query, self.default_dpi)
+        except ValueError as e:
+            return 400, dict(), str(e).encode("utf-8")
+
+        key = state_hash(state, self.config, format, dpi)
+        etag = '"{}"'.format(key)
+        response_headers = {"ETag": etag}
+        if _etag_matches(etag, headers.get("if-none-match", "")):
+            return 304, response_headers, b""
+
+        data = self.cache.get(key)
+        if data is None:
+            if key not in self._pending and len(self._pending) >= self.max_pending:
+                response_headers["Retry-After"] = "1"
+                return 503, response_headers, b"Too many renders waiting"
+            try:
+                data = await self._render(key, state, format, dpi)
+            except Exception as e:
+                return 500, dict(), "Render failed: {}".format(e).encode("utf-8")
+
+        response_headers["Content-Type"] = content_types[format]
+        return 200, response_headers, data
+
+    async def _render(self, key, state, format, dpi):
+        """
+        Render a state on the workers, or wait for the same render if it's already
+        running.
+
+        :param key: Hash of the render.
+        :param state: State of the table.
+        :param format: File format to render.
+        :param dpi: Resolution to render at.
+        :return: The contents of the file.
+        :rtype: bytes
+        """
+        if key not in self._pending:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self._pool, _render, state, format, dpi)
+            self._pending[key] = future
+
+            def done(future):
+                # the render is cached before it stops being pending, so later
+                # requests always find it in one or the other
+                if not future.cancelled() and future.exception() is None:
+                    self.cache.put(key, future.result())
+                del self._pending[key]
+
+            future.add_done_callback(done)
+        # one client going away doesn't cancel the render for the others
+        return await asyncio.shield(self._pending[key])
+
+
+async def _request(reader, writer, host, path):
+    """
+    Make one request on an open connection and read the whole response.
+
+    :param reader: Stream of the response.
+    :param writer: Stream for the request.
+    :param host: Host the request is sent to.
+    :param path: Path and query to request.
+    :return: The status code of the response.
+    :rtype: int
+    """
+    request = "GET {} HTTP/1.1\r\nHost: {}\r\n\r\n".format(path, host)
+    writer.write(request.encode("latin-1"))
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in [b"\r\n", b"\n", b""]:
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def benchmark(host, port, paths, requests=200, concurrency=8):
+    """
+    Send requests to a running service as fast as it answers them, and measure how
+    long they take.
+
+    :param host: Address of the service.
+    :param port: Port of the service.
+    :param paths: List of paths with queries to request, which are used in turn.
+    :param requests: Total number of requests to make.
+    :param concurrency: Number of connections making requests at the same time.
+    :return: Dictionary with the number of requests ("requests"), the total time
+             in seconds ("seconds"), the requests per second ("requests_per_second"),
+             the median and 99th percentile latency in milliseconds ("p50_ms" and
+             "p99_ms"), and the number of responses with each status code
+             ("status").
+    :rtype: dict
+    """
+    latencies = []
+    statuses = dict()
+    counter = iter(range(requests))
+
+    async def client():
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            for idx in counter:
+                start = time.perf_counter()
+                status = await _request(reader, writer, host, paths[idx % len(paths)])
+                latencies.append(time.perf_counter() - start)
+                statuses[status] = statuses.get(status, 0) + 1
+        finally:
+            writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*[client() for _ in range(concurrency)])
+    seconds = time.perf_counter() - start
+    return {
+        "requests": len(latencies),
+        "seconds": seconds,
+        "requests_per_second": len(latencies) / seconds,
+        "p50_ms": np.percentile(latencies, 50) * 1000,
+        "p99_ms": np.percentile(latencies, 99) * 1000,
+        "status": statuses,
+    }
+
+
+def benchmark_paths(dpi=50, format="png"):
+    """
+    Get a set of requests that cover a variety of states, to use in a benchmark.
+
+    :param dpi: Resolution of the requests.
+    :param format: File format of the requests.
+    :return: List of paths with queries.
+    :rtype: list
+    """
+    sources = ["bb", "cr", "low mass", "snii", "snia", "r", "unstable"]
+    paths = []
+    for idx, source in enumerate(sources):
+        shown = ",".join(sources[: idx + 1])
+        for highlight in ["", source]:
+            paths.append(
+                "/?sources={}&highlight={}&format={}&dpi={}".format(
+                    shown, highlight, format, dpi
+                ).replace(" ", "%20")
+            )
+    return paths
+
+
+async def _serve(args):
+    server = RenderServer(
+        workers=args.workers,
+        max_pending=args.max_pending,
+        default_dpi=args.dpi,
+        cache_bytes=int(args.cache_mb * 1024**2),
+    )
+    await server.start(args.host, args.port)
+    print("Serving on http://{}:{}/".format(args.host, server.port))
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m periodic_table.serve",
+        description="Serve renders of the periodic table over HTTP.",
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--max-pending", type=int, default=None)
+    parser.add_argument("--dpi", type=float, default=100)
+    parser.add_argument("--cache-mb", type=float, default=100)
+    parser.add_argument(
+        "--benchmark",
+        action="store_true",
+        help="Send requests to a running service instead of serving.",
+    )
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args(argv)
+
+    if args.benchmark:
+        results = asyncio.run(
+            benchmark(
+                args.host,
+                args.port,
+                benchmark_paths(args.dpi),
+                args.requests,
+                args.concurrency,
+            )
+        )
+        print(
+            "{requests} requests in {seconds:.2f} s: {requests_per_second:.1f} "
+            "requests/s, p50 {p50_ms:.1f} ms, p99 {p99_ms:.1f} ms, "
+            "status {status}".format(**results)
+        )
+    else:
+        try:
+            asyncio.run(_serve(args))
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+Compact description of everything that is visible on the table.
+
+The state of the table (see `PeriodicTable.get_state`) is encoded as bits: one
+integer per element holding which sources are shown on it and whether it is faded
+or highlighted, and one per label holding whether it is shown, faded, or highlighted.
+Comparing two encoded states with XOR gives exactly the elements and labels that
+look different, so the table only has to update those when it changes state.
+
+This only needs the catalog, so it can be used without the plotting libraries.
+"""
+
+import numpy as np
+
+from . import catalog
+from . import geometry
+from . import query
+
+# Bits of each element. The first bits are the sources shown, in the order of
+# `catalog.sources`.
+FADED = 1 << len(catalog.sources)
+HIGHLIGHT = FADED << 1
+SOURCES = FADED - 1
+
+# Bits of each label
+LABEL_SHOWN = 1
+LABEL_FADED = 2
+LABEL_HIGHLIGHT = 4
+
+# The labels, in the order of `TableState.labels`. The S and AGB sources share the
+# "s" label.
+labels = list(geometry.label_positions)
+label_sources = {label: ["s", "agb"] if label == "s" else [label] for label in labels}
+label_aliases = {
+    label: ["s", "agb", "low mass"] if label == "s" else [label] for label in labels
+}
+_label_masks = np.array(
+    [
+        sum(1 << catalog.source_idx[source] for source in label_sources[label])
+        for label in labels
+    ]
+)
+
+
+def parse_sources(sources):
+    """
+    Check that the sources given by the user are valid, and put them in the format
+    used internally.
+
+    :param sources: List of source names, in any case.
+    :return: List of lowercase source names, with the "low mass" source replaced by
+             the S and AGB sources it stands for.
+    :rtype: list
+    """
+    sources = [source.lower() for source in sources]
+    # there is a separate low mass label that is both AGB and S
+    if "low mass" in sources:
+        sources.remove("low mass")
+        sources += ["s", "agb"]
+
+    for source in sources:
+        if source not in catalog.source_idx:
+            raise ValueError("Source {} not correct.".format(source))
+    return sources
+
+
+class TableState(object):
+    """
+    Everything that is visible on the table, encoded as bits.
+    """
+
+    def __init__(self, elements, labels, connectors_faded):
+        """
+        :param elements: Array of the bits of each element, in catalog order. See
+                         `FADED`, `HIGHLIGHT`, and `SOURCES`.
+        :param labels: Array of the bits of each label, in the order of `labels`.
+                       See `LABEL_SHOWN`, `LABEL_FADED`, and `LABEL_HIGHLIGHT`.
+        :param connectors_faded: Whether the lines connecting the Lanthanides and
+                                 Actinides are faded.
+        """
+        self.elements = elements
+        self.labels = labels
+        self.connectors_faded = connectors_faded
+
+    @classmethod
+    def encode(cls, state=None, fractions=None):
+        """
+        Encode a state of the table.
+
+        :param state: Dictionary describing the table, in the format used by
+                      `PeriodicTable.set_state`. Defaults to the state of a newly
+                      created table.
+        :param fractions: Fractions of the elements on the table, which decide what
+                          is highlighted. Defaults to `catalog.fractions`.
+        :return: The encoded state.
+        :rtype: TableState
+        """
+        if state is None:
+            state = dict()
+        if fractions is None:
+            fractions = catalog.fractions
+        sources = parse_sources(state.get("sources", []))
+        highlight = state.get("highlight", None)
+        # Isolating no elements fades everything, which is different from not
+        # isolating anything (None)
+        isolate = state.get("isolate", None)
+
+        shown = 0
+        for source in sources:
+            shown |= 1 << catalog.source_idx[source]
+        elements = np.full(len(catalog.symbols), shown, dtype=np.uint16)
+
+        label_bits = np.zeros(len(labels), dtype=np.uint8)
+        label_bits[(_label_masks & shown) > 0] |= LABEL_SHOWN
+
+        if highlight is not None:
+            highlight = highlight.lower()
+            elements[catalog.primary(highlight, fracs=fractions)] |= HIGHLIGHT
+            for idx, label in enumerate(labels):
+                if highlight in label_aliases[label]:
+                    label_bits[idx] |= LABEL_HIGHLIGHT
+
+        if isolate is not None:
+            isolated = np.isin(catalog.symbols, query.to_symbols(isolate, fractions))
+            elements[~isolated] |= FADED
+            # Labels stay unfaded if they are the primary source of any isolated
+            # element, when the labels are isolated too.
+            primary = 0
+            if state.get("isolate_label", False):
+                primary_sources = np.any(
+                    fractions[isolated] > catalog.highlight_threshold, axis=0
+                )
+                for s_idx in np.flatnonzero(primary_sources):
+                    primary |= 1 << int(s_idx)
+            label_bits[(_label_masks & primary) == 0] |= LABEL_FADED
+
+        return cls(elements, label_bits, isolate is not None)
+
+    def __eq__(self, other):
+        return (
+            np.array_equal(self.elements, other.elements)
+            and np.array_equal(self.labels, other.labels)
+            and self.connectors_faded == other.connectors_faded
+        )
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __xor__(self, other):
+        """
+        Find what differs between two states.
+
+        :param other: The other state.
+        :return: State with the bits set where the two states differ.
+        :rtype: TableState
+        """
+        return TableState(
+            self.elements ^ other.elements,
+            self.labels ^ other.labels,
+            self.connectors_faded != other.connectors_faded,
+        )
+
+    @property
+    def faded(self):
+        """
+        Array of whether each element is faded.
+        """
+        return (self.elements & FADED) > 0
+
+    @property
+    def highlighted(self):
+        """
+        Array of whether each element is highlighted.
+        """
+        return (self.elements & HIGHLIGHT) > 0
+
+    def shown(self, source):
+        """
+        Get whether a source is shown on each element.
+
+        :param source: Lowercase name of the source.
+        :return: Array of whether the source is shown on each element.
+        :rtype: np.ndarray
+        """
+        return (self.elements & (1 << catalog.source_idx[source])) > 0
+
+    def label(self, label):
+        """
+        Get the bits of a label.
+
+        :param label: Name of the label, from `labels`.
+        :return: Bits of the label.
+        :rtype: int
+        """
+        return int(self.labels[labels.index(label)])
@@ -0,0 +1,60 @@
+"""
+The style of the table: its font, line widths, and the default labels and colors.
+
+Like `catalog`, this module doesn't import any of the plotting libraries, so the
+style can be used by renderers that don't use matplotlib.
+"""
+
+import colorsys
+
+font = {"family": "Avenir", "weight": "medium"}
+# This is the same as `betterplotlib.almost_black`
+almost_black = "#262626"
+
+# The labels and colors of the sources, used unless the user gives their own. The
+# "s" label and color are also used for AGB.
+default_labels = {
+    "bb": "Big Bang",
+    "cr": "Cosmic Ray Spallation",
+    "s": "Low Mass Stars",
+    "snii": "Exploding Massive Stars",
+    "snia": "Exploding White Dwarfs",
+    "r": "Merging Neutron Stars?",
+    "unstable": "Not Naturally Occurring",
+}
+default_colors = {
+    "bb": "#D7E5CC",
+    "cr": "#C3DDFA",
+    "snia": "#fe9443",
+    "snii": "#FEE844",
+    "r": "#AFBF75",
+    "s": "#73A0CC",
+    "unstable": "#CCCCCC",
+}
+
+# Sizes of the text and lines, in points
+element_fontsize = 30
+number_fontsize = 0.6 * element_fontsize
+element_linewidth = 5
+element_highlight_linewidth = 5
+label_fontsize = 27
+label_linewidth = 1
+label_highlight_linewidth = 4
+connector_linewidth = 4
+
+
+def fade_color(color):
+    """
+    Get the faded version of a color. This matches `betterplotlib.fade_color`.
+
+    :param color: The original color, in any format matplotlib understands.
+    :return: Hex string of the faded color.
+    :rtype: str
+    """
+    # matplotlib is only needed to parse the color, so it's only imported here
+    from matplotlib.colors import to_rgb
+
+    h, s, v = colorsys.rgb_to_hsv(*to_rgb(color))
+    # remove saturation and move 3/4 of the way to full brightness
+    rgb = colorsys.hsv_to_rgb(h, s / 3.0, v + (1.0 - v) * 0.75)
+    return "#" + "".join("{:02x}".format(int(round(c * 255))) for c in rgb)
@@ -0,0 +1,368 @@
+"""
+Write the table as an SVG directly, without drawing it with matplotlib.
+
+Matplotlib's SVG backend writes every fill as its own path, and every string as
+glyph outlines with their own style. Here the table is written from the same data and
+layout that the table is drawn from, with all the shapes of one color merged into one
+path and the text written as real text, so the files are much smaller and quick to
+make. Browsers draw the text with their own copy of the font, so the text can look
+slightly different from the table if the font isn't installed.
+"""
+
+from xml.sax.saxutils import escape
+
+import numpy as np
+
+from . import catalog
+from . import geometry
+from . import state as table_state
+from . import style
+
+# The SVG is in points, with 72 points per inch. The table is 20 by 12 inches.
+_scale = 72
+_width = 20 * _scale
+_height = 12 * _scale
+
+_header = (
+    '<svg xmlns="http://www.w3.org/2000/svg" width="{w}pt" height="{h}pt" '
+    'viewBox="0 0 {w} {h}">\n'
+    "<style>"
+    "text{{font-family:{family},sans-serif;font-weight:{weight};"
+    "text-anchor:middle;dominant-baseline:central}}"
+    ".e{{font-size:{element}px}}.n{{font-size:{number}px}}"
+    ".l{{font-size:{label}px}}"
+    ".h{{fill:white;paint-order:stroke;stroke-linejoin:round}}"
+    "</style>\n"
+)
+_footer = "</svg>\n"
+_fill = '<path fill="{color}"{extra} d="{d}"/>\n'
+_stroke = (
+    '<path fill="none" stroke="{color}" stroke-width="{width}" '
+    'stroke-linecap="{cap}" stroke-linejoin="{join}" d="{d}"/>\n'
+)
+_text = '<text class="{cls}" x="{x}" y="{y}" fill="{color}">{text}</text>\n'
+_text_highlight = (
+    '<text class="{cls} h" x="{x}" y="{y}" stroke="{color}" stroke-width="{width}">'
+    "{text}</text>\n"
+)
+
+
+def _number(value):
+    """
+    Format a coordinate for the SVG, to a hundredth of a point.
+
+    :param value: Number to format.
+    :return: The shortest string that represents the rounded number.
+    :rtype: str
+    """
+    return "{:.2f}".format(value).rstrip("0").rstrip(".")
+
+
+def _x(x):
+    """
+    Convert an x position in data coordinates to the SVG.
+    """
+    return _number(x * _scale)
+
+
+def _y(y):
+    """
+    Convert a y position in data coordinates to the SVG, which starts from the top.
+    """
+    return _number(_height - y * _scale)
+
+
+def _polygon(vertices):
+    """
+    Get the path data of a closed polygon.
+
+    :param vertices: Array of the x and y values of the vertices in data
+                     coordinates, with shape (n_vertices, 2).
+    :return: Path data of the polygon.
+    :rtype: str
+    """
+    points = []
+    for x, y in vertices:
+        point = _x(x) + " " + _y(y)
+        # the fills can have repeated vertices, see `geometry.region_vertices`
+        if len(points) == 0 or point != points[-1]:
+            points.append(point)
+    if len(points) > 1 and points[0] == points[-1]:
+        points.pop()
+    return "M" + "L".join(points) + "Z"
+
+
+def _line(xs, ys):
+    """
+    Get the path data of a line through a list of points.
+
+    :param xs: X values of the points in data coordinates.
+    :param ys: Y values of the points in data coordinates.
+    :return: Path data of the line.
+    :rtype: str
+    """
+    points = [_x(x) + " " + _y(y) for x, y in zip(xs, ys)]
+    return "M" + "L".join(points)
+
+
+def _square(column, row):
+    """
+    Get the path data of the box of an element.
+
+    :param column: X position of the lower left corner of the box.
+    :param row: Y position of the lower left corner of the box.
+    :return: Path data of the box.
+    :rtype: str
+    """
+    return "M{} {}h{}v{}h-{}Z".format(_x(column), _y(row), _scale, -_scale, _scale)
+
+
+def _color(color, faded):
+    """
+    Get the hex string of a color, faded or not.
+
+    :param color: Color in any format matplotlib understands.
+    :param faded: Whether to fade the color.
+    :return: Color to use in the SVG.
+    :rtype: str
+    """
+    if faded:
+        return style.fade_color(color)
+    # plain strings are used as is, since they are almost always valid in SVG too
+    if isinstance(color, str):
+        return color
+    from matplotlib.colors import to_hex
+
+    return to_hex(color)
+
+
+# The parts of the SVG that never change are only written once. See `_get_layout`
+_layout = None
+
+
+def _get_layout(fracs=None):
+    """
+    Get the path data and positions of everything on the table, writing them the
+    first time.
+
+    :param fracs: Fractions of the elements, in the layout of `catalog.fractions`.
+                  Defaults to the catalog's own, whose layout is kept. The layout
+                  of any other fractions is written again each time.
+    :return: Dictionary holding the fractions of each element ("fracs"), the path
+             data of the connecting lines ("connectors"), the box of each element
+             ("squares"), and the fill of the elements each source contributes to
+             ("fills", as pairs of the element index and path data), as well as the
+             position of the text of each element ("text") and the path data and
+             text position of each label ("labels").
+    :rtype: dict
+    """
+    global _layout
+    if fracs is None:
+        if _layout is None:
+            _layout = _get_layout(catalog.fractions)
+        return _layout
+
+    columns = catalog.columns
+    # The rows are flipped on the table, see `Element`
+    rows = 11 - catalog.rows
+    verts = geometry.fill_vertices(fracs, columns, rows)
+    fills = [
+        [
+            (e_idx, _polygon(verts[e_idx, s_idx]))
+            for e_idx in np.flatnonzero(fracs[:, s_idx] > 0)
+        ]
+        for s_idx in range(len(geometry.sources))
+    ]
+
+    labels = dict()
+    for label, (x_idx, y_idx) in geometry.label_positions.items():
+        x, y, width, height = geometry.label_box(x_idx, y_idx)
+        box = [(x, y), (x + width, y), (x + width, y + height), (x, y + height)]
+        outline = _line(
+            [x, x, x + width, x + width, x], [y, y + height, y + height, y, y]
+        )
+        labels[label] = (
+            _polygon(box),
+            outline,
+            _x(x + width / 2.0),
+            _y(y + height / 2.0),
+        )
+
+    return {
+        "fracs": fracs,
+        "connectors": "".join(_line(xs, ys) for xs, ys in geometry.connector_lines),
+        "squares": [_square(column, row) for column, row in zip(columns, rows)],
+        "fills": fills,
+        "text": [
+            (_x(column + 0.5), _y(row + 0.65), _y(row + 0.25))
+            for column, row in zip(columns, rows)
+        ],
+        "labels": labels,
+    }
+
+
+def table_svg(
+    state=None,
+    label_bb=style.default_labels["bb"],
+    label_cr=style.default_labels["cr"],
+    label_agb=style.default_labels["s"],
+    label_snii=style.default_labels["snii"],
+    label_snia=style.default_labels["snia"],
+    label_r=style.default_labels["r"],
+    label_unstable=style.default_labels["unstable"],
+    color_bb=style.default_colors["bb"],
+    color_cr=style.default_colors["cr"],
+    color_snia=style.default_colors["snia"],
+    color_snii=style.default_colors["snii"],
+    color_r=style.default_colors["r"],
+    color_agb=style.default_colors["s"],
+    color_unstable=style.default_colors["unstable"],
+    fractions=None,
+):
+    """
+    Write the table in a given state as an SVG.
+
+    :param state: Dictionary describing the table, in the format used by
+                  `PeriodicTable.set_state`. Defaults to the state of a newly
+                  created table.
+    :param label_bb: and the rest of the label and color parameters are the same as
+                     those of `PeriodicTable`.
+    :param fractions: Fractions of the elements, in the layout of
+                      `catalog.fractions`. Defaults to the catalog's own. See
+                      `datasets`.
+    :return: The SVG document.
+    :rtype: str
+    """
+    labels = {
+        "bb": label_bb,
+        "cr": label_cr,
+        "s": label_agb,
+        "snii": label_snii,
+        "snia": label_snia,
+        "r": label_r,
+        "unstable": label_unstable,
+    }
+    colors = {
+        "bb": color_bb,
+        "cr": color_cr,
+        "snii": color_snii,
+        "snia": color_snia,
+        "agb": color_agb,
+        "s": color_agb,
+        "r": color_r,
+        "unstable": color_unstable,
+    }
+    black = style.almost_black
+    faded_black = style.fade_color(black)
+
+    # What is shown, faded, and highlighted is worked out the same way as the table
+    layout = _get_layout(fractions)
+    bits = table_state.TableState.encode(state, layout["fracs"])
+    shown = {source: bits.shown(source).tolist() for source in geometry.sources}
+    faded_list = bits.faded.tolist()
+
+    svg = [
+        _header.format(
+            w=_width,
+            h=_height,
+            family=style.font["family"],
+            weight=500 if style.font["weight"] == "medium" else style.font["weight"],
+            element=_number(style.element_fontsize),
+            number=_number(style.number_fontsize),
+            label=_number(style.label_fontsize),
+        )
+    ]
+
+    # Everything is written in the order the table draws it, starting from the back.
+    svg.append(
+        _stroke.format(
+            color=faded_black if bits.connectors_faded else black,
+            width=_number(style.connector_linewidth),
+            cap="square",
+            join="round",
+            d=layout["connectors"],
+        )
+    )
+    squares = layout["squares"]
+    svg.append(
+        _fill.format(color="white", extra=' fill-opacity="0.5"', d="".join(squares))
+    )
+
+    # The fills of one color are all merged into one path. Faded fills have their
+    # own color.
+    for source, fills in zip(geometry.sources, layout["fills"]):
+        for faded in [False, True]:
+            d = "".join(
+                fill
+                for idx, fill in fills
+                if shown[source][idx] and faded_list[idx] == faded
+            )
+            if len(d) > 0:
+                svg.append(
+                    _fill.format(color=_color(colors[source], faded), extra="", d=d)
+                )
+
+    label_text = []
+    for label, (box, outline, x, y) in layout["labels"].items():
+        label_bits = bits.label(label)
+        if not label_bits & table_state.LABEL_SHOWN:
+            continue
+        faded = label_bits & table_state.LABEL_FADED
+        svg.append(_fill.format(color=_color(colors[label], faded), extra="", d=box))
+        svg.append(
+            _stroke.format(
+                color=faded_black if faded else black,
+                width=_number(style.label_linewidth),
+                cap="square",
+                join="round",
+                d=outline,
+            )
+        )
+        # the text goes on top of everything, so it is written later
+        label_text.append(
+            ("l", x, y, labels[label], faded,
+             label_bits & table_state.LABEL_HIGHLIGHT,
+             style.label_highlight_linewidth)
+        )  # fmt: skip
+
+    # Faded boxes are drawn underneath the others, as the table does
+    for faded in [True, False]:
+        d = "".join(square for square, f in zip(squares, faded_list) if f == faded)
+        if len(d) > 0:
+            svg.append(
+                _stroke.format(
+                    color=faded_black if faded else black,
+                    width=_number(style.element_linewidth),
+                    cap="square",
+                    join="miter",
+                    d=d,
+                )
+            )
+
+    text = []
+    for (number, symbol, *_), (x, y_name, y_number), faded, highlighted in zip(
+        catalog.elements, layout["text"], faded_list, bits.highlighted.tolist()
+    ):
+        text.append(
+            ("e", x, y_name, symbol, faded, highlighted,
+             style.element_highlight_linewidth)
+        )  # fmt: skip
+        text.append(("n", x, y_number, number, faded, False, 0))
+    for cls, x, y, string, faded, highlighted, linewidth in text + label_text:
+        if highlighted:
+            template = _text_highlight
+        else:
+            template = _text
+        svg.append(
+            template.format(
+                cls=cls,
+                x=x,
+                y=y,
+                color=faded_black if faded else black,
+                width=_number(linewidth),
+                text=escape(str(string)),
+            )
+        )
+
+    svg.append(_footer)
+    return "".join(svg)
@@ -0,0 +1,210 @@
+import numpy as np
+from matplotlib.collections import PathCollection
+from matplotlib.path import Path
+from matplotlib.textpath import TextPath, TextToPath
+from matplotlib.transforms import IdentityTransform
+
+from .batched import BatchedCollection
+
+# Cache of the outlines of all strings that have been drawn. The keys are the string,
+# font properties, and font size.
+_glyph_paths = dict()
+_text_to_path = TextToPath()
+
+
+def glyph_path(text, fontproperties, fontsize):
+    """
+    Get the outline of a string, centered on the origin.
+
+    The path is in units of points, and is aligned the same way as matplotlib aligns
+    text with horizontalalignment="center" and verticalalignment="center". Paths are
+    cached, so each distinct string is only laid out once.
+
+    :param text: String to get the outline of.
+    :param fontproperties: Matplotlib FontProperties of the font to use.
+    :param fontsize: Font size in points.
+    :return: Outline of the text.
+    :rtype: matplotlib.path.Path
+    """
+    key = (text, fontproperties, fontsize)
+    try:
+        return _glyph_paths[key]
+    except KeyError:
+        pass
+
+    prop = fontproperties.copy()
+    prop.set_size(fontsize)
+    # matplotlib centers text using the layout box of the line, which is at least
+    # as tall as the letters "lp", rather than using the extent of the glyphs.
+    width, height, descent = _text_to_path.get_text_width_height_descent(
+        text, prop, ismath=False
+    )
+    _, height_lp, descent_lp = _text_to_path.get_text_width_height_descent(
+        "lp", prop, ismath=False
+    )
+    height = max(height, height_lp)
+    descent = max(descent, descent_lp)
+
+    outline = TextPath((0, 0), text, size=fontsize, prop=prop)
+    offset = np.array([-width / 2.0, descent - height / 2.0])
+    _glyph_paths[key] = Path(outline.vertices + offset, outline.codes)
+    return _glyph_paths[key]
+
+
+class GlyphCollection(BatchedCollection):
+    """
+    Collection of strings drawn as their glyph outlines.
+
+    Drawing the outlines as one collection avoids laying out each text object every
+    time the figure is drawn. Each string can be faded or hidden, since this is a
+    `BatchedCollection`.
+    """
+
+    def __init__(self, ax, fontproperties, color_attr="facecolor", **kwargs):
+        """
+        Initialize the collection and add it to an axis. It will start empty.
+
+        :param ax: Axis to add the text to.
+        :param fontproperties: Matplotlib FontProperties used for all text.
+        :param color_attr: Which color of the outlines to use for the text color.
+                           Use "edgecolor" to draw only the stroke around the text.
+        :param kwargs: Additional keyword arguments passed to the PathCollection.
+        """
+        self.fontproperties = fontproperties
+        # The paths and positions of all strings, including hidden ones
+        self._paths = []
+        self._offsets = []
+        # The paths are in points, so we use the sizes to have matplotlib scale them
+        # by the figure's dpi at draw time. Glyphs made of only horizontal and
+        # vertical lines (like "H") would be snapped to the pixel grid, which makes
+        # them disappear at low resolution, so snapping is turned off.
+        collection = PathCollection(
+            [],
+            sizes=[1],
+            snap=False,
+            offsets=np.empty((0, 2)),
+            offset_transform=ax.transData,
+            transform=IdentityTransform(),
+            **kwargs
+        )
+        ax.add_collection(collection, autolim=False)
+        super(GlyphCollection, self).__init__(collection, [], color_attr)
+
+    def add_text(self, x, y, text, fontsize, color):
+        """
+        Add a string to the collection
+
+        :param x: X position of the center of the text in data coordinates.
+        :param y: Y position of the center of the text in data coordinates.
+        :param text: String to add.
+        :param fontsize: Font size in points.
+        :param color: Color of the text.
+        :return: Object that can fade or hide this string.
+        :rtype: BatchedItem
+        """
+        self._paths.append(glyph_path(str(text), self.fontproperties, fontsize))
+        self._offsets.append((x, y))
+        return self.add(color)
+
+    def _update(self):
+        """
+        Push the strings that are not hidden to the collection, with their colors.
+
+        Hidden strings are left out entirely rather than made transparent, since they
+        would otherwise still take time to draw.
+
+        :return: None
+        """
+        visible = np.flatnonzero(~self.hidden)
+        self.collection.set_paths([self._paths[idx] for idx in visible])
+        self.collection.set_offsets(np.reshape(self._offsets, (-1, 2))[visible])
+        self._set_color_base(self._colors()[visible])
+
+
+class TextLayers(object):
+    """
+    All the text on the table, drawn as a few glyph collections.
+
+    Highlighted text is white with a dark outline. Rather than use a path effect,
+    which is recalculated every time the figure is drawn, the outline is its own
+    collection that is drawn underneath the white text.
+    """
+
+    def __init__(self, ax, fontproperties, zorder=100):
+        """
+        Initialize the collections
+
+        :param ax: Axis to add the text to.
+        :param fontproperties: Matplotlib FontProperties used for all text.
+        :param zorder: zorder of all the text.
+        """
+        self.ax = ax
+        self.fontproperties = fontproperties
+        self.zorder = zorder
+        # We make one collection for each outline width, the first time that width is
+        # used. See `_stroke`.
+        self.strokes = dict()
+        self.highlight = GlyphCollection(ax, fontproperties, lw=0, zorder=zorder)
+        self.plain = GlyphCollection(ax, fontproperties, lw=0, zorder=zorder)
+
+    def collections(self):
+        """
+        Get all the matplotlib collections used to draw the text.
+
+        :return: List of collections
+        :rtype: list
+        """
+        layers = list(self.strokes.values()) + [self.highlight, self.plain]
+        return [layer.collection for layer in layers]
+
+    def _stroke(self, linewidth):
+        """
+        Get the collection holding the text outlines of a given width.
+
+        :param linewidth: Width of the outlines in points.
+        :return: Collection for outlines of this width.
+        :rtype: GlyphCollection
+        """
+        if linewidth not in self.strokes:
+            self.strokes[linewidth] = GlyphCollection(
+                self.ax,
+                self.fontproperties,
+                "edgecolor",
+                facecolors="none",
+                lw=linewidth,
+                # The outlines need to be drawn underneath the highlighted text
+                zorder=self.zorder - 0.1,
+            )
+        return self.strokes[linewidth]
+
+    def add_text(self, x, y, text, fontsize, color):
+        """
+        Add plain text
+
+        :param x: X position of the center of the text in data coordinates.
+        :param y: Y position of the center of the text in data coordinates.
+        :param text: String to add.
+        :param fontsize: Font size in points.
+        :param color: Color of the text.
+        :return: Object that can fade or hide this string.
+        :rtype: BatchedItem
+        """
+        return self.plain.add_text(x, y, text, fontsize, color)
+
+    def add_highlight_text(self, x, y, text, fontsize, color, stroke_color, linewidth):
+        """
+        Add highlighted text, which has an outline of a different color.
+
+        :param x: X position of the center of the text in data coordinates.
+        :param y: Y position of the center of the text in data coordinates.
+        :param text: String to add.
+        :param fontsize: Font size in points.
+        :param color: Color of the text.
+        :param stroke_color: Color of the outline.
+        :param linewidth: Width of the outline in points.
+        :return: Objects that can fade or hide the text and the outline.
+        :rtype: tuple of BatchedItem
+        """
+        stroke = self._stroke(linewidth).add_text(x, y, text, fontsize, stroke_color)
+        text = self.highlight.add_text(x, y, text, fontsize, color)
+        return text, stroke
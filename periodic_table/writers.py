@@ -0,0 +1,359 @@
+"""
+Write the frames of an animation to a file one at a time, as they are made.
+
+Each writer only keeps the frame before the current one, so the memory used is the
+same however long the animation is. Frames are written with `write` and the file
+is finished with `close`, or by using the writer in a `with` block:
+
+    with open_writer("animation.gif", fps=10) as writer:
+        for frame in frames:
+            writer.write(frame)
+
+Frames are arrays of RGB or RGBA pixels, like those of `PeriodicTable.to_array`.
+Transparent pixels are put on a white background, since none of the formats
+written here handle transparency well.
+
+GIF and APNG frames only store the part of the image that changed from the
+frame before, which keeps the files small when only part of the table changes.
+"""
+
+from abc import ABC, abstractmethod
+import os
+import shutil
+import struct
+import subprocess
+import zlib
+
+import numpy as np
+
+
+def on_white(frame):
+    """
+    Put a frame onto a white background.
+
+    :param frame: Array of RGB or RGBA pixels, with shape (height, width, 3 or 4).
+    :return: Array of RGB pixels. RGB frames are returned as they are.
+    :rtype: np.ndarray
+    """
+    frame = np.asarray(frame)
+    if frame.shape[-1] == 3:
+        return frame
+    # This is done in integers, which gives the same rounding as floats, since it
+    # is done for every frame of long animations.
+    alpha = frame[..., 3:].astype(np.uint16)
+    rgb = frame[..., :3] * alpha + 255 * (255 - alpha)
+    return ((rgb + 127) // 255).astype(np.uint8)
+
+
+def _changed_box(frame, previous):
+    """
+    Find the smallest rectangle holding every pixel that differs between frames.
+
+    :param frame: RGB array of the new frame.
+    :param previous: RGB array of the frame before, or None for the first frame.
+    :return: Top, bottom, left, and right of the rectangle, as slice bounds. When
+             nothing changed this is a single pixel, since every frame has to draw
+             something.
+    :rtype: tuple
+    """
+    if previous is None:
+        return 0, frame.shape[0], 0, frame.shape[1]
+    changed = np.any(frame != previous, axis=2)
+    rows = np.flatnonzero(np.any(changed, axis=1))
+    if len(rows) == 0:
+        return 0, 1, 0, 1
+    cols = np.flatnonzero(np.any(changed, axis=0))
+    return rows[0], rows[-1] + 1, cols[0], cols[-1] + 1
+
+
+class FrameWriter(ABC):
+    """
+    Base class of the writers, which handles the frames and the `with` block.
+    """
+
+    def __init__(self, savename, fps):
+        """
+        :param savename: Path to save the animation to.
+        :param fps: Frames per second.
+        """
+        if fps <= 0:
+            raise ValueError("fps must be positive.")
+        self.savename = savename
+        self.fps = fps
+        self.frames = 0
+        self.size = None
+        self._previous = None
+
+    def write(self, frame):
+        """
+        Add a frame to the end of the animation.
+
+        :param frame: Array of RGB or RGBA pixels. All frames must be the same size.
+        :return: None
+        """
+        frame = on_white(frame)
+        if self.size is None:
+            self.size = frame.shape[:2]
+        elif frame.shape[:2] != self.size:
+            raise ValueError(
+                "Frames must all be {} pixels, not {}.".format(
+                    self.size, frame.shape[:2]
+                )
+            )
+        self._write(frame)
+        # The frame may be a view of a buffer that is drawn over for the next frame
+        self._previous = np.array(frame)
+        self.frames += 1
+
+    @abstractmethod
+    def _write(self, frame):
+        """
+        Write a frame to the file.
+
+        :param frame: Array of RGB pixels, the same size as the frames before.
+        :return: None
+        """
+
+    @abstractmethod
+    def close(self):
+        """
+        Finish the file. Closing it again does nothing.
+
+        :return: None
+        :raises ValueError: If no frames were written, since it would not be a valid
+                            animation. Any file that was opened for them is removed.
+        """
+
+    def _remove_empty(self, file):
+        """
+        Remove the file of an animation that has no frames.
+
+        :param file: The open file.
+        :raises ValueError: Always.
+        """
+        file.close()
+        os.remove(self.savename)
+        raise ValueError("No frames were written to {}.".format(self.savename))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            self.close()
+        except ValueError:
+            # don't hide the error that stopped the frames from being written
+            if exc_type is None:
+                raise
+
+
+class GifWriter(FrameWriter):
+    """
+    Writes GIFs, with a palette chosen for each frame.
+    """
+
+    def __init__(self, savename, fps, loop=0):
+        """
+        :param savename: Path to save the animation to.
+        :param fps: Frames per second.
+        :param loop: Number of times to repeat the animation, where 0 is forever.
+        """
+        super(GifWriter, self).__init__(savename, fps)
+        self.loop = loop
+        self._file = open(savename, "wb")
+
+    def _write(self, frame):
+        from PIL import GifImagePlugin, Image
+
+        top, bottom, left, right = _changed_box(frame, self._previous)
+        image = Image.fromarray(frame[top:bottom, left:right]).convert(
+            "P", palette=Image.Palette.ADAPTIVE
+        )
+        # each frame is left in place for the next one to draw over
+        params = {"duration": 1000.0 / self.fps, "disposal": 1}
+        if self._previous is None:
+            header, _ = GifImagePlugin.getheader(
+                image, info=dict(params, loop=self.loop)
+            )
+            self._file.write(b"".join(header))
+        else:
+            params["include_color_table"] = True
+        for data in GifImagePlugin.getdata(image, (left, top), **params):
+            self._file.write(data)
+
+    def close(self):
+        if self._file.closed:
+            return
+        if self.frames == 0:
+            self._remove_empty(self._file)
+        self._file.write(b";")
+        self._file.close()
+
+
+class ApngWriter(FrameWriter):
+    """
+    Writes animated PNGs, which unlike GIFs have every color of every frame.
+    """
+
+    def __init__(self, savename, fps, loop=0, compress_level=6):
+        """
+        :param savename: Path to save the animation to.
+        :param fps: Frames per second.
+        :param loop: Number of times to repeat the animation, where 0 is forever.
+        :param compress_level: zlib compression level, from 0 to 9.
+        """
+        super(ApngWriter, self).__init__(savename, fps)
+        self.loop = loop
+        self.compress_level = compress_level
+        self._file = open(savename, "wb")
+        self._sequence = 0
+        self._actl_offset = None
+
+    def _chunk(self, kind, data):
+        """
+        Write a PNG chunk.
+
+        :param kind: Four byte chunk type.
+        :param data: Contents of the chunk.
+        :return: None
+        """
+        self._file.write(struct.pack(">I", len(data)) + kind + data)
+        self._file.write(struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF))
+
+    def _write(self, frame):
+        height, width = frame.shape[:2]
+        if self._previous is None:
+            self._file.write(b"\x89PNG\r\n\x1a\n")
+            # 8 bit RGB, no interlacing
+            self._chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+            # The number of frames is only known at the end, see `close`
+            self._actl_offset = self._file.tell()
+            self._chunk(b"acTL", struct.pack(">II", 0, self.loop))
+
+        top, bottom, left, right = _changed_box(frame, self._previous)
+        region = frame[top:bottom, left:right]
+        # the delay is a fraction of a second, as two 16 bit integers
+        if self.fps == int(self.fps):
+            delay = (1, int(self.fps))
+        else:
+            delay = (int(round(1000.0 / self.fps)), 1000)
+        self._chunk(
+            b"fcTL",
+            struct.pack(
+                ">IIIIIHHBB",
+                self._sequence,
+                region.shape[1],
+                region.shape[0],
+                left,
+                top,
+                delay[0],
+                delay[1],
+                0,  # leave the frame in place for the next one
+                0,  # replace the pixels of the region, rather than blending
+            ),
+        )
+        self._sequence += 1
+
+        data = zlib.compress(_filter_rows(region), self.compress_level)
+        if self._previous is None:
+            self._chunk(b"IDAT", data)
+        else:
+            self._chunk(b"fdAT", struct.pack(">I", self._sequence) + data)
+            self._sequence += 1
+
+    def close(self):
+        if self._file.closed:
+            return
+        if self.frames == 0:
+            self._remove_empty(self._file)
+        self._chunk(b"IEND", b"")
+        if self._actl_offset is not None:
+            self._file.seek(self._actl_offset)
+            self._chunk(b"acTL", struct.pack(">II", self.frames, self.loop))
+        self._file.close()
+
+
+def _filter_rows(pixels):
+    """
+    Get the scanlines of an image in the form PNG compresses.
+
+    Each row is stored as its difference from the row above (PNG's "up" filter),
+    which compresses the flat areas of the table well and is quick to calculate.
+
+    :param pixels: Array of RGB pixels.
+    :return: The filtered scanlines, each starting with its filter type.
+    :rtype: bytes
+    """
+    rows = pixels.reshape(pixels.shape[0], -1)
+    filtered = np.empty((rows.shape[0], rows.shape[1] + 1), dtype=np.uint8)
+    filtered[:, 0] = 2
+    filtered[0, 1:] = rows[0]
+    # uint8 arithmetic wraps around, as the filter needs
+    np.subtract(rows[1:], rows[:-1], out=filtered[1:, 1:])
+    return filtered.tobytes()
+
+
+class FfmpegWriter(FrameWriter):
+    """
+    Writes MP4s by piping the frames to ffmpeg, which must be installed.
+    """
+
+    def __init__(self, savename, fps):
+        """
+        :param savename: Path to save the animation to.
+        :param fps: Frames per second.
+        """
+        if shutil.which("ffmpeg") is None:
+            raise RuntimeError("ffmpeg is needed to save MP4s.")
+        super(FfmpegWriter, self).__init__(savename, fps)
+        self._ffmpeg = None
+        self._closed = False
+
+    def _write(self, frame):
+        if self._ffmpeg is None:
+            height, width = frame.shape[:2]
+            # the sizes need to be even for the h264 encoder
+            command = [
+                "ffmpeg", "-y", "-loglevel", "error",
+                "-f", "rawvideo", "-pix_fmt", "rgb24",
+                "-s", "{}x{}".format(width, height), "-r", str(self.fps), "-i", "-",
+                "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2",
+                "-c:v", "libx264", "-pix_fmt", "yuv420p", self.savename,
+            ]  # fmt: skip
+            self._ffmpeg = subprocess.Popen(command, stdin=subprocess.PIPE)
+        self._ffmpeg.stdin.write(np.ascontiguousarray(frame).tobytes())
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        if self._ffmpeg is None:
+            # ffmpeg is started by the first frame, so there is no file to remove
+            raise ValueError("No frames were written to {}.".format(self.savename))
+        self._ffmpeg.stdin.close()
+        if self._ffmpeg.wait() != 0:
+            raise RuntimeError("ffmpeg failed to save the animation.")
+
+
+_writers = {
+    ".gif": GifWriter,
+    ".png": ApngWriter,
+    ".apng": ApngWriter,
+    ".mp4": FfmpegWriter,
+}
+
+
+def open_writer(savename, fps):
+    """
+    Start writing an animation, in the format given by the file extension.
+
+    :param savename: Path to save the animation to. The extension must be ".gif",
+                     ".png" or ".apng" (for an animated PNG), or ".mp4".
+    :param fps: Frames per second.
+    :return: The writer.
+    :rtype: FrameWriter
+    """
+    extension = os.path.splitext(savename)[1].lower()
+    if extension not in _writers:
+        raise ValueError("Animations can only be saved as .gif, .png, .apng, or .mp4")
+    return _writers[extension](savename, fps)
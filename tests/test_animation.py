@@ -0,0 +1,133 @@
+import io
+
+from PIL import Image
+import numpy as np
+
+import pytest
+
+import periodic_table
+from periodic_table import catalog, datasets, query
+from periodic_table.animation import (
+    _draw,
+    evolution_frames,
+    fraction_series,
+    render_frames,
+    save_animation,
+    save_evolution,
+    stream_frames,
+)
+
+
+def test_render_frames_in_order(tmp_path):
+    states = [{}, {"sources": ["bb"]}, {}, {"sources": ["bb"], "highlight": "bb"}]
+    frames = render_frames(states, dpi=10, processes=2)
+    assert len(frames) == 4
+    frames = [np.asarray(Image.open(io.BytesIO(frame))) for frame in frames]
+    assert frames[0].shape == (120, 200, 3)
+    # identical states give identical frames, different ones don't
+    assert np.array_equal(frames[0], frames[2])
+    assert not np.array_equal(frames[0], frames[1])
+
+    savename = str(tmp_path / "animation.gif")
+    save_animation(states, savename, dpi=10, processes=1)
+    assert Image.open(savename).n_frames == 4
+
+
+def test_render_frames_selection_states():
+    # isolating by a selection, an array or symbols looks the same
+    selection = query.select(query.frac("r") > 0.5)
+    numbers = np.array(selection.numbers)
+    states = [
+        {"sources": ["r"], "isolate": selection},
+        {"sources": ["r"], "isolate": numbers},
+        {"sources": ["r"], "isolate": list(selection)},
+        {"sources": ["r"]},
+    ]
+    frames = render_frames(states, dpi=10, processes=1)
+    assert frames[0] == frames[1] == frames[2]
+    assert frames[0] != frames[3]
+
+    streamed = [np.array(frame) for frame in stream_frames(states, dpi=10)]
+    assert np.array_equal(streamed[0], streamed[2])
+    assert not np.array_equal(streamed[0], streamed[3])
+
+
+def _changed_fractions():
+    fracs = np.array(catalog.fractions)
+    th, fe = catalog.index("Th"), catalog.index("Fe")
+    # Th gets a source it had no fill for
+    fracs[th, catalog.source_idx["r"]] = 0.3
+    fracs[th, catalog.source_idx["snii"]] = 0.7
+    fracs[fe] = 0
+    fracs[fe, catalog.source_idx["snia"]] = 1
+    return fracs
+
+
+def test_fraction_series():
+    keyframes = np.stack([catalog.fractions, _changed_fractions()])
+    frames = list(fraction_series(keyframes, n_frames=5))
+    assert len(frames) == 5
+    assert np.allclose(frames[0], keyframes[0])
+    assert np.allclose(frames[2], keyframes.mean(axis=0))
+    assert np.allclose(frames[-1], keyframes[1])
+
+    # uneven keyframes
+    frames = list(fraction_series(keyframes[[0, 1, 1]], 5, key_times=[0, 1, 4]))
+    assert np.allclose(frames[1], keyframes[1])
+
+    bad = np.array(keyframes)
+    bad[1, 0, 0] = 2
+    with pytest.raises(ValueError, match="Keyframe 1"):
+        fraction_series(bad)
+
+    # Eu going from r and s to SNII would have three sources in between
+    eu = catalog.index("Eu")
+    bad = np.array(keyframes)
+    bad[1, eu] = 0
+    bad[1, eu, catalog.source_idx["snii"]] = 1
+    with pytest.raises(ValueError, match="keyframes 0 and 1") as error:
+        fraction_series(bad)
+    assert "Eu: has 3 sources" in str(error.value)
+    # passing through a keyframe with only one of them is fine
+    between = np.array(bad[1])
+    between[eu] = 0
+    between[eu, catalog.source_idx["r"]] = 1
+    frames = list(fraction_series([bad[0], between, bad[1]], n_frames=9))
+    assert np.allclose(frames[-1], bad[1])
+
+
+def test_changed_fractions_match_new_table():
+    state = {"sources": catalog.sources, "highlight": "snii", "isolate": ["Th", "O"]}
+    fracs = _changed_fractions()
+    expected = periodic_table.PeriodicTable(dataset=datasets.Dataset(fracs))
+    table = periodic_table.PeriodicTable()
+    for t in [expected, table]:
+        t.get_figure().set_dpi(20)
+        t.set_state(state)
+
+    fills = {source: fill.collection for source, fill in table._fills.items()}
+    frames = list(evolution_frames(table, [fracs]))
+    # the fills were moved, not made again
+    assert fills == {source: fill.collection for source, fill in table._fills.items()}
+    assert table.elts[catalog.index("Th")].highlight
+    assert np.array_equal(frames[0], _draw(expected))
+
+
+def test_save_evolution(tmp_path):
+    savename = str(tmp_path / "evolution.gif")
+    keyframes = np.stack([catalog.fractions, _changed_fractions()])
+    save_evolution(keyframes, savename, n_frames=3, dpi=10)
+    assert Image.open(savename).n_frames == 3
+
+
+def test_evolution_frames_checked():
+    table = periodic_table.PeriodicTable()
+    table.get_figure().set_dpi(10)
+    bad = _changed_fractions()
+    bad[catalog.index("Fe"), catalog.source_idx["snii"]] = 0.5
+    frames = evolution_frames(table, [_changed_fractions(), bad])
+    next(frames)
+    with pytest.raises(ValueError, match="Fe: fractions sum to 1.5"):
+        next(frames)
+    # the invalid frame changed nothing
+    assert np.array_equal(table._fractions, _changed_fractions())
@@ -0,0 +1,44 @@
+from matplotlib.collections import PolyCollection
+from matplotlib import colors as mpl_colors
+import betterplotlib as bpl
+import numpy as np
+
+from periodic_table.batched import BatchedCollection
+
+
+def make_batch():
+    squares = [[(i, 0), (i + 1, 0), (i + 1, 1), (i, 1)] for i in range(3)]
+    collection = PolyCollection(squares)
+    return BatchedCollection(collection, ["red", "green", "blue"])
+
+
+def test_hide_and_unhide():
+    batch = make_batch()
+    item = batch.item(1)
+    item.hide()
+    assert item.hidden
+    assert np.allclose(batch.collection.get_facecolor()[:, 3], [1, 0, 1])
+    item.unhide()
+    assert np.allclose(batch.collection.get_facecolor()[:, 3], [1, 1, 1])
+
+
+def test_fade_only_changes_member():
+    batch = make_batch()
+    batch.item(2).fade()
+    facecolors = batch.collection.get_facecolor()
+    assert np.allclose(facecolors[0], mpl_colors.to_rgba("red"))
+    assert np.allclose(facecolors[2], mpl_colors.to_rgba(bpl.fade_color("blue")))
+    batch.item(2).unfade()
+    assert np.allclose(batch.collection.get_facecolor()[2], mpl_colors.to_rgba("blue"))
+
+
+def test_set_color_while_faded():
+    batch = make_batch()
+    item = batch.item(0)
+    item.fade()
+    item.set_color("black")
+    assert np.allclose(
+        batch.collection.get_facecolor()[0], mpl_colors.to_rgba(bpl.fade_color("black"))
+    )
+    item.unfade()
+    assert np.allclose(batch.collection.get_facecolor()[0], mpl_colors.to_rgba("black"))
@@ -0,0 +1,49 @@
+from periodic_table import benchmark
+
+
+def test_compare():
+    baseline = {
+        "a": {"median_s": 1.0, "min_s": 1.0, "peak_bytes": 100},
+        "b": {"median_s": 1.0, "min_s": 1.0, "peak_bytes": 100},
+    }
+    results = {
+        "a": {"median_s": 1.2, "min_s": 1.0, "peak_bytes": 100},
+        "b": {"median_s": 1.0, "min_s": 1.0, "peak_bytes": 200},
+        "c": {"median_s": 5.0, "min_s": 5.0, "peak_bytes": 500},
+    }
+    assert benchmark.compare(results, baseline, tolerance=0.25) == [
+        "b: memory went from 100 bytes to 200 bytes (+100%)"
+    ]
+    regressions = benchmark.compare(results, baseline, 0.1, memory_tolerance=1.5)
+    assert len(regressions) == 1 and regressions[0].startswith("a: time")
+
+
+def test_run_and_store(tmp_path):
+    path = str(tmp_path / "results.json")
+    assert benchmark.find_baseline(benchmark.load_runs(path)) is None
+
+    results = benchmark.run(["fill_all_elements", "highlight_source"], repeat=1)
+    assert set(results) == {"fill_all_elements", "highlight_source"}
+    assert results["fill_all_elements"]["peak_bytes"] > 0
+    benchmark.save_run(path, results)
+    assert benchmark.find_baseline(benchmark.load_runs(path)) == results
+
+    # a run that is much slower than the stored one fails
+    slower = {name: dict(r, median_s=r["median_s"] * 10) for name, r in results.items()}
+    assert len(benchmark.compare(slower, results)) == 2
+
+
+def test_main(tmp_path):
+    path = str(tmp_path / "results.json")
+    args = ["fill_all_elements", "--repeat", "1", "--results", path]
+    assert benchmark.main(args) == 0
+    # nothing can be this much faster than before
+    assert benchmark.main(args + ["--tolerance", "-1"]) == 1
+    assert len(benchmark.load_runs(path)) == 2
+
+
+def test_interactive_benchmarks():
+    names = [name for name in benchmark.benchmarks() if name.startswith("interactive")]
+    assert "interactive_click" in names
+    results = benchmark.run(names, repeat=1)
+    assert all(result["median_s"] > 0 for result in results.values())
@@ -0,0 +1,132 @@
+import os
+
+import pytest
+
+import periodic_table
+from periodic_table.cache import RenderCache, state_hash
+from periodic_table.query import select
+from periodic_table.serve import table_config
+
+
+def test_state_hash_canonical():
+    table = periodic_table.PeriodicTable()
+    base = table.state_hash()
+    table.show_source("r", "snii")
+    shown = table.state_hash()
+    assert shown != base
+
+    other = periodic_table.PeriodicTable()
+    other.show_source("snii", "r")
+    assert other.state_hash() == shown
+    assert other.state_hash("svg") != shown
+    assert other.state_hash(dpi=50) != shown
+
+    table.isolate_elt("Au", "Fe")
+    other.isolate_elt("Fe", "Au")
+    assert table.state_hash() == other.state_hash()
+
+
+def test_state_hash_equivalent_states():
+    config = table_config()
+    same = [
+        {"sources": ["low mass", "R"], "highlight": "Low Mass"},
+        {"sources": ["r", "agb", "s", "r"], "highlight": "low mass"},
+        {"sources": ["s", "agb", "r"], "highlight": "LOW MASS", "isolate_label": True},
+    ]
+    hashes = {state_hash(state, config, "png", 10) for state in same}
+    assert len(hashes) == 1
+    isolated = [
+        {"sources": ["r"], "isolate": ["Au", "Fe"]},
+        {"sources": ["r"], "isolate": [26, "Au", 79]},
+        {"sources": ["r"], "isolate": [select(number=[26, 79])]},
+    ]
+    hashes = {state_hash(state, config, "png", 10) for state in isolated}
+    assert len(hashes) == 1
+
+    # The S and AGB sources share a label, but highlight different elements
+    highlights = ["s", "agb", "low mass"]
+    states = [{"sources": ["s", "agb"], "highlight": h} for h in highlights]
+    hashes = {state_hash(state, config, "png", 10) for state in states}
+    assert len(hashes) == 3
+
+
+def test_state_hash_includes_theme():
+    plain = periodic_table.PeriodicTable()
+    relabeled = periodic_table.PeriodicTable(label_r="r-process")
+    recolored = periodic_table.PeriodicTable(color_r="red")
+    hashes = {plain.state_hash(), relabeled.state_hash(), recolored.state_hash()}
+    assert len(hashes) == 3
+
+
+def test_render_cache_hits():
+    table = periodic_table.PeriodicTable()
+    cache = RenderCache()
+    first = cache.render(table, dpi=10)
+    assert (cache.hits, cache.misses) == (0, 1)
+    assert first[:8] == b"\x89PNG\r\n\x1a\n"
+    assert cache.render(table, dpi=10) is first
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    table.show_source("bb")
+    cache.render(table, dpi=10)
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert len(cache) == 2
+
+
+def test_render_cache_lru():
+    cache = RenderCache(max_bytes=10)
+    cache.put("a", b"1234")
+    cache.put("b", b"1234")
+    cache.get("a")  # now "b" is the least recently used
+    cache.put("c", b"1234")
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1234"
+    assert cache.nbytes == 8
+    # too big to hold at all
+    cache.put("d", b"12345678901")
+    assert "d" not in cache
+
+
+def test_render_cache_disk(tmp_path):
+    # keys are SHA-256 hex digests
+    a, b, c = "a" * 64, "b" * 64, "c" * 64
+    cache = RenderCache(max_bytes=100, directory=str(tmp_path), max_disk_bytes=10)
+    cache.put(a, b"1234")
+    cache.put(b, b"1234")
+    # file times can be coarse, so make sure b is the oldest
+    os.utime(str(tmp_path / b), (0, 0))
+
+    # a new cache on the same directory can use the renders
+    other = RenderCache(directory=str(tmp_path))
+    assert other.get(a) == b"1234"
+
+    cache.put(c, b"1234")
+    assert sorted(p.name for p in tmp_path.iterdir()) == [a, c]
+
+    cache.clear()
+    assert len(cache) == 0
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_render_cache_keeps_other_files(tmp_path):
+    # other files in the directory are old, and bigger than the limit
+    other = tmp_path / "index.html"
+    other.write_bytes(b"x" * 100)
+    os.utime(str(other), (0, 0))
+    cache = RenderCache(max_bytes=100, directory=str(tmp_path), max_disk_bytes=10)
+    cache.put("a" * 64, b"1234")
+    cache.put("b" * 64, b"1234")
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "a" * 64,
+        "b" * 64,
+        "index.html",
+    ]
+
+    cache.clear()
+    assert [p.name for p in tmp_path.iterdir()] == ["index.html"]
+    assert other.read_bytes() == b"x" * 100
+
+
+def test_render_cache_bad_size():
+    with pytest.raises(ValueError):
+        RenderCache(max_bytes=-1)
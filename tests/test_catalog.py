@@ -0,0 +1,61 @@
+import subprocess
+import sys
+
+import pytest
+import numpy as np
+
+from periodic_table import catalog, get_fractions
+
+
+def test_fractions_sum_to_one():
+    for symbol in ["H", "He", "Li", "Au", "Og"]:
+        assert np.isclose(sum(get_fractions(symbol).values()), 1)
+
+
+def test_fractions_all_sources():
+    fracs = get_fractions("Eu")
+    assert set(fracs) == set(catalog.sources)
+    assert fracs["r"] == 0.94
+    assert fracs["bb"] == 0
+
+
+def test_unknown_element():
+    with pytest.raises(ValueError):
+        get_fractions("Xx")
+
+
+def test_import_does_not_load_plotting():
+    # run in a separate process, since other tests may have already imported these
+    code = (
+        "import sys, periodic_table\n"
+        "periodic_table.get_fractions('Au')\n"
+        "assert 'matplotlib' not in sys.modules\n"
+        "assert 'betterplotlib' not in sys.modules\n"
+    )
+    subprocess.check_call([sys.executable, "-c", code])
+
+
+def test_catalog_arrays():
+    idx = list(catalog.symbols).index("Au")
+    assert catalog.numbers[idx] == 79
+    assert catalog.periods[idx] == 6
+    assert catalog.periods[list(catalog.symbols).index("U")] == 7
+    assert get_fractions("Au") == dict(zip(catalog.sources, catalog.fractions[idx]))
+    with pytest.raises(ValueError):
+        catalog.fractions[idx, 0] = 1.0
+
+
+def test_primary():
+    low_mass = catalog.primary("low mass")
+    assert np.array_equal(low_mass, catalog.primary("s") | catalog.primary("agb"))
+    assert catalog.symbols[catalog.primary("bb")].tolist() == ["H", "He"]
+    with pytest.raises(ValueError):
+        catalog.primary("xx")
+
+
+def test_period_totals():
+    totals = catalog.period_totals()
+    # each element's fractions add to one
+    counts = np.bincount(catalog.periods)[1:]
+    assert np.allclose(totals.sum(axis=1), counts)
+    assert counts.tolist() == [2, 8, 8, 18, 18, 32, 32]
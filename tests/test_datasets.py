@@ -0,0 +1,124 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+import periodic_table
+from periodic_table import catalog, datasets, query
+
+
+def test_csv_round_trip(tmp_path):
+    path = str(tmp_path / "johnson.csv")
+    datasets.johnson2019.to_csv(path)
+    dataset = datasets.load(path, cache_dir=False)
+    assert dataset == datasets.johnson2019
+    assert dataset.get_fractions("Fe") == catalog.get_fractions("Fe")
+    assert np.array_equal(dataset.primary("r"), catalog.primary("r"))
+
+
+def test_json_formats():
+    records = [
+        dict(fracs, symbol=symbol) for _, symbol, _, _, fracs in catalog.elements
+    ]
+    by_symbol = {symbol: dict(fracs) for _, symbol, _, _, fracs in catalog.elements}
+    assert np.array_equal(datasets.parse_json(json.dumps(records)), catalog.fractions)
+    assert np.array_equal(datasets.parse_json(json.dumps(by_symbol)), catalog.fractions)
+
+
+def test_errors_name_every_row(tmp_path):
+    path = str(tmp_path / "bad.csv")
+    datasets.johnson2019.to_csv(path)
+    with open(path) as in_file:
+        lines = in_file.read().splitlines()
+    lines[26] = "26,Fe,,,0.42,0.68,,,,"  # sums to 1.1
+    lines[79] = "79,Au,x,,,,,,1,"
+    lines[92] = "92,Ux,,,,,,,,1"
+    lines.append("1,H,1,,,,,,,")
+    with open(path, "w") as out_file:
+        out_file.write("\n".join(lines))
+
+    with pytest.raises(ValueError) as error:
+        datasets.load(path, cache_dir=False)
+    message = str(error.value)
+    assert "line 27 (Fe): fractions sum to 1.1, not 1" in message
+    assert "line 80 (Au): bb is 'x'" in message
+    assert "line 93 (U): there is no element 'Ux'" in message
+    assert "line 120 (H): H is repeated" in message
+
+
+def test_missing_elements_and_columns():
+    with pytest.raises(ValueError, match="missing elements He, Li"):
+        datasets.parse_csv(
+            "symbol,bb\nH,1\n"
+            + "".join("{},1\n".format(s) for s in catalog.symbols[3:])
+        )
+    with pytest.raises(ValueError, match="unknown column 'mystery'"):
+        datasets.parse_csv("symbol,mystery\nH,1\n")
+
+
+def test_cache(tmp_path, monkeypatch):
+    path = str(tmp_path / "johnson.csv")
+    cache_dir = str(tmp_path / "cache")
+    datasets.johnson2019.to_csv(path)
+    datasets.load(path, cache_dir=cache_dir)
+    assert len(os.listdir(cache_dir)) == 1
+
+    # the second load comes from the cache without parsing the file
+    def fail(text):
+        raise AssertionError("parsed again")
+
+    monkeypatch.setattr(datasets, "parse_csv", fail)
+    assert datasets.load(path, cache_dir=cache_dir) == datasets.johnson2019
+
+    # but a changed file is parsed again
+    with open(path, "a") as out_file:
+        out_file.write("\n")
+    with pytest.raises(AssertionError):
+        datasets.load(path, cache_dir=cache_dir)
+
+
+def test_table_with_dataset():
+    fracs = np.array(catalog.fractions)
+    # move all of Eu's abundance to the s process
+    fracs[catalog.index("Eu")] = 0
+    fracs[catalog.index("Eu"), catalog.source_idx["s"]] = 1
+    dataset = datasets.Dataset(fracs, "test")
+
+    table = periodic_table.PeriodicTable(dataset=dataset)
+    default = periodic_table.PeriodicTable()
+    eu = catalog.index("Eu")
+    assert table.elts[eu].fracs["s"] == 1
+    assert default.elts[eu].fracs["r"] > 0.9
+    assert table.state_hash() != default.state_hash()
+
+    table.highlight_source("r")
+    assert not table.elts[eu].highlight
+    table.highlight_source("s")
+    assert table.elts[eu].highlight
+    assert table.to_svg() != default.to_svg()
+
+    with pytest.raises(ValueError, match="Eu: fractions sum to 2"):
+        fracs[eu, 0] = 1
+        datasets.Dataset(fracs)
+
+
+def test_select_with_dataset():
+    fracs = np.array(catalog.fractions)
+    fracs[catalog.index("Eu")] = 0
+    fracs[catalog.index("Eu"), catalog.source_idx["s"]] = 1
+    table = periodic_table.PeriodicTable(dataset=datasets.Dataset(fracs, "test"))
+
+    assert "Eu" in query.select(query.frac_r > 0.9)
+    assert "Eu" not in table.select(query.frac_r > 0.9)
+    assert "Eu" in table.select(query.frac_s > 0.9)
+    assert "Eu" in table.select(~(query.frac_r > 0.5) & query.primary("s"))
+    assert "Eu" in table.select(query.frac_s + query.frac_agb > 0.9, period=6)
+
+    table.isolate_elt(query.frac_r > 0.5)
+    assert "Eu" not in table.isolated
+    table.isolate_elt_label(query.frac("s+agb") == 1)
+    assert "Eu" in table.isolated
+    # selections given straight to the state are evaluated with the table's too
+    table.set_state(dict(table.get_state(), isolate=[query.frac_s == 1]))
+    assert not table.elts[catalog.index("Eu")].faded
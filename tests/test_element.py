@@ -4,6 +4,7 @@ from periodic_table.element import Element, box_fraction_line
 
 from scipy import integrate
 import numpy as np
+from matplotlib import colors as mpl_colors
 
 np.random.seed(0)
 
@@ -45,3 +46,98 @@ def test_fraction_line_zero():
     for frac in np.concatenate(([0, 1], np.random.uniform(0, 1, 100))):
         result = integrate.quad(integrand, 0, 1, args=(frac))[0]
         assert np.isclose(result, frac, rtol=0, atol=1e-6)
+
+
+def test_elements_view_catalog():
+    from periodic_table import catalog
+
+    idx = list(catalog.symbols).index("Fe")
+    elt = Element.from_catalog(idx)
+    assert elt.symbol == "Fe" and elt.number == 26
+    assert elt.fracs["snia"] == catalog.fractions[idx, catalog.source_idx["snia"]]
+    assert np.shares_memory(elt._fracs, catalog.fractions)
+    assert list(elt.fracs) == catalog.sources
+    assert elt.highlight_bool("snia")
+    assert not elt.highlight_bool("low mass")
+
+
+def test_compact_objects():
+    import betterplotlib as bpl
+    import periodic_table
+
+    table = periodic_table.PeriodicTable()
+    elt = table.elts[0]
+    label = table._labels["bb"]
+    for obj in [elt, elt.box_list[0], elt.ax_name, label, label.box]:
+        assert not hasattr(obj, "__dict__")
+
+    # the faded colors still match betterplotlib, including after the color changes
+    box = label.box
+    assert box.faded_color == bpl.fade_color(box.original_color)
+    box.fade()
+    box.set_color("#123456")
+    assert box.plot_item.get_facecolor()[:3] == pytest.approx(
+        mpl_colors.to_rgb(bpl.fade_color("#123456"))
+    )
+
+
+def test_shown_bits():
+    elt = Element.from_catalog(0)
+    elt.set_shown("bb", True)
+    elt.set_shown("r", True)
+    elt.set_shown("r", False)
+    assert [s for s, shown in elt.shown.items() if shown] == ["bb"]
+
+
+def test_set_fractions():
+    import periodic_table
+    from periodic_table import catalog, datasets
+
+    table = periodic_table.PeriodicTable()
+    table.set_state({"sources": catalog.sources, "highlight": "r"})
+    eu = table.elts[catalog.index("Eu")]
+    assert eu.highlight
+
+    report = table.set_fractions("Eu", s=0.9, r=0.1)
+    assert report["elements"] == ["Eu"]
+    assert table._fills["s"].collection in report["artists"]
+    assert eu.fracs["s"] == 0.9 and eu.fracs["r"] == 0.1
+    assert not eu.highlight
+    # setting the same fractions again changes nothing
+    assert table.set_fractions({"Eu": {"s": 0.9, "r": 0.1}}) == {
+        "elements": [],
+        "artists": [],
+    }
+
+    # bad fractions are all reported, and nothing is changed
+    with pytest.raises(ValueError) as error:
+        table.set_fractions(
+            {"Fe": {"snia": 0.5}, "Au": {"r": 0.5, "s": 0.3, "cr": 0.2}}
+        )
+    assert "Fe: fractions sum to 0.5" in str(error.value)
+    assert "Au: has 3 sources" in str(error.value)
+    assert table.elts[catalog.index("Fe")].fracs["snia"] == 0.68
+    with pytest.raises(ValueError):
+        table.set_fractions("Fe", nothing=1)
+    # so are the fractions of every element given at once
+    bad = np.array(catalog.fractions)
+    bad[catalog.index("Au"), catalog.source_idx["cr"]] = 0.1
+    with pytest.raises(ValueError, match="Au: has 3 sources"):
+        table.set_fractions(bad)
+    with pytest.raises(ValueError, match="shape"):
+        table.set_fractions(bad[:10])
+    assert table.elts[catalog.index("Au")].fracs["r"] == 0.94
+
+    # the table matches one made with the same fractions
+    fracs = np.array(catalog.fractions)
+    fracs[catalog.index("Eu")] = 0
+    fracs[catalog.index("Eu"), catalog.source_idx["s"]] = 0.9
+    fracs[catalog.index("Eu"), catalog.source_idx["r"]] = 0.1
+    expected = periodic_table.PeriodicTable(dataset=datasets.Dataset(fracs))
+    expected.set_state(table.get_state())
+    assert table.state_hash() == expected.state_hash()
+    assert table.to_svg() == expected.to_svg()
+
+    # the fractions of every element can be given at once
+    assert table.set_fractions(catalog.fractions)["elements"] == ["Eu"]
+    assert eu.fracs["r"] == 0.94
@@ -0,0 +1,35 @@
+import io
+
+import numpy as np
+from PIL import Image
+
+import periodic_table
+
+
+def test_array_matches_png():
+    table = periodic_table.PeriodicTable()
+    table.set_state({"sources": ["bb", "cr", "snii"], "highlight": "snii"})
+    png = np.asarray(Image.open(io.BytesIO(table.to_bytes("png", 20))))
+    array = table.to_array(20)
+    assert array.shape == (240, 400, 4)
+    assert np.array_equal(array, png)
+    assert table.to_bytes("pdf", 20).startswith(b"%PDF")
+
+
+def test_buffer_is_reused():
+    table = periodic_table.PeriodicTable()
+    buffer = table.to_buffer(10)
+    assert buffer.shape == (120, 200, 4)
+    renderer = table.get_figure().canvas.get_renderer()
+    # Renders at the same dpi draw into the same buffer, whatever the format
+    table.to_bytes("png", 10)
+    table.to_bytes("svg", 10)
+    array = table.to_array(10)
+    assert table.get_figure().canvas.get_renderer() is renderer
+    assert np.shares_memory(array, np.asarray(buffer))
+
+    # and the buffer is drawn over by the next render
+    before = array.copy()
+    table.show_all_sources()
+    table.to_buffer(10)
+    assert not np.array_equal(before, array)
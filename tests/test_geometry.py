@@ -0,0 +1,64 @@
+import pytest
+
+from periodic_table import geometry
+from periodic_table.element import box_fraction_line
+
+import numpy as np
+
+np.random.seed(0)
+
+
+def polygon_area(verts):
+    # shoelace formula, vectorized over all leading dimensions
+    xs = verts[..., 0]
+    ys = verts[..., 1]
+    return 0.5 * np.abs(
+        np.sum(xs * np.roll(ys, -1, axis=-1) - ys * np.roll(xs, -1, axis=-1), axis=-1)
+    )
+
+
+def test_intercepts_match_line():
+    fracs = np.concatenate(([0, 0.5, 1], np.random.uniform(0, 1, 100)))
+    intercepts = geometry.fraction_intercepts(fracs)
+    for frac, b in zip(fracs, intercepts):
+        line_func = box_fraction_line(frac)
+        for x in [0, 0.25, 0.5, 0.75, 1]:
+            assert np.isclose(line_func(x), np.clip(x + b, 0, 1))
+
+
+def test_intercepts_out_of_range():
+    with pytest.raises(ValueError):
+        geometry.fraction_intercepts([0.5, -0.1])
+    with pytest.raises(ValueError):
+        geometry.fraction_intercepts([1.1])
+
+
+def test_region_area():
+    lower = np.random.uniform(0, 1, 1000)
+    upper = np.random.uniform(lower, 1)
+    verts = geometry.region_vertices(lower, upper)
+    assert verts.shape == (1000, 6, 2)
+    assert np.allclose(polygon_area(verts), upper - lower)
+
+
+def test_fills_tile_square():
+    # Two sources, plus the He-like case with three stacked sources
+    fracs = np.zeros((3, len(geometry.sources)))
+    fracs[0, geometry.sources.index("bb")] = 1.0
+    fracs[1, geometry.sources.index("snii")] = 0.3
+    fracs[1, geometry.sources.index("snia")] = 0.7
+    fracs[2, geometry.sources.index("bb")] = 0.9
+    fracs[2, geometry.sources.index("snii")] = 0.05
+    fracs[2, geometry.sources.index("agb")] = 0.05
+
+    verts = geometry.fill_vertices(fracs, [1, 5, 18], [10, 7, 10])
+    areas = polygon_area(verts)
+    assert np.allclose(areas, fracs)
+    # everything stays inside the element's box
+    assert np.all(verts[2, ..., 0] >= 18) and np.all(verts[2, ..., 0] <= 19)
+    assert np.all(verts[2, ..., 1] >= 10) and np.all(verts[2, ..., 1] <= 11)
+
+    # He is stacked with BB on the bottom and SNII on the top
+    lower, upper = geometry.fill_bounds(fracs)
+    assert np.isclose(lower[2, geometry.sources.index("bb")], 0)
+    assert np.isclose(upper[2, geometry.sources.index("snii")], 1)
@@ -0,0 +1,66 @@
+import logging
+
+import periodic_table
+from periodic_table.instrument import Instruments, log_metrics
+
+
+def test_phases_reported():
+    events = []
+    table = periodic_table.PeriodicTable(
+        metrics=lambda name, seconds, details: events.append((name, seconds, details))
+    )
+    names = [name for name, _, _ in events]
+    assert names == [
+        "construct.elements",
+        "construct.figure",
+        "construct.labels",
+        "construct.element_setup",
+        "construct.fills",
+        "construct",
+    ]
+    assert all(seconds >= 0 for _, seconds, _ in events)
+
+    del events[:]
+    table.show_source("bb")
+    assert events[0][0] == "state_change"
+    assert events[0][2] == {"elements": len(table.elts), "labels": 1}
+
+    del events[:]
+    table.to_bytes("png", 10)
+    assert events[-1][0] == "save"
+    assert events[-1][2] == {"format": "png", "dpi": 10}
+    draws = {name: details for name, _, details in events if name.startswith("draw.")}
+    assert draws["draw.PolyCollection"]["count"] == len(table._fills) + 1
+    # the artists are back to drawing normally
+    assert all("draw" not in vars(artist) for artist in table._ax.get_children())
+
+
+def test_log_metrics(caplog):
+    with caplog.at_level(logging.DEBUG, logger="periodic_table.instrument"):
+        periodic_table.PeriodicTable(metrics=log_metrics)
+    messages = [record.getMessage() for record in caplog.records]
+    assert messages[-1].startswith("construct took ")
+    assert all(record.levelno == logging.DEBUG for record in caplog.records)
+
+
+def test_stats():
+    table = periodic_table.PeriodicTable()
+    stats = table.stats()
+    # each element has its symbol, number, and highlighted symbol and outline
+    assert stats["text"] == 4 * len(table.elts) + 3 * 7
+    assert stats["visible_text"] == 2 * len(table.elts)
+    assert stats["vertices"] > 0 and stats["vertex_bytes"] > 0
+    assert stats["artists"]["PolyCollection"] == 9
+    # nothing is timed without a callback
+    assert stats["timings"] == {}
+
+    table.show_all_sources()
+    assert table.stats()["visible_text"] == 2 * len(table.elts) + 7
+
+
+def test_disabled_instruments():
+    instruments = Instruments()
+    with instruments.phase("anything") as details:
+        details["x"] = 1
+    instruments.laps("construct").done()
+    assert instruments.totals == {}
@@ -0,0 +1,136 @@
+import matplotlib
+
+matplotlib.use("Agg")
+from matplotlib.backend_bases import MouseEvent
+import numpy as np
+
+import periodic_table
+
+
+def send_event(table, name, x, y, **kwargs):
+    # synthetic mouse event at a location in data coordinates
+    fig = table.get_figure()
+    x_px, y_px = fig.axes[0].transData.transform((x, y))
+    event = MouseEvent(name, fig.canvas, x_px, y_px, **kwargs)
+    fig.canvas.callbacks.process(name, event)
+
+
+def get_elt(table, symbol):
+    return [elt for elt in table.elts if elt.symbol == symbol][0]
+
+
+def test_hover_isolates():
+    table = periodic_table.PeriodicTable()
+    table.show_all_sources()
+    interactive = table.interactive()
+    interactive.update()
+
+    au = get_elt(table, "Au")
+    send_event(table, "motion_notify_event", au.column + 0.5, au.row + 0.5)
+    assert not au.faded
+    assert get_elt(table, "Ag").faded
+
+    # moving off the elements unisolates them
+    send_event(table, "motion_notify_event", 10.5, 10.5)
+    assert not get_elt(table, "Ag").faded
+    interactive.stop()
+
+
+def test_click_highlights():
+    table = periodic_table.PeriodicTable()
+    table.show_all_sources()
+    interactive = table.interactive(on_hover=None)
+
+    eu = get_elt(table, "Eu")
+    send_event(table, "button_press_event", eu.column + 0.5, eu.row + 0.5, button=1)
+    assert eu.highlight
+    assert table._labels["r"].highlight
+    assert not get_elt(table, "Fe").highlight
+    interactive.stop()
+
+
+def record_draws(table):
+    # list that the artists drawn on the table are added to
+    drawn = []
+    draw_artist = table._ax.draw_artist
+
+    def record(artist):
+        drawn.append(artist)
+        draw_artist(artist)
+
+    table._ax.draw_artist = record
+    return drawn
+
+
+def matches_full_draw(table, interactive):
+    canvas = table.get_figure().canvas
+    image = np.array(canvas.buffer_rgba(), dtype=int)
+    interactive.stop()
+    canvas.draw()
+    return np.abs(image - np.asarray(canvas.buffer_rgba())).max() <= 2
+
+
+def test_hover_draws_changed_parts():
+    table = periodic_table.PeriodicTable()
+    table.show_all_sources()
+    interactive = table.interactive()
+    interactive.update()
+    fe, au = get_elt(table, "Fe"), get_elt(table, "Au")
+    send_event(table, "motion_notify_event", fe.column + 0.5, fe.row + 0.5)
+
+    drawn = record_draws(table)
+    send_event(table, "motion_notify_event", au.column + 0.5, au.row + 0.5)
+    # only the fills of the two elements and the label boxes are drawn again
+    allowed = [item.batch.collection for item in list(fe.fills.values())]
+    allowed += [item.batch.collection for item in list(au.fills.values())]
+    for label in table._labels.values():
+        allowed += [label.box.plot_item] + [l.plot_item for l in label.box_lines]
+    assert len(drawn) > 0
+    assert all(any(artist is a for a in allowed) for artist in drawn)
+    assert table._text.plain.collection not in drawn
+    assert table._lines.collection not in drawn
+    assert matches_full_draw(table, interactive)
+
+
+def test_click_draws_changed_parts():
+    table = periodic_table.PeriodicTable()
+    table.show_all_sources()
+    interactive = table.interactive()
+    interactive.update()
+
+    drawn = record_draws(table)
+    eu = get_elt(table, "Eu")
+    send_event(table, "button_press_event", eu.column + 0.5, eu.row + 0.5, button=1)
+    # highlighting only changes the text
+    text = [layer.collection for layer in table._text.strokes.values()]
+    text.append(table._text.highlight.collection)
+    assert len(drawn) > 0
+    assert all(any(artist is a for a in text) for artist in drawn)
+    assert matches_full_draw(table, interactive)
+
+
+def test_stop_restores_artists():
+    table = periodic_table.PeriodicTable()
+    interactive = table.interactive()
+    assert any(a.get_animated() for a in table._dynamic_artists())
+    interactive.stop()
+    assert not any(a.get_animated() for a in table._dynamic_artists())
+
+
+def test_show_sources_draws_changed_parts():
+    table = periodic_table.PeriodicTable()
+    interactive = table.interactive()
+    # the table is drawn when interactive mode starts, not on the first event
+    assert interactive._parts is not None
+    drawn = record_draws(table)
+    interactive.update()
+    assert drawn == []
+
+    table.show_all_sources()
+    interactive.update()
+    # the top layer is copied from the looks drawn at the start
+    assert table._text.plain.collection not in drawn
+    assert table._lines.collection not in drawn
+    table.unshow_source("r")
+    interactive.update()
+    assert matches_full_draw(table, interactive)
@@ -0,0 +1,59 @@
+import numpy as np
+
+import periodic_table
+from periodic_table.layers import LayeredRenderer
+
+
+def on_white(rgba):
+    rgba = rgba.astype(float)
+    alpha = rgba[..., 3:] / 255.0
+    return rgba[..., :3] * alpha + 255 * (1 - alpha)
+
+
+def draw(table, dpi):
+    fig = table.get_figure()
+    fig.set_dpi(dpi)
+    fig.canvas.draw()
+    return np.asarray(fig.canvas.buffer_rgba())
+
+
+def test_layers_match_draw():
+    table = periodic_table.PeriodicTable()
+    table.highlight_source("snii")
+    table.isolate_elt_label("O", "Fe")
+    renderer = LayeredRenderer(table, dpi=20)
+
+    for sources in [[], ["bb"], ["low mass", "r"], list(table.sources_on)]:
+        image = renderer.render(sources)
+        # the table itself isn't changed
+        assert table.get_state()["sources"] == []
+
+        table.set_state(dict(table.get_state(), sources=sources))
+        expected = draw(table, 20)
+        table.unshow_all_sources()
+        assert image.shape == expected.shape
+        assert np.abs(on_white(image) - on_white(expected)).max() <= 3
+
+
+def test_layers_follow_table_state():
+    table = periodic_table.PeriodicTable()
+    table.show_source("cr")
+    renderer = LayeredRenderer(table, dpi=10, max_variants=1)
+    plain = renderer.render()
+    table.highlight_source("cr")
+    highlighted = renderer.render()
+    assert not np.array_equal(plain, highlighted)
+    assert len(renderer._variants) == 1
+
+
+def test_layers_follow_fractions():
+    table = periodic_table.PeriodicTable()
+    table.show_all_sources()
+    renderer = LayeredRenderer(table, dpi=20)
+    before = renderer.render()
+
+    table.set_fractions("Eu", s=0.9, r=0.1)
+    after = renderer.render()
+    assert not np.array_equal(before, after)
+    expected = draw(table, 20)
+    assert np.abs(on_white(after) - on_white(expected)).max() <= 3
@@ -0,0 +1,54 @@
+from matplotlib.figure import Figure
+from matplotlib import colors as mpl_colors
+import numpy as np
+
+import periodic_table
+from periodic_table.lines import LineBatch
+
+
+def make_lines():
+    ax = Figure().add_subplot()
+    lines = LineBatch(ax)
+    items = [
+        lines.add_line([0, 1], [i, i], color, 1 + i, zorder=z)
+        for i, (color, z) in enumerate([("red", 0), ("green", 0), ("blue", -100)])
+    ]
+    return lines, items
+
+
+def test_draw_order():
+    lines, items = make_lines()
+    # lines are drawn in order of zorder, then the order they were added
+    segments = lines.collection.get_segments()
+    assert [seg[0][1] for seg in segments] == [2, 0, 1]
+    assert np.allclose(lines.collection.get_linewidths(), [3, 1, 2])
+
+    # faded lines go underneath the others with the same zorder
+    items[0].fade()
+    segments = lines.collection.get_segments()
+    assert [seg[0][1] for seg in segments] == [2, 0, 1]
+    items[1].fade()
+    items[0].unfade()
+    segments = lines.collection.get_segments()
+    assert [seg[0][1] for seg in segments] == [2, 1, 0]
+    assert np.allclose(lines.collection.get_edgecolor()[2], mpl_colors.to_rgba("red"))
+
+    # hidden lines aren't drawn at all
+    items[2].hide()
+    assert len(lines.collection.get_segments()) == 2
+
+
+def test_table_lines():
+    table = periodic_table.PeriodicTable()
+    # each element box and the two connectors
+    assert len(table._lines) == len(table.elts) + 2
+    assert table.stats()["artists"]["LineCollection"] == 1
+
+    table.isolate_elt("Au")
+    faded = table._lines.faded
+    assert faded.sum() == len(table.elts) - 1 + 2
+    au = [elt for elt in table.elts if elt.symbol == "Au"][0]
+    assert not faded[au.box_list[0].idx]
+    # the one box that isn't faded is drawn last
+    last = table._lines.collection.get_segments()[-1]
+    assert np.allclose(last[0], [au.column, au.row])
@@ -0,0 +1,55 @@
+import pytest
+
+from periodic_table import catalog
+from periodic_table.query import (
+    Selection,
+    frac,
+    frac_r,
+    frac_snii,
+    frac_snia,
+    number,
+    primary,
+    select,
+    to_symbols,
+)
+
+
+def test_select_fields():
+    assert select(period=1).symbols == ["H", "He"]
+    assert len(select(period=6)) == 32
+    assert select(number=range(1, 4)).symbols == ["H", "He", "Li"]
+    assert select(number.between(57, 71)) == select(row=9)
+    assert len(select()) == len(catalog.elements)
+    with pytest.raises(ValueError):
+        select(group=1)
+
+
+def test_select_fractions():
+    r_process = select(frac_r > 0.9)
+    assert "Eu" in r_process
+    assert "Fe" not in r_process
+    assert all(catalog.get_fractions(s)["r"] > 0.9 for s in r_process)
+
+    supernovae = frac("snii+snia")
+    assert select(supernovae > 0.99) == select(frac_snii + frac_snia > 0.99)
+    assert "Fe" in select(supernovae > 0.99, period=4)
+    assert select(frac("low mass") > 0.5) == primary("low mass")
+    assert primary("snii", threshold=0.3) == select(frac_snii > 0.3)
+
+
+def test_selection_logic():
+    r_only = select(frac_r > 0.5) & ~select(period=6)
+    assert "Eu" not in r_only
+    assert "I" in r_only
+    assert (select(period=1) | select(79)).symbols == ["H", "He", "Au"]
+    assert to_symbols(["Fe", 79, select(period=1), "H"]) == ["Fe", "Au", "H", "He"]
+    with pytest.raises(ValueError):
+        Selection([True])
+
+
+def test_index():
+    assert catalog.index("Au") == catalog.index(79) == 78
+    with pytest.raises(ValueError):
+        catalog.index("Xx")
+    with pytest.raises(ValueError):
+        catalog.index(200)
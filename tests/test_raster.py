@@ -0,0 +1,93 @@
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+import periodic_table
+from periodic_table.raster import ThumbnailRenderer
+
+
+def on_white(rgba):
+    rgba = rgba.astype(float)
+    alpha = rgba[..., 3:] / 255.0
+    return rgba[..., :3] * alpha + 255 * (1 - alpha)
+
+
+@pytest.fixture(scope="module")
+def renderer():
+    return ThumbnailRenderer(dpi=10)
+
+
+def test_raster_matches_draw(renderer):
+    table = periodic_table.PeriodicTable()
+    fig = table.get_figure()
+    fig.set_dpi(10)
+    states = [
+        dict(),
+        {"sources": ["bb", "snii", "snia"]},
+        {"sources": ["low mass", "r"], "highlight": "r"},
+        {"sources": ["r"], "isolate": ["Fe", "Au"], "isolate_label": True},
+    ]
+    for state in states:
+        image = renderer.render(state)
+        table.set_state(state)
+        fig.canvas.draw()
+        expected = np.asarray(fig.canvas.buffer_rgba())
+        assert image.shape == expected.shape == renderer.shape
+        diff = np.abs(on_white(image) - on_white(expected)).max(axis=-1)
+        # only antialiasing at the edges of the text should differ much
+        assert diff.mean() < 2
+        assert np.mean(diff > 32) < 0.02
+
+
+def test_raster_bad_source(renderer):
+    with pytest.raises(ValueError):
+        renderer.render({"sources": ["not a source"]})
+
+
+def test_raster_does_not_import_pyplot():
+    code = (
+        "import sys; import periodic_table.raster; "
+        "assert 'matplotlib.pyplot' not in sys.modules"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_raster_isolate_like_table(renderer):
+    from periodic_table.query import select
+
+    by_symbol = renderer.render({"sources": ["r"], "isolate": ["H", "He", "Au"]})
+    by_number = renderer.render({"sources": ["r"], "isolate": [1, 2, 79]})
+    selected = renderer.render({"sources": ["r"], "isolate": [select(period=1), 79]})
+    assert np.array_equal(by_symbol, by_number)
+    assert np.array_equal(by_symbol, selected)
+    assert not np.array_equal(by_symbol, renderer.render({"sources": ["r"]}))
+
+
+def test_raster_dataset(renderer):
+    from periodic_table import catalog, datasets
+
+    fracs = np.array(catalog.fractions)
+    # move all of Eu's abundance to the s process
+    eu = catalog.index("Eu")
+    fracs[eu] = 0
+    fracs[eu, catalog.source_idx["s"]] = 1
+    dataset = datasets.Dataset(fracs, "test")
+    custom = ThumbnailRenderer(dpi=10, dataset=dataset)
+
+    table = periodic_table.PeriodicTable(dataset=dataset)
+    fig = table.get_figure()
+    fig.set_dpi(10)
+    for state in [
+        {"sources": ["s", "r"], "highlight": "s"},
+        {"sources": ["s", "r"], "isolate": ["Eu"], "isolate_label": True},
+    ]:
+        image = custom.render(state)
+        table.set_state(state)
+        fig.canvas.draw()
+        expected = np.asarray(fig.canvas.buffer_rgba())
+        diff = np.abs(on_white(image) - on_white(expected)).max(axis=-1)
+        assert diff.mean() < 2
+        assert np.mean(diff > 32) < 0.02
+        assert not np.array_equal(image, renderer.render(state))
@@ -0,0 +1,94 @@
+import asyncio
+import io
+
+from PIL import Image
+import pytest
+
+import periodic_table
+from periodic_table.serve import RenderServer, _etag_matches, benchmark, parse_query
+
+
+async def get(port, path, headers=""):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    request = "GET {} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n{}\r\n"
+    writer.write(request.format(path, headers).encode("latin-1"))
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    response_headers = dict(line.split(": ", 1) for line in lines[1:])
+    return int(lines[0].split()[1]), response_headers, body
+
+
+def test_parse_query():
+    state, format, dpi = parse_query(
+        "sources=bb,low%20mass&sources=r&highlight=R&isolate=Fe,Au&isolate_label=1"
+        "&format=svg&dpi=20"
+    )
+    assert state == {
+        "sources": ["agb", "bb", "r", "s"],
+        "highlight": "r",
+        "isolate": ["Fe", "Au"],
+        "isolate_label": True,
+    }
+    assert (format, dpi) == ("svg", 20)
+    # elements can be given by number, and an empty list fades everything
+    assert parse_query("isolate=79,Fe,26")[0]["isolate"] == ["Au", "Fe"]
+    assert parse_query("isolate=")[0]["isolate"] == []
+    assert parse_query("")[0]["isolate"] is None
+    bad = ["sources=xx", "highlight=xx", "isolate=Xx", "isolate=200", "format=gif"]
+    for query in bad + ["dpi=0", "dpi=big"]:
+        with pytest.raises(ValueError):
+            parse_query(query)
+
+
+def test_etag_matches():
+    etag = '"abc"'
+    assert _etag_matches(etag, '"abc"')
+    assert _etag_matches(etag, '"xyz","abc"')
+    assert _etag_matches(etag, '"xyz" , W/"abc"')
+    assert _etag_matches(etag, "*")
+    assert not _etag_matches(etag, "")
+    assert not _etag_matches(etag, '"xyz", W/"abcd"')
+
+
+def test_serve():
+    async def run():
+        server = RenderServer(workers=1, max_pending=1, default_dpi=10)
+        await server.start(port=0)
+        try:
+            status, headers, body = await get(server.port, "/?sources=bb,cr")
+            assert status == 200
+            assert headers["Content-Type"] == "image/png"
+            assert Image.open(io.BytesIO(body)).size == (200, 120)
+
+            # the ETag is the same hash a table in this state has
+            table = periodic_table.PeriodicTable()
+            table.show_source("cr", "bb")
+            assert headers["ETag"] == '"{}"'.format(table.state_hash(dpi=10))
+            status, _, body = await get(
+                server.port,
+                "/?sources=cr,bb",
+                "If-None-Match: {}\r\n".format(headers["ETag"]),
+            )
+            assert (status, body) == (304, b"")
+
+            assert (await get(server.port, "/?sources=xx"))[0] == 400
+            assert (await get(server.port, "/other"))[0] == 404
+
+            # only one render can be waiting, so the rest are turned away
+            paths = ["/?sources=bb&dpi={}".format(dpi) for dpi in [11, 12, 13]]
+            responses = await asyncio.gather(*[get(server.port, p) for p in paths])
+            statuses = sorted(status for status, _, _ in responses)
+            assert statuses[0] == 200
+            assert statuses[-1] == 503
+
+            results = await benchmark(
+                "127.0.0.1", server.port, ["/?sources=bb,cr"], 20, 2
+            )
+            assert results["status"] == {200: 20}
+            assert results["p99_ms"] >= results["p50_ms"] > 0
+        finally:
+            await server.close()
+
+    asyncio.run(run())
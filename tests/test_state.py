@@ -0,0 +1,160 @@
+import pytest
+
+import periodic_table
+
+
+def test_state_round_trip():
+    table = periodic_table.PeriodicTable()
+    assert table.get_state() == {
+        "sources": [],
+        "highlight": None,
+        "isolate": None,
+        "isolate_label": False,
+    }
+
+    table.show_all_sources()
+    table.unshow_source("unstable")
+    table.highlight_source("R")
+    table.isolate_elt_label("Au", "Pt")
+    state = table.get_state()
+    assert state["highlight"] == "r"
+    assert state["isolate"] == ["Au", "Pt"]
+    assert state["isolate_label"]
+
+    other = periodic_table.PeriodicTable()
+    other.set_state(state)
+    assert other.get_state() == state
+
+
+def test_set_state_defaults():
+    table = periodic_table.PeriodicTable()
+    table.show_all_sources()
+    table.highlight_source("snii")
+    table.isolate_elt("Fe")
+    table.set_state({"sources": ["low mass"]})
+    assert sorted(table.get_state()["sources"]) == ["agb", "s"]
+    assert table.highlighted is None
+    assert table.isolated is None
+
+
+def test_set_state_bad_source():
+    table = periodic_table.PeriodicTable()
+    with pytest.raises(ValueError):
+        table.set_state({"sources": ["bb", "not a source"]})
+    # nothing was changed
+    assert table.get_state()["sources"] == []
+
+
+def _pixels(table):
+    from matplotlib.image import imread
+    import io
+
+    return imread(io.BytesIO(table.to_bytes("png", 10)))
+
+
+def test_transitions_match_fresh_table():
+    import numpy as np
+
+    table = periodic_table.PeriodicTable()
+    states = [
+        {"sources": ["bb", "snii"], "highlight": "snii"},
+        {"sources": ["low mass", "r"], "highlight": "low mass", "isolate": ["Au"]},
+        {"sources": ["r"], "isolate": ["Au", "Ba"], "isolate_label": True},
+        {"sources": ["snia"], "highlight": "snia"},
+    ]
+    for state in states:
+        table.set_state(state)
+        fresh = periodic_table.PeriodicTable()
+        fresh.set_state(state)
+        assert np.array_equal(_pixels(table), _pixels(fresh))
+
+
+def test_transition_only_changes_differences(monkeypatch):
+    from periodic_table.batched import BatchedCollection
+    from periodic_table.text import GlyphCollection
+
+    table = periodic_table.PeriodicTable()
+    table.set_state({"sources": ["bb", "r"], "highlight": "r", "isolate": ["Au"]})
+
+    updates = []
+    for cls in [BatchedCollection, GlyphCollection]:
+        monkeypatch.setattr(cls, "_update", lambda self: updates.append(self))
+    table.set_state(table.get_state())
+    assert updates == []
+
+    # showing one more source only updates the fills of that source, and the plain
+    # text of its label
+    table.show_source("cr")
+    assert updates == [table._fills["cr"], table._text.plain]
+    assert table._bits.label("cr") & periodic_table.state.LABEL_SHOWN
+
+
+def test_batch(monkeypatch):
+    from periodic_table.batched import BatchedCollection
+
+    table = periodic_table.PeriodicTable()
+    updates = []
+    with table.batch():
+        monkeypatch.setattr(
+            BatchedCollection, "_update", lambda self: updates.append(self)
+        )
+        table.show_all_sources()
+        table.unshow_source("unstable")
+        table.highlight_source("R")
+        table.isolate_elt_label("Au", "Pt")
+        assert table.get_state()["isolate"] == ["Au", "Pt"]
+        with pytest.raises(ValueError):
+            table.show_source("not a source")
+        assert updates == []
+        monkeypatch.undo()
+    state = table.get_state()
+
+    fresh = periodic_table.PeriodicTable()
+    fresh.set_state(state)
+    assert _pixels(table).tolist() == _pixels(fresh).tolist()
+
+
+def test_batch_error_restores_state():
+    table = periodic_table.PeriodicTable()
+    table.show_source("bb")
+    with pytest.raises(RuntimeError):
+        with table.batch():
+            table.show_source("snii")
+            table.isolate_elt("O")
+            raise RuntimeError()
+    assert table.get_state()["sources"] == ["bb"]
+    assert table.get_state()["isolate"] is None
+    assert table._pending is None
+    assert not any(elt.faded for elt in table.elts)
+
+
+def test_apply():
+    table = periodic_table.PeriodicTable()
+    table.apply({"sources": ["bb"]})
+    table.apply({"highlight": "bb"})
+    assert table.get_state()["sources"] == ["bb"]
+    assert table.get_state()["highlight"] == "bb"
+    with pytest.raises(ValueError):
+        table.apply({"source": ["cr"]})
+
+
+def test_isolate_nothing_fades_everything():
+    table = periodic_table.PeriodicTable()
+    table.show_all_sources()
+    table.isolate_elt()
+    assert table.get_state()["isolate"] == []
+    assert all(elt.faded for elt in table.elts)
+    assert all(label.text.faded for label in table._labels.values())
+    assert all(line.faded for line in table._connector_lines)
+
+    table.unisolate_all_elts()
+    assert table.get_state()["isolate"] is None
+    assert not any(elt.faded for elt in table.elts)
+    assert not any(label.text.faded for label in table._labels.values())
+
+
+def test_isolate_selection():
+    table = periodic_table.PeriodicTable()
+    table.isolate_elt_label(table.select(period=1), "Au")
+    assert table.get_state()["isolate"] == ["H", "He", "Au"]
+    assert [elt.symbol for elt in table.elts if not elt.faded] == ["H", "He", "Au"]
@@ -0,0 +1,63 @@
+import xml.etree.ElementTree as ET
+
+import pytest
+
+import periodic_table
+from periodic_table import style
+from periodic_table.svg import table_svg
+
+ns = "{http://www.w3.org/2000/svg}"
+
+
+def test_svg_follows_state():
+    plain = ET.fromstring(table_svg())
+    # only the connecting lines, white background, and boxes
+    assert len(plain.findall(ns + "path")) == 3
+    assert len(plain.findall(ns + "text")) == 2 * 118
+
+    state = {
+        "sources": ["bb", "low mass"],
+        "highlight": "bb",
+        "isolate": ["H", "He"],
+        "isolate_label": True,
+    }
+    root = ET.fromstring(table_svg(state, color_bb="red"))
+    fills = {path.get("fill") for path in root.findall(ns + "path")}
+    assert "red" in fills
+    assert style.fade_color("red") in fills
+    assert style.fade_color(style.default_colors["s"]) in fills
+
+    texts = {text.text: text for text in root.findall(ns + "text")}
+    assert "h" in texts["H"].get("class").split()
+    assert "h" not in texts["Fe"].get("class").split()
+    # the Big Bang label isn't faded, since it makes most of the isolated elements
+    assert texts[style.default_labels["bb"]].get("fill") is None
+    assert texts[style.default_labels["s"]].get("fill") != style.almost_black
+    assert style.default_labels["snii"] not in texts
+
+
+def test_table_to_svg():
+    table = periodic_table.PeriodicTable(label_r="r-process & friends")
+    table.show_source("r")
+    table.highlight_source("r")
+    svg = table.to_svg()
+    assert svg == table_svg(table.get_state(), label_r="r-process & friends")
+    assert "r-process &amp; friends" in svg
+
+
+def test_svg_bad_source():
+    with pytest.raises(ValueError):
+        table_svg({"sources": ["not a source"]})
+
+
+def test_svg_isolate_like_table():
+    from periodic_table.query import select
+
+    by_symbol = table_svg({"sources": ["bb"], "isolate": ["Au", "H"]})
+    assert table_svg({"sources": ["bb"], "isolate": [79, 1]}) == by_symbol
+    assert table_svg({"sources": ["bb"], "isolate": [select(period=1)]}) != by_symbol
+
+    table = periodic_table.PeriodicTable()
+    table.show_source("bb")
+    table.isolate_elt(79, "H")
+    assert table.to_svg() == by_symbol
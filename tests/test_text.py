@@ -0,0 +1,21 @@
+from matplotlib.font_manager import FontProperties
+import numpy as np
+
+from periodic_table.text import glyph_path
+
+
+def test_glyph_path_cached():
+    prop = FontProperties(family="DejaVu Sans")
+    assert glyph_path("Au", prop, 30) is glyph_path("Au", prop, 30)
+    assert glyph_path("Au", prop, 30) is not glyph_path("Au", prop, 18)
+
+
+def test_glyph_path_centered():
+    prop = FontProperties(family="DejaVu Sans")
+    # "o" has no ascender or descender, so its ink should be close to centered
+    verts = glyph_path("o", prop, 100).vertices
+    center = (verts.min(axis=0) + verts.max(axis=0)) / 2.0
+    assert np.allclose(center, 0, atol=10)
+    # and it scales with font size
+    small = glyph_path("o", prop, 50).vertices
+    assert np.allclose(np.ptp(verts, axis=0), 2 * np.ptp(small, axis=0), rtol=0.05)
@@ -0,0 +1,46 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import periodic_table
+
+themes = [
+    dict(),
+    dict(color_bb="red", color_snii="blue"),
+    dict(color_r="black", label_r="R Process"),
+    dict(color_agb="#00ff00", label_agb="AGB"),
+]
+states = [
+    {"sources": ["bb", "snii", "r", "low mass"]},
+    {"sources": ["bb", "r", "low mass"], "highlight": "r", "isolate": ["Au"]},
+]
+
+
+def render(theme, state):
+    table = periodic_table.PeriodicTable(**theme)
+    table.set_state(state)
+    fig = table.get_figure()
+    fig.set_dpi(10)
+    fig.canvas.draw()
+    return np.array(fig.canvas.buffer_rgba())
+
+
+def test_tables_are_independent():
+    plain = periodic_table.PeriodicTable()
+    red = periodic_table.PeriodicTable(color_bb="red")
+    assert plain.elts[0] is not red.elts[0]
+    assert plain.elts[0].colors["bb"] == "#D7E5CC"
+    plain.isolate_elt("H")
+    assert not red.elts[1].faded
+
+
+def test_tables_render_in_threads():
+    jobs = [(theme, state) for theme in themes for state in states]
+    expected = [render(theme, state) for theme, state in jobs]
+    # each theme looks different
+    assert not any(np.array_equal(expected[0], image) for image in expected[2::2])
+
+    with ThreadPoolExecutor(8) as pool:
+        images = list(pool.map(lambda job: render(*job), jobs * 2))
+    for image, expected_image in zip(images, expected * 2):
+        assert np.array_equal(image, expected_image)
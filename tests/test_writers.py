@@ -0,0 +1,130 @@
+import shutil
+import tracemalloc
+
+import numpy as np
+from PIL import Image, ImageSequence
+import pytest
+
+from periodic_table import query
+from periodic_table.animation import stream_frames, write_animation
+from periodic_table.writers import FrameWriter, on_white, open_writer
+
+states = [
+    {},
+    {"sources": ["bb"]},
+    {"sources": ["bb"]},
+    {"sources": ["bb", "cr"], "highlight": "cr"},
+    {"sources": ["bb", "cr"], "isolate": ["Li", "Be", "B"]},
+]
+
+
+def test_stream_frames_reuse_canvas():
+    frames = stream_frames(states, dpi=10)
+    first = next(frames)
+    copy = first.copy()
+    assert first.shape == (120, 200, 4)
+    second = next(frames)
+    # every frame is drawn on the same canvas
+    assert np.shares_memory(first, second)
+    assert not np.array_equal(copy, second)
+
+
+@pytest.mark.parametrize("extension", ["gif", "png"])
+def test_write_animation(tmp_path, extension):
+    expected = [on_white(frame) for frame in stream_frames(states, dpi=10)]
+    savename = str(tmp_path / ("animation." + extension))
+    assert write_animation(states, savename, fps=4, dpi=10) == len(states)
+
+    image = Image.open(savename)
+    assert image.n_frames == len(states)
+    for frame, rgb in zip(ImageSequence.Iterator(image), expected):
+        frame = np.asarray(frame.convert("RGB")).astype(int)
+        if extension == "png":
+            # animated PNGs keep every color
+            assert np.array_equal(frame, rgb)
+        else:
+            assert np.mean(np.abs(frame - rgb)) < 5
+
+
+def test_write_animation_selection_states(tmp_path):
+    # states can isolate elements with a selection or an array, and frames that
+    # look the same are only drawn once
+    selection = query.select(query.frac("bb") > 0)
+    savename = str(tmp_path / "animation.png")
+    selected = [
+        {"sources": ["bb"], "isolate": selection},
+        {"sources": ["bb"], "isolate": np.array(selection.numbers)},
+        {"sources": ["bb"], "isolate": list(selection)},
+        {"sources": ["bb"]},
+    ]
+    assert write_animation(selected, savename, fps=4, dpi=10) == len(selected)
+    frames = [
+        np.asarray(frame.convert("RGB"))
+        for frame in ImageSequence.Iterator(Image.open(savename))
+    ]
+    assert np.array_equal(frames[0], frames[1])
+    assert np.array_equal(frames[0], frames[2])
+    assert not np.array_equal(frames[0], frames[3])
+
+
+def test_memory_is_flat(tmp_path):
+    savename = str(tmp_path / "animation.png")
+
+    def peak(n_frames):
+        tracemalloc.start()
+        try:
+            write_animation(
+                (states[idx % len(states)] for idx in range(n_frames)),
+                savename,
+                fps=10,
+                dpi=10,
+            )
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    assert peak(50) < 1.2 * peak(5)
+
+
+def test_bad_writer(tmp_path):
+    with pytest.raises(ValueError):
+        open_writer(str(tmp_path / "animation.avi"), 10)
+    with pytest.raises(TypeError):
+
+        class Incomplete(FrameWriter):
+            def _write(self, frame):
+                pass
+
+        Incomplete(str(tmp_path / "animation.gif"), 10)
+    with open_writer(str(tmp_path / "animation.gif"), 10) as writer:
+        writer.write(np.zeros((10, 20, 3), dtype=np.uint8))
+        with pytest.raises(ValueError):
+            writer.write(np.zeros((20, 10, 3), dtype=np.uint8))
+
+
+@pytest.mark.parametrize(
+    "extension",
+    [
+        "gif",
+        "png",
+        pytest.param(
+            "mp4",
+            marks=pytest.mark.skipif(
+                shutil.which("ffmpeg") is None, reason="ffmpeg is not installed"
+            ),
+        ),
+    ],
+)
+def test_no_frames(tmp_path, extension):
+    savename = tmp_path / ("animation." + extension)
+    writer = open_writer(str(savename), 10)
+    with pytest.raises(ValueError):
+        writer.close()
+    assert not savename.exists()
+    # closing again does nothing
+    writer.close()
+
+    # an error inside the block isn't replaced by the missing frames
+    with pytest.raises(RuntimeError):
+        with open_writer(str(savename), 10):
+            raise RuntimeError()